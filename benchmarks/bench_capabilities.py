@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+A play of resource module tasks on one persistent connection, counting the
+'show platform' commands reaching the device. Each task asks for the
+capabilities, as get_connection does, and merges a vlan. The connection
+is dropped and made again halfway through the play.
+
+    python benchmarks/bench_capabilities.py --tasks 20
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.vlan.vlan import VlanArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.vlan.vlan import Vlan
+
+from bench_resources import FakeModule
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import SEEDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--tasks', type=int, default=20)
+    args = parser.parse_args()
+
+    device = FakeDmos()
+    device.load(SEEDS['vlan'](100))
+    connection = FakeConnection(device=device)
+    cliconf = load_cliconf(connection, config_cache=True)
+
+    for task in range(args.tasks):
+        if task == args.tasks // 2:
+            connection.reconnect()
+        json.loads(cliconf.get_capabilities())
+        params = utils.validate_config(VlanArgs.argument_spec, {
+            'config': [{'vlan_id': 2 + task, 'name': 'task-{0}'.format(task)}], 'state': 'merged'})
+        Vlan(FakeModule(params, cliconf)).execute_module()
+
+    print('tasks:                 %d' % args.tasks)
+    print('show platform sent:    %d' % connection.commands['show platform'])
+    for key, value in sorted(cliconf.get_cache_stats().items()):
+        print('%-22s %d' % (key + ':', value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Push a large vlan configuration to the emulator in a single commit and in
+commits of commit_size lines, showing the seconds of each chunk, then fail
+one chunk and resume from it with resume_chunk.
+
+The emulated commits take --commit-cost seconds per line, and sessions of
+more than --max-commit-lines lines are aborted.
+
+    python benchmarks/bench_chunked_commit.py --vlans 10000 --commit-size 2000 5000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import time
+
+
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import vlan
+
+
+def push(args, commit_size, fail_commits=(), resume_chunk=None, device=None):
+    if device is None:
+        device = FakeDmos(commit_line_cost=args.commit_cost, max_commit_lines=args.max_commit_lines,
+                          fail_commits=fail_commits)
+    cliconf = load_cliconf(FakeConnection(latency=args.latency, device=device))
+    start = time.time()
+    resp = cliconf.edit_config(vlan(args.vlans), batch_size=args.batch_size,
+                               commit_size=commit_size, resume_chunk=resume_chunk)
+    return device, resp, time.time() - start
+
+
+def describe(resp):
+    chunks = resp.get('chunks')
+    if not chunks:
+        return ''
+    return ' '.join('%s:%d/%.2fs' % (chunk['status'][0], chunk['lines'], chunk.get('elapsed', 0))
+                    for chunk in chunks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vlans', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--commit-cost', type=float, default=0.00002)
+    parser.add_argument('--max-commit-lines', type=int, default=12000)
+    parser.add_argument('--commit-size', type=int, nargs='+', default=[2000, 5000, 10000])
+    args = parser.parse_args()
+
+    reference, resp, dummy = push(args, None, device=FakeDmos())
+    expected = reference.tree
+
+    print('%-14s %8s %10s  %s' % ('mode', 'seconds', 'result', 'chunks (status:lines/seconds)'))
+    for commit_size in [None] + args.commit_size:
+        device, resp, elapsed = push(args, commit_size)
+        result = 'failed' if resp.get('error') else 'ok'
+        if not resp.get('error') and device.tree != expected:
+            raise AssertionError('commit_size %s: the configuration differs' % commit_size)
+        mode = 'commit_size=%d' % commit_size if commit_size else 'single commit'
+        print('%-14s %8.3f %10s  %s' % (mode, elapsed, result, describe(resp)))
+
+    commit_size = args.commit_size[0]
+    device, resp, elapsed = push(args, commit_size, fail_commits=[3])
+    print('%-14s %8.3f %10s  %s' % ('fail chunk 2', elapsed, 'failed', describe(resp)))
+    failed_chunk = resp['failed_chunk']
+    dummy, resp, elapsed = push(args, commit_size, resume_chunk=failed_chunk, device=device)
+    if resp.get('error') or device.tree != expected:
+        raise AssertionError('the resumed push did not complete the configuration')
+    print('%-14s %8.3f %10s  %s' % ('resume chunk %d' % failed_chunk, elapsed, 'ok', describe(resp)))
+
+
+if __name__ == '__main__':
+    main()
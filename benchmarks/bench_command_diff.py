@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Cost of the dmos_config candidate/running-config diff.
+
+    python benchmarks/bench_command_diff.py --candidates 5000 --config-lines 50000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import re
+import time
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import (
+    get_command_list_diff,
+)
+
+
+def previous_get_command_list_diff(configs, candidates=None):
+    # implementation replaced by the indexed diff, kept for comparison
+    out = []
+    if candidates:
+        for candidate in candidates:
+            command = re.sub(' +', ' ', candidate)
+
+            its_no = False
+            if command.split()[0] == "no":
+                its_no = True
+                command = command.replace("no ", "")
+
+            contains = True
+            for config in configs:
+                contains = True
+                for word in command.split():
+                    if word not in config:
+                        contains = False
+                        break
+                if contains:
+                    break
+
+            if contains:
+                if its_no:
+                    out.append("no " + command)
+            else:
+                if not its_no:
+                    out.append(command)
+
+    return out
+
+
+def synthetic_config(lines):
+    configs = []
+    vlan = 1
+    while len(configs) < lines:
+        configs.append('dot1q vlan {0} name vlan-{0}'.format(vlan))
+        configs.append('dot1q vlan {0} interface gigabit-ethernet-1/1/{1} tagged'.format(vlan, vlan % 48 + 1))
+        vlan += 1
+    return configs[:lines]
+
+
+def synthetic_candidates(count, config_lines):
+    # half already configured, half new, a few negations
+    candidates = []
+    for i in range(count):
+        vlan = (i * 7) % config_lines + 1
+        if i % 10 == 0:
+            candidates.append('no dot1q vlan {0} name'.format(vlan))
+        elif i % 2:
+            candidates.append('dot1q vlan {0} name vlan-{0}'.format(vlan))
+        else:
+            candidates.append('dot1q vlan {0} name new-{0}'.format(vlan))
+    return candidates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--candidates', type=int, default=5000)
+    parser.add_argument('--config-lines', type=int, default=50000)
+    parser.add_argument('--previous-candidates', type=int, default=200,
+                        help='number of candidates timed with the previous implementation')
+    args = parser.parse_args()
+
+    configs = synthetic_config(args.config_lines)
+    candidates = synthetic_candidates(args.candidates, args.config_lines // 2)
+
+    start = time.time()
+    out = get_command_list_diff(configs, candidates)
+    elapsed = time.time() - start
+    print('indexed:  %d candidates x %d lines: %.3f s (%d to push)' % (
+        len(candidates), len(configs), elapsed, len(out)))
+
+    sample = candidates[:args.previous_candidates]
+    start = time.time()
+    previous_get_command_list_diff(configs, sample)
+    previous = time.time() - start
+    print('previous: %d candidates x %d lines: %.3f s (%.1f s extrapolated to %d)' % (
+        len(sample), len(configs), previous, previous * len(candidates) / max(len(sample), 1),
+        len(candidates)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Scaling of the 'display curly-braces' parser used by dmos_config.
+
+    python benchmarks/bench_curly_braces.py --lines 1000 10000 100000 200000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import re
+import time
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import (
+    get_command_list_from_curly_braces,
+)
+
+
+def previous_get_command_list_from_curly_braces(output):
+    # implementation replaced by the single pass parser, kept for comparison
+    ret = output.split("\n")
+
+    cmds = []
+    while(len(ret)):
+        cmd = ""
+        discart_command = True
+        for i, word in enumerate(ret, 0):
+            cmd += word
+            if word == "":
+                ret.pop(i)
+                break
+
+            if ";" in word:
+                ret.pop(i)
+                discart_command = False
+                break
+
+            if "}" in word:
+                ret.pop(i)
+                for j in range(i - 1, -1, -1):
+                    if "{" in ret[j]:
+                        ret.pop(j)
+                        break
+                break
+
+        if not discart_command:
+            cmd = cmd.replace("{", "").replace(";", "").replace("}", "")
+            cmd = re.sub(' +', ' ', cmd)
+            cmds.append(cmd)
+
+    return cmds
+
+
+def synthetic_config(lines):
+    # each vlan block takes 8 lines
+    out = ['dot1q {']
+    vlan = 1
+    while len(out) < lines - 1:
+        out.extend([
+            '    vlan {0} {{'.format(vlan),
+            '        name vlan-{0};'.format(vlan),
+            '        interface gigabit-ethernet-1/1/{0} {{'.format(vlan % 48 + 1),
+            '            tagged;',
+            '        }',
+            '        interface ten-gigabit-ethernet-1/1/{0} {{'.format(vlan % 8 + 1),
+            '            untagged;',
+            '        }',
+            '    }',
+        ])
+        vlan += 1
+    out.append('}')
+    return '\n'.join(out)
+
+
+def timed(func, output):
+    start = time.time()
+    result = func(output)
+    return time.time() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000, 50000, 100000, 200000])
+    parser.add_argument('--previous-max-lines', type=int, default=100000,
+                        help='skip the quadratic implementation above this size')
+    args = parser.parse_args()
+
+    print('%10s %12s %12s %14s' % ('lines', 'seconds', 'us/line', 'previous (s)'))
+    for lines in args.lines:
+        output = synthetic_config(lines)
+        elapsed, commands = timed(get_command_list_from_curly_braces, output)
+
+        previous = '-'
+        if lines <= args.previous_max_lines:
+            previous_elapsed, previous_commands = timed(
+                previous_get_command_list_from_curly_braces, output)
+            if previous_commands != commands:
+                raise AssertionError('parsers disagree for %d lines' % lines)
+            previous = '%.3f' % previous_elapsed
+
+        print('%10d %12.3f %12.2f %14s' % (lines, elapsed, elapsed * 1e6 / lines, previous))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Time and peak allocation of DictDiffer over resource shaped have/want pairs.
+
+    python benchmarks/bench_dict_differ.py --sizes 10 1000 10000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import time
+import tracemalloc
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.dict_differ import DictDiffer
+
+
+def vlan_pair(size):
+    have = [{'vlan_id': i, 'name': 'vlan-%d' % i,
+             'interface': [{'name': 'gigabit-ethernet-1/1/%d' % (i % 48 + 1), 'tagged': True}]}
+            for i in range(1, size + 1)]
+    want = [{'vlan_id': i, 'name': 'new-%d' % i if i % 10 == 0 else 'vlan-%d' % i,
+             'interface': [{'name': 'gigabit-ethernet-1/1/%d' % (i % 48 + 1), 'tagged': i % 2 == 0}]}
+            for i in range(1, size + 1)]
+    return have, want, {'vlan_id': [1], 'name': [3]}
+
+
+def l3_interface_pair(size):
+    def intf(i, mtu):
+        return {'name': 'l3-%d' % i, 'description': 'intf %d' % i, 'ip_mtu': mtu,
+                'ipv4': {'address': '10.%d.%d.1/24' % (i // 256 % 256, i % 256),
+                         'secondary': ['172.16.%d.1/24' % (i % 256)]},
+                'ipv6': {'enable': True, 'address': ['2001:db8::%x/64' % i],
+                         'nd_ra': {'lifetime': 1800, 'prefix': [{'ip': '2001:db8::/64', 'off_link': True}]}}}
+    have = [intf(i, 1500) for i in range(size)]
+    want = [intf(i, 9000 if i % 10 == 0 else 1500) for i in range(size)]
+    return have, want, {'name': [1], 'ip': [5]}
+
+
+def twamp_pair(size):
+    def twamp(dscp):
+        return [{'reflector': {'admin_status': 'enabled', 'ipv4': {'client_address': [
+                    {'address': '10.0.%d.%d' % (i // 256 % 256, i % 256), 'state': 'permit'} for i in range(size)]}},
+                 'sender': {'admin_status': 'enabled', 'connection': [
+                     {'id': i, 'admin_status': 'enabled',
+                      'test_session': [{'id': 1, 'dscp': dscp if i % 10 == 0 else 'be'}]} for i in range(size)]}}]
+    return twamp('be')[0], twamp('ef')[0], {'address': [3], 'network': [3], 'id': [2, 4]}
+
+
+SHAPES = [('vlan', vlan_pair), ('l3_interface', l3_interface_pair), ('twamp', twamp_pair)]
+
+
+def measure(method, have, want, keys):
+    start = time.time()
+    getattr(DictDiffer(have, want, keys), method)()
+    elapsed = time.time() - start
+
+    # allocations are traced on a second run, tracing slows the first down
+    tracemalloc.start()
+    getattr(DictDiffer(have, want, keys), method)()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    args = parser.parse_args()
+
+    print('%-14s %8s %-14s %10s %12s' % ('shape', 'entries', 'method', 'ms', 'peak KiB'))
+    for name, pair in SHAPES:
+        for size in args.sizes:
+            have, want, keys = pair(size)
+            for method in ('deepdiff', 'deepintersect'):
+                elapsed, peak = measure(method, have, want, keys)
+                print('%-14s %8d %-14s %10.1f %12.1f' % (name, size, method, elapsed * 1000, peak / 1024.0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Compare the per-line and the batched push of Cliconf.edit_config.
+
+With --pty, the lines are pushed to the pty stand-in of the DmOS CLI, read
+as network_cli reads them, and the running configuration and the output
+left unread are checked after each push.
+
+    python benchmarks/bench_edit_config.py --lines 2000 --latency 0.02
+    python benchmarks/bench_edit_config.py --pty --lines 500 --latency 0.001
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import time
+
+
+from fake_dmos import FakeConnection, load_cliconf
+from pty_dmos import PtyConnection
+
+
+def candidates(count):
+    return ['dot1q vlan {0} name "vlan-{0}"'.format(2 + i % 4000) for i in range(count)]
+
+
+def run(lines, latency, batch_size):
+    connection = FakeConnection(latency=latency)
+    cliconf = load_cliconf(connection)
+    start = time.time()
+    resp = cliconf.edit_config(candidates(lines), batch_size=batch_size)
+    elapsed = time.time() - start
+    if resp.get('error'):
+        raise AssertionError(resp['error'])
+    if connection.device.committed_lines != lines:
+        raise AssertionError('expected %d committed lines, got %d' % (lines, connection.device.committed_lines))
+    return elapsed, connection.round_trips
+
+
+def run_pty(lines, latency, batch_size):
+    connection = PtyConnection(latency=latency)
+    try:
+        cliconf = load_cliconf(connection)
+        start = time.time()
+        resp = cliconf.edit_config(candidates(lines), batch_size=batch_size)
+        elapsed = time.time() - start
+        if resp.get('error'):
+            raise AssertionError(resp['error'])
+        pending = connection.pending()
+        if pending:
+            raise AssertionError('output left unread: %r' % pending)
+        running = json.loads(cliconf.get('show running-config dot1q | display json'))
+        vlans = dict((vlan['vlan-id'], vlan.get('name'))
+                     for vlan in running['data']['vlan-manager:dot1q']['vlan'])
+        expected = dict((2 + i % 4000, 'vlan-{0}'.format(2 + i % 4000)) for i in range(lines))
+        if vlans != expected:
+            raise AssertionError('expected %d vlans, got %d' % (len(expected), len(vlans)))
+        return elapsed, connection.round_trips
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--batch-size', type=int, nargs='+', default=[50, 200, 1000])
+    parser.add_argument('--pty', action='store_true', help='push to the pty stand-in, --latency per line')
+    args = parser.parse_args()
+
+    push = run_pty if args.pty else run
+    print('%-12s %10s %12s' % ('mode', 'seconds', 'round trips'))
+    elapsed, trips = push(args.lines, args.latency, None)
+    print('%-12s %10.3f %12d' % ('per-line', elapsed, trips))
+    for batch_size in args.batch_size:
+        elapsed, trips = push(args.lines, args.latency, batch_size)
+        print('%-12s %10.3f %12d' % ('batch=%d' % batch_size, elapsed, trips))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Peak memory of reading the list of a 'display json' output, decoding the
+whole tree against iter_config_data decoding one element at a time, and of
+the populate_facts of the resource. The raw output is allocated before the
+measurement starts.
+
+    python benchmarks/bench_facts_memory.py --sizes 1000 4000 10000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.l2_interface.l2_interface import L2_interfaceFacts
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.l3_interface.l3_interface import L3_interfaceFacts
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.vlan.vlan import VlanFacts
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import iter_config_data
+
+from fake_dmos import FakeDmos
+from seeds import SEEDS
+
+RESOURCES = dict(
+    vlan=(VlanFacts, 'dot1q', ['vlan-manager:dot1q', 'vlan']),
+    l2_interface=(L2_interfaceFacts, 'switchport',
+                  ['dmos-base:config', 'switchport-native-vlan:switchport', 'interface']),
+    l3_interface=(L3_interfaceFacts, 'interface l3',
+                  ['dmos-base:config', 'interface', 'dmos-ip-application:l3']),
+)
+
+
+def decode_all(output, path):
+    value = json.loads(output)['data']
+    for name in path:
+        value = value[name]
+    return sum(1 for dummy in value)
+
+
+def decode_each(output, path):
+    return sum(1 for dummy in iter_config_data(output, path))
+
+
+def populate_facts(facts_class, output):
+    facts = facts_class(None).populate_facts(None, {'ansible_network_resources': {}}, output)
+    return len(list(facts['ansible_network_resources'].values())[0])
+
+
+def measure(function, *args):
+    tracemalloc.start()
+    start = time.time()
+    count = function(*args)
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resources', nargs='+', default=sorted(RESOURCES), choices=sorted(RESOURCES))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 4000, 10000])
+    args = parser.parse_args()
+
+    print('%-14s %7s %10s %-14s %10s %10s' % ('resource', 'size', 'output KiB', 'method', 'seconds', 'peak KiB'))
+    for resource in args.resources:
+        facts_class, section, path = RESOURCES[resource]
+        for size in args.sizes:
+            device = FakeDmos()
+            device.load(SEEDS[resource](size))
+            output = device.show('show running-config {0} | details | nomore | display json'.format(section))
+            for method, function, function_args in (
+                    ('decode all', decode_all, (output, path)),
+                    ('decode each', decode_each, (output, path)),
+                    ('populate_facts', populate_facts, (facts_class, output))):
+                count, elapsed, peak = measure(function, *function_args)
+                if count != size:
+                    raise AssertionError('%s: %d objects, expected %d' % (method, count, size))
+                print('%-14s %7d %10d %-14s %10.3f %10d' % (
+                    resource, size, len(output) // 1024, method, elapsed, peak // 1024))
+
+
+if __name__ == '__main__':
+    main()
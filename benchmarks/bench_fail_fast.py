@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Time to failure of Cliconf.edit_config for a push with a rejected line,
+sending all the lines and committing the accepted ones, as by default, and
+with abort_on_error, per line and batched.
+
+With --pty, the lines are pushed to the pty stand-in of the DmOS CLI, read
+as network_cli reads them, and the output left unread after the push is
+checked; the commits are not known there.
+
+    python benchmarks/bench_fail_fast.py --lines 3000 --bad-line 5 --latency 0.01
+    python benchmarks/bench_fail_fast.py --pty --lines 40 --bad-line 13 --latency 0.15 --batch-size 10
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import time
+
+
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from pty_dmos import PtyConnection
+from seeds import vlan
+
+
+def run(args, batch_size, abort_on_error):
+    lines = vlan(args.lines // 2)
+    lines[args.bad_line - 1] = 'dot1q vlam {0}'.format(args.bad_line)
+    if args.pty:
+        connection = PtyConnection(latency=args.latency)
+    else:
+        connection = FakeConnection(latency=args.latency, device=FakeDmos(commit_line_cost=args.commit_cost))
+    try:
+        cliconf = load_cliconf(connection)
+        start = time.time()
+        resp = cliconf.edit_config(lines, batch_size=batch_size, abort_on_error=abort_on_error)
+        elapsed = time.time() - start
+        if abort_on_error and resp.get('failed_line') != args.bad_line:
+            raise AssertionError('expected line %d to fail, got %r' % (args.bad_line, resp.get('error')))
+        if args.pty:
+            pending = connection.pending()
+            if pending:
+                raise AssertionError('output left unread: %r' % pending)
+            return elapsed, connection.round_trips, -1, resp
+        return elapsed, connection.round_trips, connection.device.commits, resp
+    finally:
+        if args.pty:
+            connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=3000)
+    parser.add_argument('--bad-line', type=int, default=5)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--commit-cost', type=float, default=0.0001)
+    parser.add_argument('--pty', action='store_true', help='push to the pty stand-in, --latency per line')
+    args = parser.parse_args()
+
+    print('%-24s %10s %12s %8s  %s' % ('mode', 'seconds', 'round trips', 'commits', 'reported'))
+    for batch_size in (None, args.batch_size):
+        for abort_on_error in (False, True):
+            elapsed, trips, commits, resp = run(args, batch_size, abort_on_error)
+            mode = '%s%s' % ('batch=%d' % batch_size if batch_size else 'per-line',
+                             ', abort_on_error' if abort_on_error else '')
+            reported = resp.get('error') or '; '.join(resp['response'])
+            print('%-24s %10.3f %12d %8d  %s' % (mode, elapsed, trips, commits, reported))
+
+
+if __name__ == '__main__':
+    main()
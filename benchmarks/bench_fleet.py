@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Throughput of FleetCollector over a fleet of emulated devices, against
+collecting the devices one after the other as a dmos_facts run per host
+does (capabilities, then the facts; the transfer of the module is not
+counted).
+
+    python benchmarks/bench_fleet.py --devices 200 --size 50 --latency 0.02 --workers 1 8 32
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import Facts
+from ansible_collections.datacom.dmos.plugins.plugin_utils.fleet import FleetCollector
+
+from bench_resources import FakeModule
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import SEEDS
+
+
+def per_host(devices, latency, resources):
+    trips = 0
+    for device in devices.values():
+        connection = FakeConnection(latency=latency, device=device)
+        cliconf = load_cliconf(connection)
+        cliconf.get_capabilities()
+        module = FakeModule({'gather_subset': ['!all'], 'gather_network_resources': resources}, cliconf)
+        Facts(module).get_facts(['!all'], resources)
+        trips += connection.round_trips
+    return trips
+
+
+def fleet(devices, latency, resources, workers, hosts, store_path):
+    # the connections are made in the worker processes, which add up their
+    # round trips as the collector closes them
+    trips = multiprocessing.Value('i', 0)
+
+    def connect(host):
+        connection = FakeConnection(latency=latency, device=devices[host])
+        connection.cliconf = load_cliconf(connection)
+
+        def close():
+            with trips.get_lock():
+                trips.value += connection.round_trips
+        connection.close = close
+        return connection
+
+    summary = FleetCollector(connect, workers=workers, resources=resources).collect(hosts, store_path)
+    if summary['failed']:
+        with open(store_path) as store:
+            errors = [json.loads(line).get('error') for line in store]
+        raise AssertionError('failed devices: %s' % [error for error in errors if error][:3])
+    return trips.value
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--resources', nargs='+', default=['vlan', 'l3_interface'])
+    args = parser.parse_args()
+
+    devices = {}
+    for index in range(args.devices):
+        device = FakeDmos(hostname='dmos-{0}'.format(index))
+        for resource in args.resources:
+            device.load(SEEDS[resource](args.size))
+        devices[device.hostname] = device
+
+    directory = tempfile.mkdtemp()
+    try:
+        print('%-24s %10s %12s %10s' % ('mode', 'seconds', 'round trips', 'hosts/s'))
+        start = time.time()
+        trips = per_host(devices, args.latency, args.resources)
+        elapsed = time.time() - start
+        print('%-24s %10.3f %12d %10.1f' % ('per host', elapsed, trips, len(devices) / elapsed))
+
+        for known_version in (False, True):
+            hosts = [{'host': host, 'version': '5.2.0'} if known_version else host for host in devices]
+            for workers in args.workers:
+                store_path = os.path.join(directory, 'facts.jsonl')
+                start = time.time()
+                trips = fleet(devices, args.latency, args.resources, workers, hosts, store_path)
+                elapsed = time.time() - start
+                with open(store_path) as store:
+                    if sum(1 for dummy in store) != len(devices):
+                        raise AssertionError('missing records in the store')
+                os.remove(store_path)
+                mode = 'fleet x%d%s' % (workers, ', known version' if known_version else '')
+                print('%-24s %10.3f %12d %10.1f' % (mode, elapsed, trips, len(devices) / elapsed))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Cost of parse_current_config over a synthetic keypath dump.
+
+    python benchmarks/bench_parse_current_config.py --rows 100000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import re
+import time
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.vlan.vlan import VlanArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils import utils
+
+
+DICT_KEYS = {'vlan': 'vlan_id', 'interface': 'name'}
+
+
+def previous_rows(switch_config, arg_spec, module, dict_keys):
+    # row matching replaced by the cached and dispatched table, kept for comparison
+    generated_regex = utils.parse_spec_to_regex(
+        module, arg_spec['config'], [], [], dict_keys)
+
+    res = set()
+    rows = switch_config.split("\n")
+    for row in rows:
+        for k, v in generated_regex.items():
+            aux = re.sub(k, v, row)
+            if aux != row:
+                res.add(aux)
+    return res
+
+
+def synthetic_keypaths(rows):
+    # mostly vlan rows, some nested in another node, the rest from other
+    # sections of the dump
+    out = []
+    vlan = 1
+    while len(out) < rows:
+        out.append('/vlan{{{0}}}'.format(vlan))
+        out.append('/vlan{{{0}}}/name vlan-{0}'.format(vlan))
+        out.append('/vlan{{{0}}}/interface{{gigabit-ethernet-1/1/{1}}}/tagged true'.format(vlan, vlan % 48 + 1))
+        out.append('/vlan{{{0}}}/interface{{gigabit-ethernet-1/1/{1}}}'.format(vlan, vlan % 48 + 1))
+        out.append('/interface/l3{{vlan-{0}}}/ipv4/address 10.{1}.{2}.1/24'.format(vlan, vlan // 256 % 256, vlan % 256))
+        out.append('/lldp/interface{{gigabit-ethernet-1/1/{0}}}/admin-status tx-and-rx'.format(vlan % 48 + 1))
+        out.append('/dot1q/vlan{{{0}}}/name vlan-{0}'.format(vlan + 4000))
+        vlan += 1
+    return '\n'.join(out[:rows])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    args = parser.parse_args()
+
+    dump = synthetic_keypaths(args.rows)
+    spec = VlanArgs.argument_spec
+
+    start = time.time()
+    previous = previous_rows(dump, spec, 'vlan', DICT_KEYS)
+    previous_elapsed = time.time() - start
+
+    start = time.time()
+    current = utils.match_keypath_rows(
+        dump.split('\n'), utils.get_parse_table(spec, 'vlan', DICT_KEYS))
+    current_elapsed = time.time() - start
+    if current != previous:
+        raise AssertionError('row matching differs')
+
+    start = time.time()
+    config = utils.parse_current_config(dump, spec, 'vlan', DICT_KEYS)
+    total = time.time() - start
+
+    print('rows: %d, matched: %d, vlans: %d' % (args.rows, len(current), len(config.get('config', []))))
+    print('row matching, previous:     %.3f s' % previous_elapsed)
+    print('row matching, table:        %.3f s' % current_elapsed)
+    print('parse_current_config total: %.3f s' % total)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The flows where the emulated CLI asks a question, run without answering
+it as before, with the default answers of the cliconf and with the answers
+chosen by the task:
+
+- exit: a dmos_command leaving a configuration session holding changes
+- commit: a push whose commit raises validation warnings
+- confirm: a push removing a vlan, which asks for a confirmation
+- batched: the same removal amid other lines pushed with batch_size, where
+  the line after it must not be taken as the answer
+
+    python benchmarks/bench_prompts.py --latency 0.01 --timeout-scale 0.05
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import time
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.datacom.dmos.plugins.cliconf.dmos import Cliconf
+
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import vlan
+
+
+class UnansweredCliconf(Cliconf):
+    """ The cliconf sending the commands without prompts, as before """
+
+    def _prompt_answers(self, answers=None):
+        return None, None
+
+
+def exit_flow(cliconf, answers):
+    cliconf.run_commands(['config', 'dot1q vlan 4000', 'exit'], answers=answers)
+
+
+def commit_flow(cliconf, answers):
+    return cliconf.edit_config(['dot1q vlan 4000'], answers=answers)
+
+
+def confirm_flow(cliconf, answers):
+    return cliconf.edit_config(['no dot1q vlan 2'], answers=answers)
+
+
+def batched_flow(cliconf, answers):
+    return cliconf.edit_config(['dot1q vlan 4001', 'no dot1q vlan 2', 'dot1q vlan 4002'],
+                               batch_size=10, answers=answers)
+
+
+FLOWS = [
+    ('exit', exit_flow, {}, 'uncommitted_changes'),
+    ('commit', commit_flow, {'commit_warnings': True}, 'commit_warnings'),
+    ('confirm', confirm_flow, {'confirm_commands': ('no dot1q vlan',)}, 'confirm'),
+    ('batched', batched_flow, {'confirm_commands': ('no dot1q vlan',)}, 'confirm'),
+]
+
+
+def run(args, flow, options, cls, answers):
+    device = FakeDmos(**options)
+    device.load(vlan(10))
+    connection = FakeConnection(latency=args.latency, device=device, timeout_scale=args.timeout_scale)
+    before = device.commits
+    start = time.time()
+    try:
+        resp = flow(load_cliconf(connection, cls), answers)
+        result = (resp or {}).get('error') or ', '.join((resp or {}).get('response', [])) or 'ok'
+    except AnsibleConnectionFailure as exc:
+        result = str(exc)
+    elapsed = time.time() - start
+    return elapsed, result, device.commits - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--timeout-scale', type=float, default=0.05,
+                        help='fraction of the command timeouts actually waited')
+    args = parser.parse_args()
+
+    print('%-8s %-12s %9s %8s  %s' % ('flow', 'answers', 'seconds', 'commits', 'result'))
+    for name, flow, options, question in FLOWS:
+        for mode, cls, answers in (('none', UnansweredCliconf, None),
+                                   ('default', Cliconf, None),
+                                   ('yes', Cliconf, {question: 'yes'})):
+            elapsed, result, commits = run(args, flow, options, cls, answers)
+            print('%-8s %-12s %9.3f %8d  %s' % (name, mode, elapsed, commits, result))
+
+
+if __name__ == '__main__':
+    main()
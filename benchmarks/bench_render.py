@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Time of render_config over every object of a resource, for the facts class
+of the tree and, with --baseline, for the facts class of another git
+revision, checking that both render the same facts.
+
+    python benchmarks/bench_render.py --baseline HEAD~1 --sizes vlan=10000 l3_interface=4000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import importlib
+import os
+import subprocess
+import time
+import types
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import iter_config_data
+
+from fake_dmos import FakeDmos
+from seeds import SEEDS
+
+RESOURCES = dict(
+    vlan=('dot1q', ['vlan-manager:dot1q', 'vlan']),
+    l2_interface=('switchport', ['dmos-base:config', 'switchport-native-vlan:switchport', 'interface']),
+    l3_interface=('interface l3', ['dmos-base:config', 'interface', 'dmos-ip-application:l3']),
+)
+FACTS_MODULE = 'plugins/module_utils/network/dmos/facts/{0}/{0}.py'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def facts_class(module):
+    return [value for name, value in vars(module).items() if name.endswith('Facts')][0]
+
+
+def current_facts(resource):
+    path = FACTS_MODULE.format(resource)[:-3].replace('/', '.')
+    return facts_class(importlib.import_module('ansible_collections.datacom.dmos.' + path))
+
+
+def baseline_facts(resource, revision):
+    source = subprocess.check_output(
+        ['git', 'show', '{0}:{1}'.format(revision, FACTS_MODULE.format(resource))], cwd=ROOT)
+    module = types.ModuleType('baseline_' + resource)
+    exec(compile(source, FACTS_MODULE.format(resource), 'exec'), module.__dict__)
+    return facts_class(module)
+
+
+def render(facts, objs):
+    start = time.time()
+    if hasattr(facts, 'generated_spec'):
+        # the classes rendering into the facts tree generated from the argspec
+        rendered = [facts.render_config(facts.generated_spec, each) for each in objs]
+    else:
+        rendered = [facts.render_config(each) for each in objs]
+    return time.time() - start, rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--sizes', nargs='+', default=['vlan=10000', 'l3_interface=4000'],
+                        help='resource=size pairs')
+    parser.add_argument('--baseline', help='git revision to compare with')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print('%-14s %7s %-10s %10s' % ('resource', 'size', 'revision', 'seconds'))
+    for pair in args.sizes:
+        resource, size = pair.split('=')
+        section, path = RESOURCES[resource]
+        device = FakeDmos()
+        device.load(SEEDS[resource](int(size)))
+        output = device.show('show running-config {0} | details | nomore | display json'.format(section))
+        objs = list(iter_config_data(output, path))
+
+        classes = [('tree', current_facts(resource))]
+        if args.baseline:
+            classes.append((args.baseline, baseline_facts(resource, args.baseline)))
+        results = []
+        for revision, cls in classes:
+            facts = cls(None)
+            runs = [render(facts, objs) for dummy in range(args.repeat)]
+            elapsed = min(run[0] for run in runs)
+            rendered = runs[0][1]
+            results.append(rendered)
+            print('%-14s %7d %-10s %10.3f' % (resource, len(objs), revision, elapsed))
+        if results[1:] and results[0] != results[1]:
+            raise AssertionError('%s: the revisions render different facts' % resource)
+
+
+if __name__ == '__main__':
+    main()
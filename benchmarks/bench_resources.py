@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+End-to-end cost of every resource module against the DmOS emulator.
+
+For each resource and size the emulator is seeded with that many objects
+and three tasks are run, each on a new connection:
+
+- gather: the facts of the resource
+- noop: state merged with the current configuration, nothing to push
+- merged: state merged with one object in a hundred changed
+
+    python benchmarks/bench_resources.py --sizes 10 1000 10000 --latency 0.01
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import copy
+import time
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.l2_interface.l2_interface import L2_interfaceArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.l3_interface.l3_interface import L3_interfaceArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.linkagg.linkagg import LinkaggArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.lldp.lldp import LldpArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.log.log import LogArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.sntp.sntp import SntpArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.twamp.twamp import TwampArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.vlan.vlan import VlanArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.l2_interface.l2_interface import L2_interface
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.l3_interface.l3_interface import L3_interface
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.linkagg.linkagg import Linkagg
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.lldp.lldp import Lldp
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.log.log import Log
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.sntp.sntp import Sntp
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.twamp.twamp import Twamp
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.vlan.vlan import Vlan
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import Facts
+
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import MUTATIONS, SEEDS
+
+RESOURCES = dict(
+    vlan=(Vlan, VlanArgs),
+    l2_interface=(L2_interface, L2_interfaceArgs),
+    l3_interface=(L3_interface, L3_interfaceArgs),
+    linkagg=(Linkagg, LinkaggArgs),
+    lldp=(Lldp, LldpArgs),
+    log=(Log, LogArgs),
+    sntp=(Sntp, SntpArgs),
+    twamp=(Twamp, TwampArgs),
+)
+
+
+class FakeModule(object):
+    """ The parts of AnsibleModule used by the resource modules """
+
+    def __init__(self, params, connection, check_mode=False):
+        self.params = params
+        self.check_mode = check_mode
+        self._diff = False
+        self._connection = connection
+
+    def fail_json(self, **kwargs):
+        raise AssertionError(kwargs.get('msg'))
+
+
+def new_connection(device, latency, **options):
+    connection = FakeConnection(latency=latency, device=device)
+    return connection, load_cliconf(connection, **options)
+
+
+def gather(device, resource, latency, **options):
+    connection, cliconf = new_connection(device, latency, **options)
+    module = FakeModule({'gather_subset': ['!all'], 'gather_network_resources': [resource]}, cliconf)
+    start = time.time()
+    facts, dummy = Facts(module).get_facts(['!all'], [resource])
+    elapsed = time.time() - start
+    return elapsed, connection.round_trips, facts['ansible_network_resources'].get(resource, [])
+
+
+def merged(device, resource, latency, want, **options):
+    config_class, args_class = RESOURCES[resource]
+    # as written in a playbook, without the options that are not set
+    want = [utils.remove_empties(obj) for obj in want]
+    params = utils.validate_config(args_class.argument_spec, {'config': want, 'state': 'merged'})
+    connection, cliconf = new_connection(device, latency, **options)
+    module = FakeModule(params, cliconf)
+    start = time.time()
+    result = config_class(module).execute_module()
+    elapsed = time.time() - start
+    return elapsed, connection.round_trips, len(result['commands']), params['config']
+
+
+def normalize(value):
+    # the order of lists of values is not significant
+    if isinstance(value, dict):
+        return dict((key, normalize(item)) for key, item in value.items())
+    if isinstance(value, list):
+        items = [normalize(item) for item in value]
+        if not any(isinstance(item, (dict, list)) for item in items):
+            items.sort()
+        return items
+    return value
+
+
+def run(resource, size, latency):
+    device = FakeDmos()
+    device.load(SEEDS[resource](size))
+
+    rows = []
+    elapsed, trips, facts = gather(device, resource, latency)
+    rows.append(('gather', elapsed, trips, 0))
+
+    elapsed, trips, commands, dummy = merged(device, resource, latency, copy.deepcopy(facts))
+    if commands:
+        raise AssertionError('%s: %d commands for an unchanged configuration' % (resource, commands))
+    rows.append(('noop', elapsed, trips, commands))
+
+    want = MUTATIONS[resource](copy.deepcopy(facts))
+    elapsed, trips, commands, want = merged(device, resource, latency, want)
+    if not commands:
+        raise AssertionError('%s: no commands for a changed configuration' % resource)
+    rows.append(('merged', elapsed, trips, commands))
+
+    dummy, dummy, facts = gather(device, resource, latency)
+    if normalize(facts) != normalize(want):
+        raise AssertionError('%s: the device does not match the pushed configuration' % resource)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resources', nargs='+', default=sorted(RESOURCES), choices=sorted(RESOURCES))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 10000])
+    parser.add_argument('--latency', type=float, default=0.0)
+    args = parser.parse_args()
+
+    print('%-14s %7s %-8s %10s %12s %9s' % ('resource', 'size', 'task', 'seconds', 'round trips', 'commands'))
+    for resource in args.resources:
+        for size in args.sizes:
+            for task, elapsed, trips, commands in run(resource, size, args.latency):
+                print('%-14s %7d %-8s %10.3f %12d %9d' % (resource, size, task, elapsed, trips, commands))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Compare the sequential and the pipelined Cliconf.run_commands against the
+pty stand-in of a DmOS CLI.
+
+    python benchmarks/bench_run_commands.py --commands 40 --latency 0.01 --rtt 0.02
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import time
+
+from fake_dmos import load_cliconf
+from pty_dmos import PtyConnection
+
+
+def commands(count):
+    return ['show interface {0}'.format(i) for i in range(count)]
+
+
+def run(args, pipeline):
+    connection = PtyConnection(latency=args.latency, rtt=args.rtt,
+                               buffer_read_timeout=args.buffer_read_timeout,
+                               output_lines=args.output_lines)
+    try:
+        cliconf = load_cliconf(connection)
+        connection.round_trips = 0
+        start = time.time()
+        responses = cliconf.run_commands(commands(args.commands), pipeline=pipeline)
+        elapsed = time.time() - start
+        pending = connection.pending()
+        if pending:
+            raise AssertionError('output left unread: %r' % pending)
+        return elapsed, connection.round_trips, responses
+    finally:
+        connection.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--commands', type=int, default=40)
+    parser.add_argument('--latency', type=float, default=0.01,
+                        help='seconds the CLI takes to run each command')
+    parser.add_argument('--rtt', type=float, default=0.02,
+                        help='seconds each write takes to reach the CLI')
+    parser.add_argument('--buffer-read-timeout', type=float, default=0.1)
+    parser.add_argument('--output-lines', type=int, default=20)
+    args = parser.parse_args()
+
+    print('%-12s %10s %12s' % ('mode', 'seconds', 'round trips'))
+    elapsed, trips, sequential = run(args, False)
+    print('%-12s %10.3f %12d' % ('sequential', elapsed, trips))
+    elapsed, trips, pipelined = run(args, True)
+    print('%-12s %10.3f %12d' % ('pipelined', elapsed, trips))
+    if pipelined != sequential:
+        raise AssertionError('pipelined outputs differ from the sequential ones')
+
+
+if __name__ == '__main__':
+    main()
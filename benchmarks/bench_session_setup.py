@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Bytes and time of the show commands of a play on an emulated device whose
+pager stops the outputs longer than a screen:
+
+- pipes: the session is not set up, the show commands are piped to nomore
+- setup: the session is set up by the on_open_shell of the terminal plugin
+  and the show commands are sent without the pipe
+
+The play gathers the facts of every resource, reads the running-config as
+dmos_config does, and runs 'show running-config' as a user dmos_command
+task. A previous row sends that command as it was sent before, reaching
+the pager and waiting for the command timeout, of which --timeout-scale
+is actually waited.
+
+    python benchmarks/bench_session_setup.py --size 1000 --latency 0.01
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import time
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import Facts
+
+from bench_resources import FakeModule
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import SEEDS
+
+USER_COMMAND = 'show running-config'
+
+
+def new_device(args):
+    device = FakeDmos(screen_length=args.screen_length)
+    for seed in SEEDS.values():
+        device.load(seed(args.size))
+    return device
+
+
+def play(args, terminal):
+    connection = FakeConnection(latency=args.latency, device=new_device(args), terminal=terminal,
+                                timeout_scale=args.timeout_scale)
+    cliconf = load_cliconf(connection)
+    start = time.time()
+    module = FakeModule({'gather_subset': ['!all'], 'gather_network_resources': ['all']}, cliconf)
+    facts, dummy = Facts(module).get_facts(['!all'], ['all'])
+    cliconf.get_config()
+    output = cliconf.run_commands([USER_COMMAND])[0]
+    elapsed = time.time() - start
+    if not facts['ansible_network_resources'].get('vlan') or '--More--' in output:
+        raise AssertionError('incomplete outputs')
+    return elapsed, connection
+
+
+def previous(args):
+    connection = FakeConnection(latency=args.latency, device=new_device(args),
+                                timeout_scale=args.timeout_scale)
+    start = time.time()
+    try:
+        connection.send(USER_COMMAND)
+        result = 'ok'
+    except AnsibleConnectionFailure:
+        result = 'timeout'
+    return time.time() - start, connection, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--screen-length', type=int, default=24)
+    parser.add_argument('--timeout-scale', type=float, default=0.05,
+                        help='fraction of the command timeouts actually waited')
+    args = parser.parse_args()
+
+    print('%-22s %9s %12s %11s %14s  %s' % ('mode', 'seconds', 'round trips', 'bytes sent', 'bytes received',
+                                            'user command'))
+    elapsed, connection, result = previous(args)
+    print('%-22s %9.3f %12d %11d %14d  %s' % ('previous, user show', elapsed, connection.round_trips,
+                                              connection.bytes_sent, connection.bytes, result))
+    for mode, terminal in (('pipes', False), ('setup', True)):
+        elapsed, connection = play(args, terminal)
+        print('%-22s %9.3f %12d %11d %14d  %s' % (mode, elapsed, connection.round_trips,
+                                                  connection.bytes_sent, connection.bytes, 'ok'))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Repeated facts runs over a fleet of emulated devices, every run on new
+connections, with the running-config snapshots of the
+config_snapshots option and without them:
+
+- cold: nothing saved yet
+- unchanged: no commit on any device since the last run
+- changed: a commit on one device in ten
+
+    python benchmarks/bench_snapshots.py --devices 20 --size 1000 --latency 0.01
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import Facts
+
+from bench_resources import FakeModule, new_connection
+from fake_dmos import FakeDmos
+from seeds import SEEDS
+
+
+def gather_fleet(devices, latency, resources, **options):
+    trips = 0
+    received = 0
+    facts = []
+    start = time.time()
+    for device in devices:
+        connection, cliconf = new_connection(device, latency, **options)
+        module = FakeModule({'gather_subset': ['!all'], 'gather_network_resources': resources}, cliconf)
+        result, dummy = Facts(module).get_facts(['!all'], resources)
+        facts.append(result['ansible_network_resources'])
+        trips += connection.round_trips
+        received += connection.bytes
+    return time.time() - start, trips, received, facts
+
+
+def run(args, snapshots):
+    devices = []
+    for index in range(args.devices):
+        device = FakeDmos(hostname='dmos-{0}'.format(index))
+        for seed in SEEDS.values():
+            device.load(seed(args.size))
+        devices.append(device)
+
+    rows = []
+    directory = tempfile.mkdtemp()
+    options = {'config_cache': True, 'config_snapshots': directory} if snapshots else {}
+    try:
+        for run_name in ('cold', 'unchanged', 'changed'):
+            if run_name == 'changed':
+                for device in devices[::10]:
+                    device.load(['dot1q vlan 4094 name "changed"'])
+            elapsed, trips, received, facts = gather_fleet(devices, args.latency, args.resources, **options)
+            expected = [gather_fleet([device], 0.0, args.resources)[3][0] for device in devices]
+            if snapshots and facts != expected:
+                raise AssertionError('%s: the facts differ from the device' % run_name)
+            rows.append((run_name, elapsed, trips, received))
+    finally:
+        shutil.rmtree(directory)
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--devices', type=int, default=20)
+    parser.add_argument('--size', type=int, default=1000)
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--resources', nargs='+', default=['all'])
+    args = parser.parse_args()
+
+    print('%-10s %-10s %10s %12s %12s' % ('snapshots', 'run', 'seconds', 'round trips', 'KiB read'))
+    for snapshots in (False, True):
+        for run_name, elapsed, trips, received in run(args, snapshots):
+            print('%-10s %-10s %10.3f %12d %12d' % (
+                'on' if snapshots else 'off', run_name, elapsed, trips, received // 1024))
+
+
+if __name__ == '__main__':
+    main()
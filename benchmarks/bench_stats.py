@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Memory held by the history of the cliconf over a long play pushing vlans
+line by line, with the unbounded history of CliconfBase and with the
+bounded one, then the statistics of the connection returned by get_stats.
+
+The play runs --plays pushes of --lines lines on one connection, each
+followed by a command leaving a configuration session holding changes, so
+a question of the CLI is answered. The memory is the one allocated since
+the cliconf was created, including the configuration of the emulator.
+
+    python benchmarks/bench_stats.py --plays 10 --lines 10000 --response-logging
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import json
+import time
+import tracemalloc
+
+from ansible_collections.datacom.dmos.plugins.cliconf.dmos import Cliconf
+
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import vlan
+
+
+class UnboundedCliconf(Cliconf):
+    """ The cliconf keeping every command in its history, as before """
+
+    def __init__(self, *args, **kwargs):
+        super(UnboundedCliconf, self).__init__(*args, **kwargs)
+        self.history = list()
+
+
+def run(args, cls):
+    connection = FakeConnection(latency=args.latency, device=FakeDmos())
+    tracemalloc.start()
+    cliconf = load_cliconf(connection, cls)
+    if args.response_logging:
+        cliconf.enable_response_logging()
+    start = time.time()
+    for play in range(args.plays):
+        lines = vlan(args.lines // 2)
+        if play % 2:
+            lines = ['no ' + line for line in lines if line.startswith('dot1q vlan')]
+        resp = cliconf.edit_config(lines)
+        if resp.get('error'):
+            raise AssertionError(resp['error'])
+        cliconf.run_commands(['config', 'dot1q vlan 4000', 'exit'])
+    elapsed = time.time() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, current, peak, cliconf
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--plays', type=int, default=10)
+    parser.add_argument('--lines', type=int, default=10000)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--response-logging', action='store_true',
+                        help='keep the responses in the history, as with persistent_log_messages')
+    args = parser.parse_args()
+
+    print('%-10s %9s %14s %12s %10s' % ('history', 'seconds', 'entries', 'memory MiB', 'peak MiB'))
+    for mode, cls in (('unbounded', UnboundedCliconf), ('bounded', Cliconf)):
+        elapsed, current, peak, cliconf = run(args, cls)
+        print('%-10s %9.3f %14d %12.2f %10.2f' % (mode, elapsed, len(cliconf.history),
+                                                  current / 2.0 ** 20, peak / 2.0 ** 20))
+
+    print('\nget_stats of the bounded cliconf:')
+    print(json.dumps(cliconf.get_stats(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Failure detection time of the commands of a play on a flaky link, with the
+single persistent_command_timeout the play needs for its large commit and
+with the timeout classes of the cliconf (the timeout_classes option), which
+only ever shorten it.
+
+The play reads the running-config, runs show commands and pushes a large
+configuration in batches with one commit. A first play on the connection
+runs without failures, so the classes learn the timings of the device.
+Then the response of the first command of each class is lost, and the
+timeout waited for it is shown. --timeout-scale is the fraction of the
+timeouts actually waited.
+
+    python benchmarks/bench_timeouts.py --lines 20000 --play-timeout 600
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible_collections.datacom.dmos.plugins.cliconf.dmos import _command_class
+
+from fake_dmos import FakeConnection, FakeDmos, load_cliconf
+from seeds import vlan
+
+CLASSES = ['show', 'config', 'commit', 'config_read']
+
+
+def play(cliconf, lines, batch_size):
+    cliconf.get_config()
+    cliconf.run_commands(['show platform', 'show interface gigabit-ethernet-1/1/1'])
+    resp = cliconf.edit_config(lines, batch_size=batch_size)
+    if resp.get('error'):
+        raise AnsibleConnectionFailure(resp['error'])
+
+
+def hang_first(command_class):
+    state = {'hung': False}
+
+    def hang(command):
+        if state['hung'] or _command_class(command) != command_class:
+            return False
+        state['hung'] = True
+        return True
+    return hang
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=20000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--commit-cost', type=float, default=0.0001,
+                        help='seconds of the emulated commit per line')
+    parser.add_argument('--play-timeout', type=int, default=600)
+    parser.add_argument('--timeout-scale', type=float, default=0.0)
+    args = parser.parse_args()
+
+    print('%-12s %-14s %14s  %s' % ('lost', 'timeouts', 'seconds waited', 'result'))
+    waited = dict((mode, []) for mode in ('play', 'classes'))
+    for command_class in CLASSES:
+        for mode, timeout_classes in (('play', False), ('classes', True)):
+            device = FakeDmos(commit_line_cost=args.commit_cost)
+            connection = FakeConnection(latency=args.latency, device=device, command_timeout=args.play_timeout,
+                                        timeout_scale=args.timeout_scale)
+            cliconf = load_cliconf(connection, timeout_classes=timeout_classes)
+            # the first play sets the configuration, the others push it
+            # again so the commit has the same size
+            play(cliconf, vlan(args.lines // 2), args.batch_size)
+            device.tree = {}
+
+            connection.hang = hang_first(command_class)
+            try:
+                play(cliconf, vlan(args.lines // 2), args.batch_size)
+                result = 'ok'
+            except AnsibleConnectionFailure as exc:
+                result = str(exc).splitlines()[0]
+            seconds = sum(connection.timeout_waits)
+            waited[mode].append(seconds)
+            print('%-12s %-14s %14d  %s' % (command_class, mode, seconds, result))
+
+    for mode, seconds in waited.items():
+        print('mean seconds to detect a lost response, %s timeouts: %.1f' % (mode, sum(seconds) / len(seconds)))
+
+    print('\ntimings learned by the classes:')
+    for name, timing in sorted(cliconf.get_command_timings().items()):
+        print('%-12s %s' % (name, ', '.join('%s=%s' % item for item in sorted(timing.items()))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Share of the facts gathering spent turning the rendered objects into facts,
+validating them against the argspec (the validate_facts option set) and
+coercing them as trusted data of the device (the default), checking that
+both give the same facts.
+
+    python benchmarks/bench_validate.py --sizes 1000 10000
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import importlib
+import time
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.render import Renderer
+
+from bench_resources import RESOURCES, gather
+from fake_dmos import FakeDmos
+from seeds import SEEDS
+
+FACTS_MODULE = 'ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.{0}.{0}'
+
+
+def run(device, resource, validate):
+    # accumulates the time spent in Renderer.to_facts
+    to_facts = Renderer.to_facts
+    timing = [0.0]
+
+    def timed_to_facts(renderer, objs, validate=False):
+        start = time.time()
+        try:
+            return to_facts(renderer, objs, validate)
+        finally:
+            timing[0] += time.time() - start
+
+    Renderer.to_facts = timed_to_facts
+    try:
+        elapsed, dummy, facts = gather(device, resource, 0.0, validate_facts=validate)
+    finally:
+        Renderer.to_facts = to_facts
+    return elapsed, timing[0], facts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--resources', nargs='+', default=sorted(RESOURCES), choices=sorted(RESOURCES))
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    print('%-14s %7s %-9s %10s %10s %7s' % ('resource', 'size', 'facts', 'seconds', 'to_facts', 'share'))
+    for resource in args.resources:
+        importlib.import_module(FACTS_MODULE.format(resource))
+        for size in args.sizes:
+            device = FakeDmos()
+            device.load(SEEDS[resource](size))
+            results = []
+            for mode, validate in (('validated', True), ('trusted', False)):
+                elapsed, to_facts, facts = run(device, resource, validate)
+                results.append(facts)
+                print('%-14s %7d %-9s %10.3f %10.3f %6.0f%%' % (
+                    resource, size, mode, elapsed, to_facts, 100 * to_facts / elapsed))
+            if results[0] != results[1]:
+                raise AssertionError('%s: trusted facts differ from the validated ones' % resource)
+
+
+if __name__ == '__main__':
+    main()
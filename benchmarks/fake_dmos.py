@@ -0,0 +1,817 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Offline emulator of the DmOS CLI.
+
+FakeDmos keeps the running configuration as the data tree shown by
+'show running-config | display json', described by a schema mapping the
+CLI commands of every resource to the tree. It understands config, commit,
+abort and end, 'no' commands, 'show configuration' for the changes of the
+configuration session, and 'show running-config [section]' with
+'| display json' and '| display curly-braces'. With a screen_length, the
+pager stops long outputs not piped to nomore, until the session runs
+'screen-length 0'. It asks whether to commit the changes of a session left
+with end or exit, and optionally to confirm given commands and commits.
+
+FakeConnection is a stand-in for the network_cli connection used by
+CliconfBase.send_command, charging a fixed latency for every round trip so
+the cost of the command flow can be measured without a switch. As
+network_cli, it raises AnsibleConnectionFailure with the echoed lines and
+their outputs when an output matches the terminal_stderr_re option, or the
+patterns of the terminal plugin when it is not set, and after command_timeout when an output stops at the
+pager or at a question it has no answer for, or the device takes longer
+to run it. With terminal, it opens the session with the on_open_shell of
+the terminal plugin. As network_cli, it sets a SIGALRM handler while it
+reads, so it only runs in the main thread of a process.
+
+load_cliconf creates the cliconf plugin on a connection with the given
+options, registering the options of the plugin as the plugin loader does.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import collections
+import copy
+import json
+import re
+import signal
+import time
+
+from ansible import constants as C
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.parsing.yaml.loader import AnsibleLoader
+from ansible_collections.datacom.dmos.plugins.cliconf import dmos as cliconf_dmos
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import (
+    get_command_list_from_curly_braces,
+    get_command_tokens,
+)
+from ansible_collections.datacom.dmos.plugins.plugin_utils.cli import ERROR_RES, compile_patterns
+from ansible_collections.datacom.dmos.plugins.terminal.dmos import TerminalModule
+
+ERROR_UNKNOWN_COMMAND = 'syntax error: unknown command'
+MORE = '--More--'
+ABORTED_BY_USER = 'Aborted: by user'
+CLICONF_NAME = 'datacom.dmos.dmos'
+
+
+class Node(object):
+    """ Node of the configuration schema
+
+    :param words: the CLI keywords of the node, none for nodes that only
+                  exist in the data tree
+    :param name: the name of the node in the data tree
+    :param kind: container, list (its key is the word following the
+                 keywords), leaf (its value is the word following the
+                 keywords), flag (present or not) or bool (true or not)
+    :param key: the name of the list key in the data tree
+    :param value: int, str, or enabled (enabled/disabled as a boolean)
+    :param choices: values accepted by a leaf without keywords
+    """
+
+    def __init__(self, words, name, kind='container', children=(), key=None,
+                 value='str', choices=None):
+        self.words = tuple(words.split()) if words else ()
+        self.name = name
+        self.kind = kind
+        self.children = children
+        self.key = key
+        self.value = value
+        self.choices = choices
+
+    def parse_value(self, token):
+        if self.value == 'int':
+            return int(token)
+        if self.value == 'enabled':
+            return token == 'enabled'
+        return token
+
+    def format_value(self, value):
+        if self.value == 'enabled':
+            return 'enabled' if value else 'disabled'
+        value = to_text(value)
+        if not value or ' ' in value:
+            return '"{0}"'.format(value)
+        return value
+
+
+def container(words, name, *children):
+    return Node(words, name, children=children)
+
+
+def keyed_list(words, name, key, *children, **kwargs):
+    return Node(words, name, 'list', children, key=key, **kwargs)
+
+
+def leaf(words, name, value='str', choices=None):
+    return Node(words, name, 'leaf', value=value, choices=choices)
+
+
+def flag(words, name):
+    return Node(words, name, 'flag')
+
+
+def boolean(words, name):
+    return Node(words, name, 'bool')
+
+
+def _twamp_addresses(words, name):
+    return container(words, name,
+                     keyed_list('client-address', 'client-address', 'ip',
+                                leaf(None, 'state', choices=('enable', 'disable'))),
+                     keyed_list('client-network', 'client-network', 'ip',
+                                leaf(None, 'state', choices=('enable', 'disable'))))
+
+
+def _twamp_endpoints(words, name):
+    return container(words, name,
+                     keyed_list('source-address', 'source-address', 'ip'),
+                     keyed_list('target-address', 'target-address', 'ip'))
+
+
+SCHEMA = container(
+    None, 'data',
+    container('dot1q', 'vlan-manager:dot1q',
+              keyed_list('vlan', 'vlan', 'vlan-id',
+                         leaf('name', 'name'),
+                         keyed_list('interface', 'interface', 'interface-name',
+                                    leaf(None, 'tagged-untagged', choices=('tagged', 'untagged'))),
+                         value='int')),
+    container('link-aggregation', 'lacp:link-aggregation',
+              container(None, 'system', leaf('system-priority', 'priority', 'int')),
+              container('interface', 'interface',
+                        keyed_list('lag', 'lag', 'lag-id',
+                                   leaf('administrative-status', 'administrative-status'),
+                                   container(None, 'interface-lag-config',
+                                             leaf('description', 'description'),
+                                             leaf('load-balance', 'load-balance'),
+                                             leaf('mode', 'mode'),
+                                             leaf('period', 'period')),
+                                   container(None, 'lag',
+                                             container('maximum-active', 'maximum-active',
+                                                       leaf('links', 'links', 'int')),
+                                             container('minimum-active', 'minimum-active',
+                                                       leaf('links', 'links', 'int'))),
+                                   keyed_list('interface', 'interface-config', 'interface-name',
+                                              leaf('port-priority', 'port-priority', 'int')),
+                                   value='int'))),
+    container(None, 'dmos-base:config',
+              container('switchport', 'switchport-native-vlan:switchport',
+                        keyed_list('interface', 'interface', 'interface-name',
+                                   container('native-vlan', 'native-vlan',
+                                             leaf('vlan-id', 'vlan-id', 'int')),
+                                   flag('qinq', 'switchport-qinq:qinq'),
+                                   container('storm-control', 'dmos-storm-control:storm-control',
+                                             container('broadcast', 'broadcast', leaf(None, 'percent')),
+                                             container('multicast', 'multicast', leaf(None, 'percent')),
+                                             container('unicast', 'unicast', leaf(None, 'percent'))),
+                                   leaf('tpid', 'switchport-tpid:tpid'))),
+              container('interface', 'interface',
+                        keyed_list('l3', 'dmos-ip-application:l3', 'name',
+                                   leaf('description', 'description'),
+                                   leaf('ip-mtu', 'ip-mtu', 'int'),
+                                   container('lower-layer-if', 'lower-layer-if',
+                                             leaf('vlan', 'vlan', 'int')),
+                                   container('vlan-link-detect', 'vlan-link-detect',
+                                             leaf(None, 'enabled', 'enabled')),
+                                   leaf('vrf', 'vrf'),
+                                   container('ipv4', 'ipv4',
+                                             container('address', 'address',
+                                                       keyed_list('secondary', 'secondary', 'ip'),
+                                                       leaf(None, 'ip'))),
+                                   container('ipv6', 'ipv6',
+                                             boolean('enable', 'enable'),
+                                             keyed_list('address', 'address', 'ip'),
+                                             container('nd', 'nd',
+                                                       container('ra', 'ra',
+                                                                 leaf('lifetime', 'lifetime', 'int'),
+                                                                 leaf('max-interval', 'max-interval', 'int'),
+                                                                 leaf('min-interval', 'min-interval', 'int'),
+                                                                 boolean('suppress', 'suppress'),
+                                                                 container('mtu', 'mtu', boolean('suppress', 'suppress')),
+                                                                 keyed_list('prefix', 'prefix', 'ip',
+                                                                            boolean('no-advertise', 'no-advertise'),
+                                                                            boolean('no-autoconfig', 'no-autoconfig'),
+                                                                            boolean('off-link', 'off-link'))))))),
+              container('lldp', 'dmos-lldp:lldp',
+                        keyed_list('interface', 'dmos-lldp-interface:interface', 'interface-name',
+                                   leaf('admin-status', 'admin-status'),
+                                   flag('notification', 'notification'),
+                                   container('tlvs-tx', 'tlvs-tx',
+                                             boolean('port-description', 'port-description'),
+                                             boolean('system-capabilities', 'system-capabilities'),
+                                             boolean('system-description', 'system-description'),
+                                             boolean('system-name', 'system-name'))),
+                        leaf('message-fast-tx', 'message-fast-tx', 'int'),
+                        leaf('message-tx-hold-multiplier', 'message-tx-hold-multiplier', 'int'),
+                        leaf('message-tx-interval', 'message-tx-interval', 'int'),
+                        leaf('notification-interval', 'notification-interval', 'int'),
+                        leaf('reinit-delay', 'reinit-delay', 'int'),
+                        leaf('tx-credit-max', 'tx-credit-max', 'int'),
+                        leaf('tx-fast-init', 'tx-fast-init', 'int')),
+              container('log', 'dmos-log-manager:log',
+                        leaf('severity', 'severity'),
+                        container('syslog', 'syslog', keyed_list(None, 'host', 'address'))),
+              container('sntp', 'dmos-sntp-interface:sntp',
+                        flag('authenticate', 'authenticate'),
+                        keyed_list('authentication-key', 'authentication-key', 'id',
+                                   leaf('md5', 'md5'), value='int'),
+                        flag('client', 'client'),
+                        leaf('max-poll', 'max-poll', 'int'),
+                        leaf('min-poll', 'min-poll', 'int'),
+                        keyed_list('server', 'server', 'address', leaf('key', 'key', 'int')),
+                        container('source', 'source',
+                                  container('ipv4', 'ipv4', container('address', 'address', leaf(None, 'ip'))),
+                                  container('ipv6', 'ipv6', container('address', 'address', leaf(None, 'ip'))))),
+              container('oam', 'oam',
+                        container('twamp', 'dmos-twamp-app:twamp',
+                                  container('reflector', 'reflector',
+                                            leaf('administrative-status', 'administrative-status'),
+                                            leaf('port', 'port', 'int'),
+                                            _twamp_addresses('ipv4', 'ipv4'),
+                                            _twamp_addresses('ipv6', 'ipv6')),
+                                  container('sender', 'dmos-twamp-app-client:sender',
+                                            leaf('administrative-status', 'administrative-status'),
+                                            keyed_list('connection', 'connection', 'id',
+                                                       leaf('administrative-status', 'administrative-status'),
+                                                       _twamp_endpoints('ipv4', 'ipv4'),
+                                                       _twamp_endpoints('ipv6', 'ipv6'),
+                                                       leaf('number-of-packets', 'number-of-packets', 'int'),
+                                                       leaf('server-port', 'server-port', 'int'),
+                                                       leaf('test-interval', 'test-interval', 'int'),
+                                                       keyed_list('test-session', 'test-session', 'id',
+                                                                  _twamp_endpoints('ipv4', 'ipv4'),
+                                                                  _twamp_endpoints('ipv6', 'ipv6'),
+                                                                  leaf('dscp', 'dscp', 'int'),
+                                                                  leaf('max-port', 'max-port', 'int'),
+                                                                  leaf('min-port', 'min-port', 'int'),
+                                                                  leaf('packet-size', 'packet-size', 'int'),
+                                                                  value='int'),
+                                                       value='int'))))),
+)
+
+
+def _match(nodes, tokens, path):
+    # depth first match of the tokens against the schema, appending to path
+    # the (node, key or value) steps, returns whether all tokens matched
+    if not tokens:
+        return True
+
+    for node in nodes:
+        count = len(node.words)
+        if tuple(tokens[:count]) != node.words:
+            continue
+        rest = tokens[count:]
+
+        if node.kind == 'container':
+            if not count and not node.children:
+                continue
+            path.append((node, None))
+            if count and not rest:
+                return True
+            if _match(node.children, rest, path):
+                return True
+            path.pop()
+        elif node.kind == 'list':
+            if not rest:
+                if count:
+                    path.append((node, None))
+                    return True
+                continue
+            try:
+                key = node.parse_value(rest[0])
+            except ValueError:
+                continue
+            path.append((node, key))
+            if _match(node.children, rest[1:], path):
+                return True
+            path.pop()
+        elif node.kind == 'leaf':
+            if not rest:
+                if count:
+                    path.append((node, None))
+                    return True
+                continue
+            if len(rest) != 1 or (node.choices and rest[0] not in node.choices):
+                continue
+            try:
+                value = node.parse_value(rest[0])
+            except ValueError:
+                continue
+            path.append((node, value))
+            return True
+        elif count and not rest:
+            path.append((node, True))
+            return True
+
+    return False
+
+
+def parse_command(tokens):
+    """ Match a command to the schema
+
+    :returns: the list of (node, key or value) steps, or None
+    """
+    path = []
+    if _match(SCHEMA.children, list(tokens), path):
+        return path
+    return None
+
+
+class FakeDmos(object):
+    """ In-memory DmOS device
+
+    The tree holds dicts, lists being dicts of entries by key, so the
+    commands are applied in constant time whatever the configuration size.
+    """
+
+    def __init__(self, hostname='DM4610', version='5.2.0', show_lines=5,
+                 commit_line_cost=0.0, max_commit_lines=None, fail_commits=(), screen_length=0,
+                 confirm_commands=(), commit_warnings=False):
+        self.hostname = hostname
+        self.version = version
+        self.show_lines = show_lines
+        # the pager stops the show outputs longer than this many lines at
+        # --More--, unless piped to nomore; 0 does not page
+        self.screen_length = screen_length
+        self.screen_width = 80
+        # the commands asking for a confirmation in a configuration session,
+        # by prefix, and whether the commits raise validation warnings
+        self.confirm_commands = confirm_commands
+        self.commit_warnings = commit_warnings
+        # called with the answer to the question asked by the last command
+        self.question = None
+        self.tree = {}
+        self.candidate = None
+        self.commits = 0
+        self.committed_lines = 0
+        # seconds a commit takes per line of the session
+        self.commit_line_cost = commit_line_cost
+        # commits of larger sessions are aborted, as a device running out of
+        # time or memory validating them
+        self.max_commit_lines = max_commit_lines
+        # the commit attempts, counted from 1, that are aborted
+        self.fail_commits = set(fail_commits)
+        self.commit_attempts = 0
+
+    # configuration
+
+    def apply(self, command, tree=None):
+        """ Apply a configuration command to the tree
+
+        :returns: an error message, or '' when the command was applied
+        """
+        tree = self.tree if tree is None else tree
+        tokens = get_command_tokens(command)
+        negate = bool(tokens) and tokens[0] == 'no'
+        if negate:
+            tokens = tokens[1:]
+        path = parse_command(tokens) if tokens else None
+        if path is None:
+            return ERROR_UNKNOWN_COMMAND
+
+        if negate:
+            self._delete(tree, path)
+        else:
+            self._set(tree, path)
+        return ''
+
+    def _walk(self, tree, path, create):
+        # returns the parent dict of the last step and the name of its entry
+        current = tree
+        for node, key in path[:-1]:
+            if create:
+                current = current.setdefault(node.name, {})
+            else:
+                current = current.get(node.name)
+                if current is None:
+                    return None
+            if node.kind == 'list':
+                if create:
+                    current = current.setdefault(key, {node.key: key})
+                else:
+                    current = current.get(key)
+                    if current is None:
+                        return None
+        return current
+
+    def _set(self, tree, path):
+        parent = self._walk(tree, path, True)
+        node, value = path[-1]
+        if node.kind == 'container':
+            parent.setdefault(node.name, {})
+        elif node.kind == 'list':
+            entries = parent.setdefault(node.name, {})
+            if value is not None:
+                entries.setdefault(value, {node.key: value})
+        elif node.kind == 'leaf':
+            if value is not None:
+                parent[node.name] = value
+        elif node.kind == 'flag':
+            parent[node.name] = [None]
+        else:
+            parent[node.name] = True
+
+    def _delete(self, tree, path):
+        parent = self._walk(tree, path, False)
+        if parent is None:
+            return
+        node, value = path[-1]
+        if node.kind == 'list' and value is not None:
+            entries = parent.get(node.name)
+            if entries is not None:
+                entries.pop(value, None)
+        else:
+            parent.pop(node.name, None)
+
+    def load(self, commands):
+        """ Apply commands straight to the running configuration """
+        for command in commands:
+            error = self.apply(command)
+            if error:
+                raise ValueError('{0}: {1}'.format(error, command))
+        self.commits += 1
+
+    # rendering
+
+    def section(self, tokens):
+        """ The part of the tree under the section words, with its parents
+
+        :returns: the pruned tree, or None when the section is unknown
+        """
+        if not tokens:
+            return self.tree
+        path = parse_command(tokens)
+        if path is None:
+            return None
+
+        result = {}
+        current_tree = self.tree
+        current_result = result
+        for index, (node, key) in enumerate(path):
+            value = current_tree.get(node.name)
+            if value is None:
+                return {}
+            if index == len(path) - 1:
+                if node.kind == 'list' and key is not None:
+                    value = {key: value[key]} if key in value else {}
+                current_result[node.name] = value
+            elif node.kind == 'list':
+                current_tree = value.get(key)
+                if current_tree is None:
+                    return {}
+                current_result = current_result.setdefault(node.name, {}).setdefault(
+                    key, {node.key: key})
+            else:
+                current_tree = value
+                current_result = current_result.setdefault(node.name, {})
+        return result
+
+    def to_json(self, tree, node=SCHEMA):
+        data = {}
+        children = dict((child.name, child) for child in node.children)
+        for name, value in tree.items():
+            child = children.get(name)
+            if child is None:
+                # the key of a list entry
+                data[name] = value
+            elif child.kind == 'list':
+                data[name] = [self.to_json(entry, child) for entry in value.values()]
+            elif child.kind == 'container':
+                data[name] = self.to_json(value, child)
+            else:
+                data[name] = value
+        return data
+
+    def to_curly_braces(self, tree, node=SCHEMA, indent=''):
+        lines = []
+        for child in node.children:
+            value = tree.get(child.name)
+            if value is None:
+                continue
+            words = ' '.join(child.words)
+            if child.kind == 'container':
+                inner = self.to_curly_braces(value, child, indent + ('  ' if words else ''))
+                if words:
+                    lines.append('{0}{1} {{'.format(indent, words))
+                    lines.extend(inner)
+                    lines.append('{0}}}'.format(indent))
+                else:
+                    lines.extend(inner)
+            elif child.kind == 'list':
+                for key, entry in value.items():
+                    head = ' '.join(filter(None, [words, child.format_value(key)]))
+                    inner = self.to_curly_braces(entry, child, indent + '  ')
+                    if inner:
+                        lines.append('{0}{1} {{'.format(indent, head))
+                        lines.extend(inner)
+                        lines.append('{0}}}'.format(indent))
+                    else:
+                        lines.append('{0}{1};'.format(indent, head))
+            elif child.kind == 'leaf':
+                lines.append('{0}{1};'.format(
+                    indent, ' '.join(filter(None, [words, child.format_value(value)]))))
+            elif value:
+                lines.append('{0}{1};'.format(indent, words))
+        return lines
+
+    # CLI
+
+    @property
+    def prompt(self):
+        if self.candidate is not None:
+            return '{0}(config)# '.format(self.hostname)
+        return '{0}# '.format(self.hostname)
+
+    def execute(self, line):
+        """ Run a CLI line, returning its output """
+        if self.question is not None:
+            # the line is the answer to the pending question
+            on_answer, self.question = self.question, None
+            return on_answer(line)
+        if line == 'config':
+            self.candidate = []
+        elif line == 'commit':
+            if self.candidate is None:
+                return ERROR_UNKNOWN_COMMAND
+            if not self.candidate:
+                return '% No modifications to commit.'
+            if self.commit_warnings:
+                return self.ask('Warning: the configuration raises validation warnings\nProceed? [yes,no]',
+                                lambda answer: self.commit() if answer == 'yes' else ABORTED_BY_USER)
+            return self.commit()
+        elif line == 'abort' or (line in ('end', 'exit') and not self.candidate):
+            self.candidate = None
+        elif line in ('end', 'exit') and self.candidate:
+            return self.ask('Uncommitted changes found, commit them? [yes/no/CANCEL]', self.leave)
+        elif line.startswith('show'):
+            return self.page(line, self.show(line))
+        elif self.candidate is None and line.startswith('screen-length '):
+            self.screen_length = int(line.split()[1])
+        elif self.candidate is None and line.startswith('screen-width '):
+            self.screen_width = int(line.split()[1])
+        elif self.candidate is None and line in ('autowizard false', 'complete-on-space false'):
+            pass
+        elif not line:
+            return ''
+        elif self.candidate is not None:
+            if any(line.startswith(command) for command in self.confirm_commands):
+                return self.ask('Are you sure? [no,yes]',
+                                lambda answer: self.add(line) if answer == 'yes' else ABORTED_BY_USER)
+            return self.add(line)
+        else:
+            return ERROR_UNKNOWN_COMMAND
+        return ''
+
+    def ask(self, question, on_answer):
+        """ Ask a question, the next line is given to on_answer """
+        self.question = on_answer
+        return question
+
+    def add(self, line):
+        """ Add a line to the configuration session """
+        error = self.apply(line, {})
+        if error:
+            return error
+        self.candidate.append(line)
+        return ''
+
+    def commit(self):
+        self.commit_attempts += 1
+        if self.commit_line_cost:
+            time.sleep(self.commit_line_cost * len(self.candidate))
+        if self.commit_attempts in self.fail_commits:
+            return 'Aborted: commit attempt {0} failed'.format(self.commit_attempts)
+        if self.max_commit_lines and len(self.candidate) > self.max_commit_lines:
+            return 'Aborted: too many changes in the transaction'
+        for command in self.candidate:
+            self.apply(command)
+        self.commits += 1
+        self.committed_lines += len(self.candidate)
+        self.candidate = []
+        return 'Commit complete.'
+
+    def leave(self, answer):
+        """ Leave the configuration session holding changes """
+        if answer == 'yes':
+            output = self.commit()
+            if output != 'Commit complete.':
+                return output
+        elif answer != 'no':
+            return ''
+        self.candidate = None
+        return ''
+
+    def show(self, line):
+        pipes = [part.strip() for part in line.split('|')]
+        tokens = get_command_tokens(pipes[0])
+        if tokens == ['show', 'platform']:
+            return ('Chassis/Slot  Product model\n'
+                    '1/1           DM4610\n'
+                    'DmOS Version {0}, build 1234'.format(self.version))
+        if tokens == ['show', 'configuration'] and self.candidate is not None:
+            return self.show_configuration()
+        if tokens == ['show', 'configuration', 'commit', 'list']:
+            return self.show_commit_list()
+        if tokens[:2] != ['show', 'running-config']:
+            return '\n'.join('{0} line {1}'.format(pipes[0], index)
+                             for index in range(self.show_lines))
+
+        tree = self.section(tokens[2:])
+        if tree is None:
+            return ERROR_UNKNOWN_COMMAND
+        if 'display json' in pipes:
+            return json.dumps({'data': self.to_json(tree)}, indent=2)
+        return '\n'.join(self.to_curly_braces(tree))
+
+
+    def page(self, line, output):
+        """ The output as the pager shows it, up to the first --More-- """
+        if not self.screen_length or 'nomore' in [part.strip() for part in line.split('|')]:
+            return output
+        lines = output.split('\n')
+        if len(lines) <= self.screen_length:
+            return output
+        return '\n'.join(lines[:self.screen_length] + [MORE])
+
+    def to_commands(self, tree):
+        return get_command_list_from_curly_braces('\n'.join(self.to_curly_braces(tree)))
+
+    def show_configuration(self):
+        """ The changes of the configuration session, as commands """
+        candidate = copy.deepcopy(self.tree)
+        for command in self.candidate:
+            self.apply(command, candidate)
+
+        running = self.to_commands(self.tree)
+        running_set = set(running)
+        changed = self.to_commands(candidate)
+        changed_set = set(changed)
+        diff = ['no ' + command for command in running if command not in changed_set]
+        diff.extend(command for command in changed if command not in running_set)
+        if not diff:
+            return '% No configuration changes found.'
+        return '\n'.join(diff)
+
+
+    def show_commit_list(self):
+        if not self.commits:
+            return '% No commits found.'
+        lines = ['SNo. ID       User       Client      Time Stamp          Label       Comment',
+                 '~~~~ ~~       ~~~~       ~~~~~~      ~~~~~~~~~~          ~~~~~       ~~~~~~~']
+        for index, commit in enumerate(range(self.commits, max(0, self.commits - 20), -1)):
+            lines.append('{0:<4} {1:<8} admin      cli         2020-01-01 00:00:00'.format(
+                index, 10000 + commit))
+        return '\n'.join(lines)
+
+
+class FakeConnection(object):
+    """ Fake network_cli connection with a configurable round trip latency
+    """
+
+    def __init__(self, latency=0.0, device=None, terminal=False, command_timeout=30, timeout_scale=1.0):
+        self.latency = latency
+        self.device = device if device is not None else FakeDmos()
+        # the persistent_command_timeout option, and the fraction of it
+        # actually slept when a response does not come
+        self.command_timeout = command_timeout
+        self.timeout_scale = timeout_scale
+        # the terminal_stderr_re option, the patterns of the terminal plugin
+        # when not set
+        self.terminal_stderr_re = None
+        self.timeout_waits = []
+        # called with each command, the response of the commands it is true
+        # for is lost, as on a flaky link
+        self.hang = None
+        self.round_trips = 0
+        self.lines = 0
+        self.bytes = 0
+        self.bytes_sent = 0
+        self.commands = collections.Counter()
+        # stands for the ssh shell of network_cli, replaced on reconnect
+        self._ssh_shell = object()
+        if terminal:
+            # the session setup of network_cli when it opens the shell
+            self._terminal = TerminalModule(self)
+            self._terminal.on_open_shell()
+
+    def exec_command(self, cmd):
+        return self.send(cmd)
+
+    def reconnect(self):
+        self._ssh_shell = object()
+
+    def get_option(self, option):
+        if option == 'host':
+            return self.device.hostname
+        if option == 'persistent_command_timeout':
+            return self.command_timeout
+        if option == 'terminal_stderr_re':
+            return self.terminal_stderr_re
+        raise KeyError(option)
+
+    def set_option(self, option, value):
+        if option == 'persistent_command_timeout':
+            self.command_timeout = value
+        elif option == 'terminal_stderr_re':
+            self.terminal_stderr_re = value
+        else:
+            raise KeyError(option)
+
+    def is_error(self, response):
+        patterns = ERROR_RES
+        if self.terminal_stderr_re:
+            patterns = compile_patterns(self.terminal_stderr_re)
+        return any(regex.search(to_bytes(response)) for regex in patterns)
+
+    def send(self, command, prompt=None, answer=None, newline=True, sendonly=False,
+             prompt_retry_check=False, check_all=False, strip_prompt=True):
+        # raises ValueError outside of the main thread, as network_cli
+        # setting its buffer read timeout
+        signal.signal(signal.SIGALRM, signal.getsignal(signal.SIGALRM) or signal.SIG_DFL)
+        responses = []
+        transcript = []
+        errored = False
+        self.bytes_sent += len(to_bytes(command)) + 1
+        start = time.time()
+        for line in to_text(command).split('\n'):
+            self.lines += 1
+            self.commands[line.strip()] += 1
+            transcript.append(self.device.prompt + line)
+            response = self.device.execute(line.strip())
+            if response:
+                responses.append(response)
+                transcript.append(response)
+                errored = errored or self.is_error(response)
+
+        if sendonly:
+            return None
+
+        if self.device.question is not None:
+            # answered as network_cli does, once per command
+            answer_line = self.answer(responses[-1], prompt, answer)
+            if answer_line is not None:
+                transcript.append(answer_line)
+                response = self.device.execute(answer_line)
+                if response:
+                    responses.append(response)
+                    transcript.append(response)
+                    errored = errored or self.is_error(response)
+
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        response = '\n'.join(responses)
+        self.bytes += len(response)
+        if (response.endswith(MORE) or self.device.question is not None or
+                (self.hang is not None and self.hang(to_text(command))) or
+                time.time() - start > self.command_timeout):
+            # the prompt network_cli waits for never comes in time
+            self.timeout_waits.append(self.command_timeout)
+            time.sleep(max(0, start + self.command_timeout * self.timeout_scale - time.time()))
+            raise AnsibleConnectionFailure(
+                'command timeout triggered, timeout value is {0} secs.'.format(self.command_timeout))
+        if errored:
+            raise AnsibleConnectionFailure('\n'.join(transcript + [self.device.prompt]))
+        if not strip_prompt:
+            return '\n'.join(transcript + [self.device.prompt])
+        return response
+
+    def receive(self, command=None, prompts=None, answer=None, newline=True,
+                prompt_retry_check=False, check_all=False, strip_prompt=True):
+        # every output was returned by send, the next prompt never comes
+        self.round_trips += 1
+        self.timeout_waits.append(self.command_timeout)
+        time.sleep(self.command_timeout * self.timeout_scale)
+        raise AnsibleConnectionFailure(
+            'command timeout triggered, timeout value is {0} secs.'.format(self.command_timeout))
+
+    def answer(self, question, prompt, answer):
+        # the answer of the first prompt matching the question, or None
+        if prompt is None:
+            return None
+        prompts = prompt if isinstance(prompt, list) else [prompt]
+        answers = answer if isinstance(answer, list) else [answer]
+        for index, pattern in enumerate(prompts):
+            if re.search(to_bytes(pattern), to_bytes(question)):
+                return to_text(answers[index] if len(answers) > index else answers[0])
+        return None
+
+
+def load_cliconf(connection, cls=cliconf_dmos.Cliconf, **options):
+    """ Return the cliconf plugin, or the subclass cls of it, on connection
+    with the options given, the others left to their defaults, variables
+    and environment variables
+    """
+    cliconf = cls(connection)
+    cliconf._load_name = CLICONF_NAME
+    # the plugin type comes from the class name, so the subclasses of the
+    # benchmarks get the options registered under their own type
+    if not C.config.get_configuration_definitions(cliconf.plugin_type, CLICONF_NAME):
+        doc = AnsibleLoader(cliconf_dmos.DOCUMENTATION).get_single_data()
+        C.config.initialize_plugin_configuration_definitions(cliconf.plugin_type, CLICONF_NAME, doc['options'])
+    cliconf.set_options(direct=options)
+    return cliconf
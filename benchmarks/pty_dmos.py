@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+DmOS CLI stand-in running on a local pty.
+
+The CLI side is this same script started with --serve: it prints the
+prompt, reads a line, echoes it and prints the output of the FakeDmos
+emulator after a configurable per-command latency, like the DmOS shell
+does over SSH.
+
+PtyConnection drives it the way network_cli drives the SSH shell: the
+command is written at once, and the response is read until the prompt
+is matched and no more data arrives within buffer_read_timeout. As
+network_cli, it answers the prompts given with the command, raises
+AnsibleConnectionFailure with the last 256 bytes read as soon as a prompt
+follows an output matching the terminal_stderr_re option, or the patterns
+of the terminal plugin when it is not set, leaving the rest of the output
+unread, and raises after persistent_command_timeout without a prompt.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import argparse
+import os
+import re
+import select
+import subprocess
+import sys
+import termios
+import time
+
+from ansible.errors import AnsibleConnectionFailure
+from ansible.module_utils._text import to_bytes, to_text
+from ansible_collections.datacom.dmos.plugins.plugin_utils.cli import ERROR_RES, PROMPT_RES, compile_patterns
+
+from fake_dmos import FakeDmos
+from seeds import SEEDS
+
+
+def serve(latency, output_lines, seed):
+    stdin = os.fdopen(sys.stdin.fileno(), 'rb', 0)
+    stdout = os.fdopen(sys.stdout.fileno(), 'wb', 0)
+    device = FakeDmos(show_lines=output_lines)
+    if seed:
+        device.load(seed_commands(seed))
+
+    stdout.write(b'Welcome to the DmOS stand-in\n' + to_bytes(device.prompt))
+    buffered = b''
+    while True:
+        while b'\n' not in buffered:
+            data = stdin.read(4096)
+            if not data:
+                return
+            buffered += data
+        line, buffered = buffered.split(b'\n', 1)
+        command = to_text(line).strip()
+        if command in ('exit', 'quit'):
+            return
+
+        stdout.write(line + b'\n')
+        if latency:
+            time.sleep(latency)
+        output = device.execute(command)
+        if device.question is not None:
+            # the question waits for the answer on its own line
+            stdout.write(to_bytes(output))
+            continue
+        if output:
+            stdout.write(to_bytes(output) + b'\n')
+        stdout.write(to_bytes(device.prompt))
+
+
+def seed_commands(seed):
+    # 'resource:count,...' to the commands configuring count objects of each
+    commands = []
+    for item in seed.split(','):
+        resource, count = item.split(':')
+        commands.extend(SEEDS[resource](int(count)))
+    return commands
+
+
+class PtyConnection(object):
+    """ network_cli like connection to the pty stand-in
+
+    Each send pays rtt before the command reaches the CLI, which charges
+    latency for every command it runs.
+    """
+
+    def __init__(self, latency=0.0, rtt=0.0, buffer_read_timeout=0.1, output_lines=5, seed=None,
+                 command_timeout=30):
+        self.rtt = rtt
+        self.buffer_read_timeout = buffer_read_timeout
+        self.round_trips = 0
+        self._prompt_re = PROMPT_RES
+        self._options = {'persistent_command_timeout': command_timeout, 'terminal_stderr_re': None}
+
+        master, slave = os.openpty()
+        attrs = termios.tcgetattr(slave)
+        attrs[3] &= ~termios.ECHO
+        termios.tcsetattr(slave, termios.TCSANOW, attrs)
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), '--serve',
+             '--latency', str(latency), '--output-lines', str(output_lines),
+             '--seed', seed or ''],
+            stdin=slave, stdout=slave, stderr=slave, close_fds=True)
+        os.close(slave)
+        self._master = master
+        self.receive()
+
+    def get_option(self, option):
+        return self._options[option]
+
+    def set_option(self, option, value):
+        if option not in self._options:
+            raise KeyError(option)
+        self._options[option] = value
+
+    def pending(self):
+        """ The output left unread by the last command """
+        data = b''
+        while select.select([self._master], [], [], self.buffer_read_timeout)[0]:
+            data += os.read(self._master, 4096)
+        return to_text(data, errors='surrogate_then_replace')
+
+    def close(self):
+        os.write(self._master, b'exit\r')
+        self._process.wait()
+        os.close(self._master)
+
+    def send(self, command, prompt=None, answer=None, newline=True, sendonly=False,
+             prompt_retry_check=False, check_all=False, strip_prompt=True):
+        if self.rtt:
+            time.sleep(self.rtt)
+        os.write(self._master, to_bytes(command) + b'\r')
+        if sendonly:
+            return None
+        response = self.receive(command, prompt, answer, newline, prompt_retry_check, check_all,
+                                strip_prompt)
+        return to_text(response, errors='surrogate_then_replace')
+
+    def receive(self, command=None, prompts=None, answer=None, newline=True,
+                prompt_retry_check=False, check_all=False, strip_prompt=True):
+        self.round_trips += 1
+        option = self._options['terminal_stderr_re']
+        error_re = compile_patterns(option) if option else ERROR_RES
+        command_timeout = self._options['persistent_command_timeout']
+        if prompts is not None and not isinstance(prompts, list):
+            prompts = [prompts]
+        answers = answer if isinstance(answer, list) else [answer]
+        handled = False
+        errored = None
+        response = b''
+        matched = None
+        while True:
+            timeout = self.buffer_read_timeout if matched else command_timeout
+            ready, dummy, dummy = select.select([self._master], [], [], timeout)
+            if not ready:
+                if matched:
+                    return self._sanitize(response, command, matched, strip_prompt)
+                raise AnsibleConnectionFailure(
+                    'command timeout triggered, timeout value is {0} secs.'.format(command_timeout))
+            # read as network_cli does, so the prompt of a line may be
+            # matched before the output of the next one is read
+            data = os.read(self._master, 256)
+            if not data:
+                raise EOFError('DmOS stand-in exited')
+            response += data
+            matched = None
+            window = response[-256:]
+            if prompts and not handled:
+                for index, pattern in enumerate(prompts):
+                    if re.search(to_bytes(pattern), window, re.I):
+                        reply = answers[index] if len(answers) > index else answers[0]
+                        os.write(self._master, to_bytes(reply) + (b'\r' if newline else b''))
+                        handled = True
+                        break
+            if any(regex.search(window) for regex in error_re):
+                errored = window
+            for regex in self._prompt_re:
+                match = regex.search(window)
+                if match:
+                    matched = match.group()
+                    break
+            if matched and errored:
+                raise AnsibleConnectionFailure(to_text(errored, errors='surrogate_then_replace'))
+
+    def _sanitize(self, response, command, matched, strip_prompt):
+        cleaned = []
+        for line in response.splitlines():
+            if command and line.strip() == to_bytes(command).strip():
+                continue
+            if strip_prompt and matched.strip() in line:
+                continue
+            cleaned.append(line)
+        return b'\n'.join(cleaned).strip()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--serve', action='store_true')
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--output-lines', type=int, default=5)
+    parser.add_argument('--seed', default='',
+                        help='objects to configure, e.g. vlan:1000,l3_interface:100')
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.latency, args.output_lines, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Configurations of a given size for every resource, as the CLI commands
+seeding the emulator, and the changes applied to their facts to get a
+desired configuration differing from the device.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+def _interface(index, kind='gigabit-ethernet'):
+    return '{0}-1/{1}/{2}'.format(kind, index // 48 + 1, index % 48 + 1)
+
+
+def _ipv4(index, last=1):
+    return '10.{0}.{1}.{2}'.format(index // 256 % 256, index % 256, last)
+
+
+def vlan(count):
+    commands = []
+    for index in range(count):
+        vlan_cmd = 'dot1q vlan {0}'.format(index + 2)
+        commands.append('{0} name "vlan-{1}"'.format(vlan_cmd, index + 2))
+        commands.append('{0} interface {1} tagged'.format(vlan_cmd, _interface(index)))
+    return commands
+
+
+def l2_interface(count):
+    commands = []
+    for index in range(count):
+        intf_cmd = 'switchport interface {0}'.format(_interface(index))
+        commands.append('{0} native-vlan vlan-id {1}'.format(intf_cmd, index % 4000 + 2))
+        commands.append('{0} storm-control broadcast 10'.format(intf_cmd))
+        commands.append('{0} tpid 0x8100'.format(intf_cmd))
+    return commands
+
+
+def l3_interface(count):
+    commands = []
+    for index in range(count):
+        intf_cmd = 'interface l3 l3-{0}'.format(index)
+        commands.append('{0} description "interface {1}"'.format(intf_cmd, index))
+        commands.append('{0} lower-layer-if vlan {1}'.format(intf_cmd, index % 4000 + 2))
+        commands.append('{0} ipv4 address {1}/24'.format(intf_cmd, _ipv4(index)))
+    return commands
+
+
+def linkagg(count):
+    commands = ['link-aggregation system-priority 100']
+    for index in range(count):
+        lag_cmd = 'link-aggregation interface lag {0}'.format(index + 1)
+        commands.append('{0} description "lag {1}"'.format(lag_cmd, index + 1))
+        commands.append('{0} mode active'.format(lag_cmd))
+        commands.append('{0} interface {1} port-priority 10'.format(
+            lag_cmd, _interface(index, 'ten-gigabit-ethernet')))
+    return commands
+
+
+def lldp(count):
+    commands = ['lldp message-fast-tx 3']
+    for index in range(count):
+        intf_cmd = 'lldp interface {0}'.format(_interface(index))
+        commands.append('{0} admin-status tx-and-rx'.format(intf_cmd))
+        commands.append('{0} notification'.format(intf_cmd))
+    return commands
+
+
+def log(count):
+    commands = ['log severity error']
+    for index in range(count):
+        commands.append('log syslog {0}'.format(_ipv4(index)))
+    return commands
+
+
+def sntp(count):
+    commands = ['sntp client', 'sntp authentication-key 1 md5 secret']
+    for index in range(count):
+        commands.append('sntp server {0} key 1'.format(_ipv4(index)))
+    return commands
+
+
+def twamp(count):
+    commands = ['oam twamp sender administrative-status up']
+    for index in range(count):
+        conn_cmd = 'oam twamp sender connection {0}'.format(index + 1)
+        commands.append('{0} ipv4 target-address {1}'.format(conn_cmd, _ipv4(index)))
+        commands.append('{0} server-port 862'.format(conn_cmd))
+        commands.append('{0} test-session 1 dscp 10'.format(conn_cmd))
+    return commands
+
+
+SEEDS = dict(
+    vlan=vlan,
+    l2_interface=l2_interface,
+    l3_interface=l3_interface,
+    linkagg=linkagg,
+    lldp=lldp,
+    log=log,
+    sntp=sntp,
+    twamp=twamp,
+)
+
+
+def _changed(objs):
+    # the objects changed by a mutation, one in a hundred
+    return objs[:max(1, len(objs) // 100)]
+
+
+def _mutate_list(key, value):
+    def mutate(facts):
+        for obj in _changed(facts):
+            obj[key] = value(obj)
+        return facts
+    return mutate
+
+
+def _mutate_nested(name, key, value):
+    def mutate(facts):
+        for obj in _changed(facts[0][name]):
+            obj[key] = value(obj)
+        return facts
+    return mutate
+
+
+def _mutate_twamp(facts):
+    for obj in _changed(facts[0]['sender']['connection']):
+        obj['server_port'] = 863
+    return facts
+
+
+def _mutate_log(facts):
+    syslog = facts[0]['syslog']
+    syslog.extend('172.16.{0}.1'.format(index) for index in range(len(_changed(syslog))))
+    return facts
+
+
+MUTATIONS = dict(
+    vlan=_mutate_list('name', lambda obj: 'changed-{0}'.format(obj['vlan_id'])),
+    l2_interface=_mutate_list('native_vlan_id', lambda obj: 4094),
+    l3_interface=_mutate_list('description', lambda obj: 'changed {0}'.format(obj['name'])),
+    linkagg=_mutate_nested('lag', 'description', lambda obj: 'changed {0}'.format(obj['lag_id'])),
+    lldp=_mutate_nested('interface', 'admin_status', lambda obj: 'tx-only'),
+    log=_mutate_log,
+    sntp=_mutate_nested('server', 'key_id', lambda obj: 2),
+    twamp=_mutate_twamp,
+)
@@ -18,60 +18,1092 @@ description:
   - This dmos plugin provides low level abstraction apis for
     sending and receiving CLI commands from Datacom DmOS network devices.
 version_added: "2.10"
+options:
+  config_cache:
+    description:
+      - Keep the running-config read by a task in the persistent connection
+        and reuse it in the next tasks on the same device, until a
+        configuration is pushed through it.
+      - Only enable it when the device is not changed outside of the play.
+    type: boolean
+    default: false
+    env:
+      - name: ANSIBLE_DMOS_CONFIG_CACHE
+    vars:
+      - name: ansible_dmos_config_cache
+  config_snapshots:
+    description:
+      - With I(config_cache), a directory where the running-config read from
+        each device is saved along with its last commit, as listed by
+        C(show configuration commit list). The facts of later runs, even on
+        new connections, only check the last commit and read the
+        running-config again when it moved.
+    type: path
+    env:
+      - name: ANSIBLE_DMOS_CONFIG_SNAPSHOTS
+    vars:
+      - name: ansible_dmos_config_snapshots
+  history_size:
+    description:
+      - The commands and responses kept in the history of the connection.
+        The older ones are dropped, so a long play does not grow the
+        persistent connection.
+    type: int
+    default: 1000
+    env:
+      - name: ANSIBLE_DMOS_HISTORY_SIZE
+    vars:
+      - name: ansible_dmos_history_size
+  timeout_classes:
+    description:
+      - Wait for each command the timeout of its class instead of the
+        C(persistent_command_timeout) of the connection, so a lost response
+        to a short command is detected before it.
+      - A command is waited for the I(timeout_show), I(timeout_config),
+        I(timeout_commit) or I(timeout_config_read) of its class, or three
+        times the slowest seconds per line seen for the class on the
+        connection, times its lines, when that is longer.
+      - The timeout of a class only ever shortens the
+        C(persistent_command_timeout), which also bounds the whole task in
+        C(ansible-connection), so a command is never waited for longer than
+        it. Set it high enough for the largest commit.
+    type: boolean
+    default: false
+    env:
+      - name: ANSIBLE_DMOS_TIMEOUT_CLASSES
+    vars:
+      - name: ansible_dmos_timeout_classes
+  timeout_show:
+    description:
+      - With I(timeout_classes), the least seconds waited for a show
+        command.
+    type: int
+    default: 10
+    env:
+      - name: ANSIBLE_DMOS_TIMEOUT_SHOW
+    vars:
+      - name: ansible_dmos_timeout_show
+  timeout_config:
+    description:
+      - With I(timeout_classes), the least seconds waited for a
+        configuration line.
+    type: int
+    default: 10
+    env:
+      - name: ANSIBLE_DMOS_TIMEOUT_CONFIG
+    vars:
+      - name: ansible_dmos_timeout_config
+  timeout_commit:
+    description:
+      - With I(timeout_classes), the least seconds waited for a commit.
+    type: int
+    default: 30
+    env:
+      - name: ANSIBLE_DMOS_TIMEOUT_COMMIT
+    vars:
+      - name: ansible_dmos_timeout_commit
+  timeout_config_read:
+    description:
+      - With I(timeout_classes), the least seconds waited for a
+        running-config read.
+    type: int
+    default: 30
+    env:
+      - name: ANSIBLE_DMOS_TIMEOUT_CONFIG_READ
+    vars:
+      - name: ansible_dmos_timeout_config_read
+  verify_after:
+    description:
+      - Read the C(after) result of the resource modules again from the
+        device, instead of deriving it from the C(before) facts whenever
+        possible.
+    type: boolean
+    default: false
+    env:
+      - name: ANSIBLE_DMOS_VERIFY_AFTER
+    vars:
+      - name: ansible_dmos_verify_after
+  validate_facts:
+    description:
+      - Validate the facts read from the device against the argspec of the
+        resource. By default they are only coerced to the option types, as
+        data of the device is trusted. Meant for debugging facts that look
+        wrong.
+    type: boolean
+    default: false
+    env:
+      - name: ANSIBLE_DMOS_VALIDATE_FACTS
+    vars:
+      - name: ansible_dmos_validate_facts
+  stats:
+    description:
+      - Return the statistics of the connection in C(stats) from the
+        modules, as returned by its C(get_stats) method.
+    type: boolean
+    default: false
+    env:
+      - name: ANSIBLE_DMOS_STATS
+    vars:
+      - name: ansible_dmos_stats
 """
 
 
+import inspect
+import os
 import re
+import tempfile
 import time
 import json
 
+from bisect import bisect_left
+from collections import deque
+from contextlib import contextmanager
+
 from ansible.errors import AnsibleConnectionFailure
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.common._collections_compat import Mapping
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.config import dumps
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import to_list
 from ansible.plugins.cliconf import CliconfBase
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import get_command_tokens
+from ansible_collections.datacom.dmos.plugins.plugin_utils.cli import (
+    compile_patterns,
+    is_error,
+    is_prompt,
+    starts_with_prompt,
+)
+
+# the nomore pipe of a show command, not needed once the terminal plugin
+# disabled the paging of the session
+_NOMORE_RE = re.compile(r'\s*\|\s*nomore(?=\s*(?:\||$))')
+
+# a row of 'show configuration commit list', the newest commit first
+_COMMIT_ROW_RE = re.compile(r'^\s*\d+\s+(\S+)\s')
+
+# the questions the DmOS CLI asks before going on, by name, with the
+# answer given unless the task chooses another one: declining, so nothing
+# the task did not ask for is committed or removed
+_PROMPT_ANSWERS = [
+    # leaving a configuration session holding changes, e.g. on exit
+    ('uncommitted_changes', r'Uncommitted changes found, commit them\? \[yes/no/CANCEL\]', 'no'),
+    # a commit raising validation warnings
+    ('commit_warnings', r'Proceed\? \[yes,no\]', 'no'),
+    # commands removing or resetting objects
+    ('confirm', r'Are you sure\? \[no,yes\]', 'no'),
+]
+_QUESTION_RES = [(name, re.compile(prompt)) for name, prompt, dummy in _PROMPT_ANSWERS]
+
+# the output of a line whose question was declined, e.g. by the default
+# answer to confirm: the line did nothing
+_DECLINED_RE = re.compile(r'^\s*Aborted: by user\s*$', re.M)
+
+# the first word of the commands which may ask one of the questions: a
+# batch never holds them, as the CLI would take the line following one as
+# its answer
+_PROMPTING_WORDS = frozenset(('no', 'exit', 'end', 'commit'))
+
+# the timeout classes of the commands sent, with the seconds per line of
+# the command, or of the configuration session for a commit, expected
+# before any is seen. The least seconds a command of the class is waited
+# for is the timeout_<class> option.
+_TIMEOUT_CLASSES = {
+    'show': 0.0,
+    'config': 0.0,
+    'commit': 0.01,
+    'config_read': 0.0,
+}
+
+# times the slowest seconds per line seen for the class, as the timeout
+_TIMEOUT_MARGIN = 3
+
+# the upper bounds, in seconds, of the buckets of the latency histogram of
+# each class, a last bucket holding the slower commands
+_LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 5, 10, 60)
+
+# the commands and responses kept in the history until the history_size
+# option is set, the older ones dropped
+_HISTORY_SIZE = 1000
+
+# the options read by the modules through get_module_options
+_MODULE_OPTIONS = ('verify_after', 'validate_facts', 'stats')
+
+
+def _command_class(command):
+    if command.startswith('show running-config'):
+        return 'config_read'
+    if command.startswith('show'):
+        return 'show'
+    if command == 'commit':
+        return 'commit'
+    return 'config'
+
+
+def _may_prompt(command):
+    # whether the CLI may ask a question before running the command
+    words = command.split(None, 1)
+    return bool(words) and words[0] in _PROMPTING_WORDS
+
+
+# the number of words naming an object, for the commands where it is not
+# the first three, e.g. 'link-aggregation interface lag 1'
+_OBJECT_KEY_LENGTHS = {
+    ('link-aggregation', 'interface'): 4,
+    ('oam', 'twamp'): 5,
+}
+
+
+def _object_key(command):
+    # the words of a command naming the object it configures
+    tokens = get_command_tokens(command)
+    if tokens and tokens[0] == 'no':
+        tokens = tokens[1:]
+    return tuple(tokens[:_OBJECT_KEY_LENGTHS.get(tuple(tokens[:2]), 3)])
+
+
+# a pattern network_cli never finds in an output, replacing its error
+# patterns while the output of a batch is read
+_NO_ERROR_RE = [{'pattern': '(?!)'}]
+
+
+def _split_batch(commands, output):
+    # the output lines of each command of a batch, split at the echo of the
+    # commands, and whether the prompt following the last one was read
+    outputs = []
+    complete = False
+    for line in output.splitlines():
+        if len(outputs) < len(commands) and line.rstrip().endswith(commands[len(outputs)].strip()):
+            outputs.append([])
+            complete = False
+        elif is_prompt(line):
+            complete = len(outputs) == len(commands)
+        elif outputs:
+            outputs[-1].append(line)
+    return outputs, complete
+
+
+def _prompts_read(output):
+    # the prompts read in the output of a batch, one following each line,
+    # leaving out the one the first line may be echoed after
+    return sum(1 for line in output.splitlines()[1:] if starts_with_prompt(line))
 
 
 class Cliconf(CliconfBase):
 
+    def __init__(self, *args, **kwargs):
+        super(Cliconf, self).__init__(*args, **kwargs)
+        # running-config outputs by command, kept by the persistent connection
+        # so consecutive tasks on the same device reuse them
+        self._config_cache = {}
+        # the file saving the cache for the next connections, and the commit
+        # of the device the cached outputs belong to
+        self._snapshot_file = None
+        self._snapshot_commit_id = None
+        # device info and capabilities of the connection, read once per ssh
+        # session along with the number of reads, for get_cache_stats
+        self._device_info = None
+        self._capabilities = None
+        self._cache_session = None
+        self._cache_stats = {'device_info_reads': 0, 'config_reads': 0, 'config_cache_hits': 0}
+        # the prompts and answers of the questions of the CLI, for the
+        # commands sent without their own
+        self._questions = self._prompt_answers()
+        # the timings of the commands sent by timeout class, and the lines
+        # sent to the configuration session since it was opened
+        self._timings = dict((name, {'count': 0, 'total': 0.0, 'max': 0.0, 'last': 0.0, 'timeouts': 0,
+                                     'seconds_per_line': 0.0, 'bytes_sent': 0, 'bytes_received': 0,
+                                     'histogram': [0] * (len(_LATENCY_BUCKETS) + 1)})
+                             for name in _TIMEOUT_CLASSES)
+        self._session_lines = 0
+        # whether send() of the connection can keep the prompts in the
+        # response, checked on the first batch
+        self._keeps_prompts = None
+        # the seconds of the commands a question of the CLI was answered for
+        self._prompt_waits = dict((name, {'count': 0, 'total': 0.0, 'max': 0.0})
+                                  for name, dummy, dummy in _PROMPT_ANSWERS)
+        # the history of the commands sent is bounded, so a long play does
+        # not grow the persistent connection, and so is the one the
+        # connection keeps of the commands it writes
+        self._history_size = _HISTORY_SIZE
+        self._history_commands = 0
+        self.history = deque(maxlen=self._history_size)
+        if isinstance(getattr(self._connection, '_history', None), list):
+            self._connection._history = deque(self._connection._history, maxlen=self._history_size)
+
+    def set_options(self, task_keys=None, var_options=None, direct=None):
+        super(Cliconf, self).set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        size = max(self.get_option('history_size'), 1)
+        if size != self._history_size:
+            self._history_size = size
+            self.history = deque(self.history, maxlen=size)
+            if isinstance(getattr(self._connection, '_history', None), deque):
+                self._connection._history = deque(self._connection._history, maxlen=size)
+
+    def get_module_options(self):
+        """ Return the options of the plugin read by the modules, e.g. stats
+
+        :rtype: dict
+        """
+        return dict((name, self.get_option(name)) for name in _MODULE_OPTIONS)
+
+    def _prompt_answers(self, answers=None):
+        """ Return the prompts and answers of the questions of the CLI
+
+        :param answers: the answers chosen by the task, by question name,
+                        replacing the defaults
+        :rtype: tuple
+        :returns: the list of prompts and the list of answers
+        """
+        answers = answers or {}
+        unknown = set(answers) - set(name for name, dummy, dummy in _PROMPT_ANSWERS)
+        if unknown:
+            raise ValueError('unknown questions: {0}'.format(', '.join(sorted(unknown))))
+        return ([prompt for dummy, prompt, dummy in _PROMPT_ANSWERS],
+                [answers.get(name, answer) for name, dummy, answer in _PROMPT_ANSWERS])
+
+    def send_command(self, command=None, prompt=None, answer=None, sendonly=False, newline=True,
+                     prompt_retry_check=False, check_all=False):
+        # a question of the CLI is answered instead of waiting for the
+        # command timeout
+        if prompt is None and answer is None and not sendonly:
+            prompt, answer = self._questions
+
+        text = to_text(command)
+        command_class = _command_class(text)
+        lines = text.count('\n') + 1
+        if command_class == 'commit':
+            lines, self._session_lines = max(self._session_lines, 1), 0
+        elif text == 'config':
+            self._session_lines = 0
+        elif command_class == 'config':
+            self._session_lines += lines
+        if sendonly:
+            command_class = None
+
+        send = super(Cliconf, self).send_command
+        response = self._send_timed(command_class, lines, send, command=command, prompt=prompt, answer=answer,
+                                    sendonly=sendonly, newline=newline, prompt_retry_check=prompt_retry_check,
+                                    check_all=check_all)
+        self._history_commands += 1
+
+        # only configuration commands and commits ask questions
+        if command_class in ('config', 'commit') and prompt is not None:
+            text = to_text(response, errors='surrogate_or_strict')
+            for name, question_re in _QUESTION_RES:
+                if question_re.search(text):
+                    wait = self._prompt_waits[name]
+                    wait['count'] += 1
+                    wait['total'] += self._timings[command_class]['last']
+                    wait['max'] = max(wait['max'], self._timings[command_class]['last'])
+        return response
+
+    def get_history(self):
+        return list(self.history)
+
+    def reset_history(self):
+        self.history = deque(maxlen=self._history_size)
+        self._history_commands = 0
+
+    def _send_timed(self, command_class, lines, send, **kwargs):
+        """ Call send with the timeout of the class of the command, keeping
+        the time it took
+
+        With the timeout_classes option, the command is waited for the
+        timeout of its class instead of the persistent_command_timeout of
+        the connection, see _command_timeout. Otherwise only the time it
+        took is kept.
+
+        :param command_class: the timeout class, or None to send with the
+                              timeout of the connection
+        :param lines: the lines of the command, or of the configuration
+                      session for a commit
+        :returns: what send returns
+        """
+        if command_class is None:
+            return send(**kwargs)
+
+        timing = self._timings[command_class]
+        timeout = self._command_timeout(command_class, lines)
+        previous = None
+        if self.get_option('timeout_classes'):
+            previous = self._set_command_timeout(timeout)
+        start = time.time()
+        try:
+            response = send(**kwargs)
+        except AnsibleConnectionFailure:
+            # network_cli raises the same exception for an error output, so a
+            # timeout is the failure coming once the timeout elapsed
+            if timeout is not None and time.time() - start >= timeout:
+                timing['timeouts'] += 1
+            raise
+        finally:
+            if previous is not None:
+                self._set_command_timeout(previous)
+
+        elapsed = time.time() - start
+        timing['count'] += 1
+        timing['total'] += elapsed
+        timing['last'] = elapsed
+        timing['max'] = max(timing['max'], elapsed)
+        timing['seconds_per_line'] = max(timing['seconds_per_line'], elapsed / lines)
+        timing['histogram'][bisect_left(_LATENCY_BUCKETS, elapsed)] += 1
+        timing['bytes_sent'] += len(to_bytes(kwargs['command']))
+        timing['bytes_received'] += len(to_bytes(response or b''))
+        return response
+
+    def _command_timeout(self, command_class, lines):
+        """ Return the timeout of a command of the class with the
+        timeout_classes option, otherwise the persistent_command_timeout
+
+        It is the least seconds of the class, or the margin times the
+        slowest seconds per line seen for the class, or expected before any
+        is seen, times the lines of the command, whichever is larger. It is
+        never longer than the persistent_command_timeout, as
+        ansible-connection gives up on the task after it anyway.
+        """
+        configured = self._get_command_timeout()
+        if not self.get_option('timeout_classes'):
+            return configured
+        seconds_per_line = _TIMEOUT_CLASSES[command_class]
+        timing = self._timings[command_class]
+        if timing['count']:
+            seconds_per_line = timing['seconds_per_line']
+        timeout = max(self.get_option('timeout_{0}'.format(command_class)),
+                      int(_TIMEOUT_MARGIN * seconds_per_line * lines + 1))
+        if configured is not None:
+            timeout = min(timeout, configured)
+        return timeout
+
+    def _get_command_timeout(self):
+        # None when the connection has no such option
+        try:
+            return self._connection.get_option('persistent_command_timeout')
+        except (AttributeError, KeyError):
+            return None
+
+    def _set_command_timeout(self, timeout):
+        # the previous timeout, or None when the connection has no such option
+        previous = self._get_command_timeout()
+        if previous is not None:
+            self._connection.set_option('persistent_command_timeout', timeout)
+        return previous
+
+    def get_command_timings(self):
+        """ Return the timings of the commands sent since the connection
+        started, by timeout class, for tuning the classes
+
+        :rtype: dict
+        :returns: the number of commands, their mean, slowest and last
+                  seconds, the slowest seconds per line, the timeouts hit
+                  and the timeout of a one line command
+        """
+        timings = {}
+        for name, timing in self._timings.items():
+            timings[name] = {
+                'count': timing['count'],
+                'mean': round(timing['total'] / timing['count'], 3) if timing['count'] else 0.0,
+                'max': round(timing['max'], 3),
+                'last': round(timing['last'], 3),
+                'seconds_per_line': round(timing['seconds_per_line'], 6),
+                'timeouts': timing['timeouts'],
+                'timeout': self._command_timeout(name, 1),
+            }
+        return timings
+
+    def get_stats(self):
+        """ Return the statistics of the connection since it started
+
+        :rtype: dict
+        :returns: the timings of get_command_timings along with the latency
+                  histogram and the bytes sent and received of each class,
+                  the count, total and slowest seconds of the commands each
+                  question of the CLI was answered for, the cache stats, and
+                  the entries of the history and the ones it dropped
+        """
+        labels = ['<={0}'.format(bound) for bound in _LATENCY_BUCKETS] + ['>{0}'.format(_LATENCY_BUCKETS[-1])]
+        commands = self.get_command_timings()
+        for name, timing in self._timings.items():
+            commands[name].update({
+                'histogram': dict(zip(labels, timing['histogram'])),
+                'bytes_sent': timing['bytes_sent'],
+                'bytes_received': timing['bytes_received'],
+            })
+        prompts = dict((name, {'count': wait['count'], 'total': round(wait['total'], 3),
+                               'max': round(wait['max'], 3)})
+                       for name, wait in self._prompt_waits.items())
+        return {
+            'commands': commands,
+            'prompts': prompts,
+            'cache': self.get_cache_stats(),
+            'history': {
+                'size': len(self.history),
+                'limit': self._history_size,
+                'dropped': max(self._history_commands - len(self.history), 0),
+            },
+        }
+
+    def _check_session(self):
+        # the caches only hold for the ssh session they were filled in, a
+        # reconnect may reach an upgraded or changed device
+        shell = getattr(self._connection, '_ssh_shell', None)
+        if self._cache_session is not None and shell is not self._cache_session:
+            self._device_info = None
+            self._capabilities = None
+            self._config_cache.clear()
+            self._cache_session = None
+
+    def _remember_session(self):
+        self._cache_session = getattr(self._connection, '_ssh_shell', None)
+
+    def _unpaged(self, command, append=False):
+        """ Return a show command whose output is not paged, with the nomore
+        pipe only when the session still pages the outputs
+
+        :param append: add the pipe to a command without it, when the session
+                       pages the outputs
+        :rtype: str
+        """
+        if not command.startswith('show'):
+            return command
+        terminal = getattr(self._connection, '_terminal', None)
+        if getattr(terminal, 'paging_disabled', False):
+            return _NOMORE_RE.sub('', command)
+        if append and not _NOMORE_RE.search(command):
+            return command + ' | nomore'
+        return command
+
+    def _is_config_read(self, command):
+        return command.startswith('show running-config')
+
+    def _get_cached(self, command):
+        """ Return the output of a 'show running-config' command, from the
+        cache when it was already read since the last change and the
+        config_cache option is set
+
+        :param command: the show command
+        :rtype: str
+        :returns: the command output
+        """
+        if not self.get_option('config_cache'):
+            self._cache_stats['config_reads'] += 1
+            return self.send_command(command)
+
+        self._check_session()
+        output = self._config_cache.get(command)
+        if output is None:
+            output = self.send_command(command)
+            self._remember_session()
+            self._cache_stats['config_reads'] += 1
+            self._config_cache[command] = output
+            self._save_config_snapshot()
+        else:
+            self._cache_stats['config_cache_hits'] += 1
+        return output
+
+    def clear_config_cache(self):
+        self._config_cache.clear()
+        # the commit of the device is about to move, the snapshot is saved
+        # again after it is loaded with the new one
+        self._snapshot_commit_id = None
+
+    def refresh_config_cache(self):
+        """ Check the running-config outputs cached for the device before a
+        task reads them, loading the snapshot of the config_snapshots
+        option, see load_config_snapshot
+
+        :rtype: bool
+        :returns: whether the cached outputs are used
+        """
+        if not self.get_option('config_cache'):
+            self._config_cache.clear()
+            return False
+        path = self.get_option('config_snapshots')
+        if path:
+            self.load_config_snapshot(os.path.expanduser(path))
+        return True
+
+    def get_commit_id(self):
+        """ Return the identifier of the last commit of the device
+
+        :rtype: str
+        :returns: the commit id, or None when the device lists no commits
+        """
+        output = self.send_command(self._unpaged('show configuration commit list | nomore'))
+        for line in output.splitlines():
+            match = _COMMIT_ROW_RE.match(line)
+            if match:
+                return match.group(1)
+        return None
+
+    def load_config_snapshot(self, path):
+        """ Reuse the running-config outputs saved under path by a previous
+        connection to the device, as long as no commit happened since then,
+        and save the outputs read from now on along with the last commit
+
+        A commit since the snapshot also drops the outputs cached by this
+        connection, as the device was changed by someone else.
+
+        :param path: the directory of the snapshots, one file per host
+        :rtype: bool
+        :returns: whether the saved outputs are current
+        """
+        host = re.sub(r'[^\w.-]', '_', to_text(self._connection.get_option('host')))
+        self._snapshot_file = os.path.join(path, '{0}.json'.format(host))
+        self._snapshot_commit_id = self.get_commit_id()
+        if self._snapshot_commit_id is None:
+            return False
+
+        try:
+            with open(self._snapshot_file) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (IOError, OSError, ValueError):
+            snapshot = {}
+
+        if snapshot.get('commit_id') != self._snapshot_commit_id:
+            self._config_cache.clear()
+            return False
+
+        for command, output in snapshot.get('outputs', {}).items():
+            self._config_cache.setdefault(command, output)
+        return True
+
+    def _save_config_snapshot(self):
+        if self._snapshot_file is None or self._snapshot_commit_id is None:
+            return
+
+        snapshot = {'commit_id': self._snapshot_commit_id, 'outputs': self._config_cache}
+        directory = os.path.dirname(self._snapshot_file)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # written aside and renamed, so a reader never sees half a file
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as tmp_file:
+            json.dump(snapshot, tmp_file)
+        os.rename(tmp_path, self._snapshot_file)
+
     def get_config(self):
-        return self.send_command('show running-config | details | display curly-braces | nomore')
+        return self._get_cached(self._unpaged('show running-config | details | display curly-braces | nomore'))
 
-    def edit_config(self, candidates=None, commit=True, replace=None, comment=None):
-        resp = {}
+    def edit_config(self, candidates=None, commit=True, replace=None, comment=None, batch_size=None,
+                    commit_size=None, resume_chunk=None, abort_on_error=False, answers=None,
+                    candidate=None, diff=None):
+        """ Push the lines in a configuration session, committed unless
+        commit is false: the changes of the session are then returned in
+        'diff' and it is aborted
+
+        :param candidate: the lines as passed by cli_config, which also gets
+                          the changes of the session in 'diff'
+        :param diff: return the changes of a committed session in 'diff',
+                     read before the commit. 'diff' is only returned when
+                     the session changes something, as cli_config expects
+                     of a device supporting onbox diff
+        """
+        if candidates is None:
+            candidates = candidate
+            if diff is None:
+                diff = True
         operations = self.get_device_operations()
         self.check_edit_config_capability(
             operations, candidates, commit, replace, comment)
 
+        self._questions = self._prompt_answers(answers)
+        try:
+            return self._edit_config(candidates, commit, batch_size, commit_size, resume_chunk, abort_on_error,
+                                     diff)
+        finally:
+            self._questions = self._prompt_answers()
+
+    def _edit_config(self, candidates, commit, batch_size, commit_size, resume_chunk, abort_on_error, diff):
+        resp = {}
+        # the cached running-config outputs are stale from now on
+        self.clear_config_cache()
+
         results = []
         requests = []
-        if commit:
-            self.send_command('config')
-            for line in to_list(candidates):
-                if not isinstance(line, Mapping):
-                    line = {'command': line}
+        lines = []
+        for line in to_list(candidates):
+            if not isinstance(line, Mapping):
+                line = {'command': line}
 
-                cmd = line['command']
-                if cmd != 'end' and cmd[0] != '!':
-                    response = self.send_command(**line)
-                    if response != '':
-                        results.append(response)
-                    requests.append(cmd)
+            cmd = line['command']
+            if cmd != 'end' and cmd[0] != '!':
+                lines.append(line)
+                requests.append(cmd)
 
-            commit_msg = self.send_command('commit')
-            if commit_msg != 'Commit complete.' and commit_msg != '% No modifications to commit.':
-                resp['error'] = commit_msg
-                self.send_command('abort')
-            else:
-                self.send_command('end')
+        if commit and commit_size:
+            resp.update(self._commit_chunked(lines, results, batch_size, commit_size, resume_chunk or 0,
+                                             abort_on_error))
         else:
-            raise ValueError('check mode is not supported')
+            self.send_command('config')
+            failure = self._send_lines(lines, results, batch_size, abort_on_error)
+            if failure:
+                resp.update(failure)
+                self._abort()
+            elif commit:
+                changes = self._session_changes() if diff else None
+                error = self._commit()
+                if error:
+                    resp['error'] = error
+                elif changes:
+                    resp['diff'] = changes
+            else:
+                # dry run, the device tells what the session changes and it
+                # is then discarded
+                changes = self._session_changes()
+                if changes:
+                    resp['diff'] = changes
+                self._abort()
 
         resp['request'] = requests
         resp['response'] = results
         return resp
 
+    def _session_changes(self):
+        # the changes of the configuration session, '' when there are none
+        changes = self.send_command('show configuration')
+        return '' if changes.startswith('%') else changes
+
+    def _send_lines(self, lines, results, batch_size, abort_on_error=False, offset=0):
+        """ Send config lines to the session, adding the non empty responses
+        to results
+
+        The device rejecting a line raises AnsibleConnectionFailure, through
+        the error patterns of the CLI. The error is added to
+        results and the next lines are sent, unless abort_on_error is set.
+        A line whose question was declined always fails, see _send_line.
+
+        :param offset: the number of lines sent before these ones, for the
+                       line number of a failure
+        :rtype: dict
+        :returns: the error and number of the line failing the session, and
+                  the line itself, otherwise None
+        """
+        if batch_size:
+            return self._send_batched(lines, results, batch_size, abort_on_error, offset)
+
+        for index, line in enumerate(lines, offset):
+            failure = self._send_line(line, index, results, abort_on_error)
+            if failure:
+                return failure
+        return None
+
+    def _send_line(self, line, index, results, abort_on_error):
+        """ Send a config line on its own, see _send_lines
+
+        A question of the CLI declined by its answer, e.g. the default 'no'
+        to confirm a removal, leaves the line undone while the rest of the
+        session would still be committed, so it fails the session whatever
+        abort_on_error.
+
+        :param index: the number of the line in the session
+        :rtype: dict
+        :returns: the failure of the line, otherwise None
+        """
+        failed = False
+        try:
+            response = self.send_command(**line)
+        except AnsibleConnectionFailure as exc:
+            # the error patterns of the CLI may match the declined answer
+            response = self._error_message(exc)
+            failed = abort_on_error
+        declined = _DECLINED_RE.search(response)
+        if declined:
+            return self._line_failure(declined.group(0).strip(), index, line['command'])
+        if failed:
+            return self._line_failure(response, index, line['command'])
+        if response != '':
+            results.append(response)
+        return None
+
+    def _line_failure(self, error, index, command=None):
+        failure = {'error': error}
+        if index is not None:
+            failure['error'] = '{0} (line {1}: {2})'.format(error, index + 1, command)
+            failure['failed_line'] = index + 1
+            failure['failed_command'] = command
+        return failure
+
+    def _error_message(self, exc):
+        """ The lines of the device output in an AnsibleConnectionFailure
+        raised for terminal_stderr_re, or the whole message when none
+        matches
+        """
+        message = getattr(exc, 'err', None) or to_text(exc)
+        errors = [line.strip() for line in message.splitlines() if is_error(line)]
+        return '\n'.join(errors) if errors else message
+
+    def _commit(self):
+        """ Commit the configuration session, leaving it
+
+        :rtype: str
+        :returns: the error of the device when the commit failed and was
+                  aborted, otherwise None
+        """
+        try:
+            commit_msg = self.send_command('commit')
+        except AnsibleConnectionFailure as exc:
+            commit_msg = self._error_message(exc)
+        # the last line, after the question answered on the way if any
+        status = commit_msg.strip().splitlines()[-1:]
+        if status != ['Commit complete.'] and status != ['% No modifications to commit.']:
+            self._abort()
+            return commit_msg
+        self.send_command('end')
+        return None
+
+    def _abort(self):
+        try:
+            self.send_command('abort')
+        except AnsibleConnectionFailure:
+            # e.g. the session was already left after a timeout
+            pass
+
+    def _commit_chunked(self, lines, results, batch_size, commit_size, resume_chunk, abort_on_error=False):
+        """ Apply the lines in one commit per chunk of split_commits, stopping
+        at the first chunk that fails
+
+        :param resume_chunk: the index of the first chunk to apply, the
+                             previous ones were committed by an earlier call
+        :rtype: dict
+        :returns: the status, lines and seconds of each chunk, and the error
+                  and index of the failed chunk
+        """
+        resp = {'chunks': []}
+        offset = 0
+        for index, chunk in enumerate(self.split_commits(lines, commit_size)):
+            info = {'lines': len(chunk)}
+            resp['chunks'].append(info)
+            offset += len(chunk)
+            if index < resume_chunk:
+                info['status'] = 'skipped'
+                continue
+            if 'error' in resp:
+                info['status'] = 'pending'
+                continue
+
+            start = time.time()
+            self.send_command('config')
+            failure = self._send_lines(chunk, results, batch_size, abort_on_error, offset - len(chunk))
+            if failure:
+                self._abort()
+                resp.update(failure)
+            else:
+                error = self._commit()
+                if error:
+                    resp['error'] = error
+            info['elapsed'] = round(time.time() - start, 3)
+            if 'error' in resp:
+                info['status'] = 'failed'
+                resp['failed_chunk'] = index
+            else:
+                info['status'] = 'committed'
+        return resp
+
+    def split_commits(self, lines, commit_size):
+        """ Split config lines in chunks of about commit_size lines, each
+        committed on its own
+
+        The consecutive lines of an object, e.g. a 'dot1q vlan N' and its
+        interfaces, stay in the same chunk and in their order, so no chunk
+        depends on objects of a later one. An object with more lines than
+        commit_size gets a chunk of its own.
+
+        :param lines: list of commands or of send_command keyword dicts
+        :param commit_size: the number of lines per chunk
+        :rtype: list
+        :returns: the chunks, lists of lines
+        """
+        groups = []
+        for line in lines:
+            key = _object_key(line['command'] if isinstance(line, Mapping) else line)
+            if groups and groups[-1][0] == key:
+                groups[-1][1].append(line)
+            else:
+                groups.append((key, [line]))
+
+        chunks = [[]]
+        for key, group in groups:
+            if chunks[-1] and len(chunks[-1]) + len(group) > commit_size:
+                chunks.append([])
+            chunks[-1].extend(group)
+        return chunks if chunks[0] else []
+
+    def _send_batched(self, lines, results, batch_size, abort_on_error=False, offset=0):
+        """ Send config lines in chunks of at most batch_size lines
+
+        Each chunk is written to the session as a single block, so the
+        round trip is only paid once per chunk instead of once per line.
+        Lines carrying their own prompt/answer, and the ones which may ask
+        a question of the CLI, are sent on their own with the answers.
+
+        The device runs the whole chunk even when a line of it is rejected.
+        The rejected line is found from the echo of the lines before the
+        error in the output, read up to the prompt after the last line.
+
+        :param lines: list of send_command keyword dicts
+        :param results: the list the non empty responses are added to, one
+                        entry per chunk
+        :param batch_size: maximum number of lines per chunk
+        :rtype: dict
+        :returns: as _send_lines
+        """
+        # the numbers and commands of the lines to send
+        chunk = []
+
+        def flush():
+            if not chunk:
+                return None
+            first = chunk[0][0]
+            commands = [command for dummy, command in chunk]
+            del chunk[:]
+            try:
+                outputs, errors = self._send_batch(commands)
+            except AnsibleConnectionFailure as exc:
+                # e.g. a timeout, the line it happened on is not known
+                response = self._error_message(exc)
+                if abort_on_error:
+                    return self._line_failure('{0} (lines {1}-{2})'.format(
+                        response, first + 1, first + len(commands)), None)
+                results.append(response)
+                return None
+
+            if errors:
+                response = '\n'.join(line.strip() for dummy, line in errors)
+                if abort_on_error:
+                    failed = errors[0][0]
+                    return self._line_failure(response, first + failed, commands[failed])
+            else:
+                response = '\n'.join(line for output in outputs for line in output).strip()
+            if response != '':
+                results.append(response)
+            return None
+
+        for index, line in enumerate(lines, offset):
+            if len(line) > 1 or _may_prompt(line['command']):
+                failure = flush() or self._send_line(line, index, results, abort_on_error)
+                if failure:
+                    return failure
+                continue
+
+            chunk.append((index, line['command']))
+            if len(chunk) >= batch_size:
+                failure = flush()
+                if failure:
+                    return failure
+        return flush()
+
+    def _write_batch(self, command_class, commands):
+        """ Write lines to the session at once and read the output of all of
+        them
+
+        network_cli returns at the first prompt followed by a pause, which
+        may be the prompt of any line of the batch, and raises at the first
+        error found, leaving the rest of the output unread for the next
+        command. The output is read again until the echo of every line and
+        the prompt after the last one arrived, with the error patterns of
+        the connection disabled meanwhile.
+
+        Each read ends at a prompt and one follows each line, so once as
+        many were read the whole output arrived: an echo still missing then
+        was mangled, e.g. wrapped by the terminal, and the output can not
+        be split.
+
+        :param command_class: the timeout class of the lines
+        :param commands: the lines
+        :rtype: tuple
+        :returns: the output, or None when the connection can not keep the
+                  prompts in it or the echo of a line was not found, and the
+                  error patterns of the connection, None for the ones of the
+                  CLI
+        """
+        if not self._can_keep_prompts():
+            return None, None
+
+        with self._connection_options(terminal_stderr_re=_NO_ERROR_RE) as previous:
+            def send(command):
+                response = to_text(self._connection.send(command=command, strip_prompt=False),
+                                   errors='surrogate_or_strict')
+                reads = 1
+                while not _split_batch(commands, response)[1]:
+                    if reads >= len(commands) or _prompts_read(response) >= len(commands):
+                        return None
+                    more = self._connection.receive(strip_prompt=False)
+                    response += '\n' + to_text(more, errors='surrogate_or_strict')
+                    reads += 1
+                return response
+
+            response = self._send_timed(command_class, len(commands), send,
+                                        command=to_bytes('\n'.join(commands)))
+
+        patterns = compile_patterns(previous['terminal_stderr_re']) if previous.get('terminal_stderr_re') else None
+        return response, patterns
+
+    def _can_keep_prompts(self):
+        """ Whether send() of the connection takes strip_prompt, which the
+        one of older network_cli versions lacks
+        """
+        if self._keeps_prompts is None:
+            try:
+                parameters = inspect.signature(self._connection.send).parameters.values()
+            except (TypeError, ValueError):
+                parameters = []
+            self._keeps_prompts = any(parameter.name == 'strip_prompt' or parameter.kind == parameter.VAR_KEYWORD
+                                      for parameter in parameters)
+        return self._keeps_prompts
+
+    def _send_batch(self, commands):
+        """ Write config lines to the session at once, see _write_batch, and
+        find the errors in the output of each one
+
+        :param commands: the config lines
+        :rtype: tuple
+        :returns: the output lines of each command, and the index of the
+                  command and the line of each error
+        """
+        response, patterns = self._write_batch('config', commands)
+        if response is None:
+            # the output can not be split, the lines are sent again one by
+            # one: a batch only holds lines setting values, which the
+            # session takes again without changing anything
+            return self._send_each(commands)
+
+        outputs = _split_batch(commands, response)[0]
+        errors = [(index, line) for index, output in enumerate(outputs)
+                  for line in output if is_error(line, patterns)]
+        return outputs, errors
+
+    def _send_each(self, commands):
+        # as _send_batch, sending the lines one by one
+        outputs = []
+        errors = []
+        for index, command in enumerate(commands):
+            try:
+                outputs.append(self.send_command(command).splitlines())
+            except AnsibleConnectionFailure as exc:
+                outputs.append(self._error_message(exc).splitlines())
+                errors.extend((index, line) for line in outputs[-1])
+        return outputs, errors
+
+    @contextmanager
+    def _connection_options(self, **options):
+        """ Set options of the connection while the block runs, restoring
+        them after it, and yield their previous values
+
+        The options the connection does not have are left out, e.g. on a
+        connection which is not network_cli.
+        """
+        previous = {}
+        for option, value in options.items():
+            try:
+                previous[option] = self._connection.get_option(option)
+                self._connection.set_option(option, value)
+            except (AttributeError, KeyError):
+                continue
+        try:
+            yield previous
+        finally:
+            for option, value in previous.items():
+                self._connection.set_option(option, value)
+
     def get(self, command=None, prompt=None, answer=None, sendonly=False, output=None, newline=True, check_all=False):
         if not command:
             raise ValueError('must provide value of command to execute')
@@ -79,28 +1111,49 @@ class Cliconf(CliconfBase):
             raise ValueError(
                 "'output' value %s is not supported for get" % output)
 
+        command = self._unpaged(command)
+        if self._is_config_read(command) and not (prompt or answer or sendonly):
+            return self._get_cached(command)
+        if not command.startswith('show'):
+            self.clear_config_cache()
+
         return self.send_command(command=command, prompt=prompt, answer=answer, sendonly=sendonly, newline=newline, check_all=check_all)
 
     def get_device_info(self):
-        device_info = {}
+        self._check_session()
+        if self._device_info is None:
+            device_info = {}
+
+            device_info['network_os'] = 'dmos'
+            reply = self.get(command='show platform')
+            data = to_text(reply, errors='surrogate_or_strict').strip()
 
-        device_info['network_os'] = 'dmos'
-        reply = self.get(command='show platform')
-        data = to_text(reply, errors='surrogate_or_strict').strip()
+            match = re.search(r'Version (\S+)', data)
+            if match:
+                device_info['network_os_version'] = match.group(1).strip(',')
 
-        match = re.search(r'Version (\S+)', data)
-        if match:
-            device_info['network_os_version'] = match.group(1).strip(',')
+            self._remember_session()
+            self._cache_stats['device_info_reads'] += 1
+            self._device_info = device_info
 
-        return device_info
+        return dict(self._device_info)
+
+    def get_cache_stats(self):
+        """ Return how many times the device info and the running-config
+        were read from the device, and the running-config reads served from
+        the cache, since the connection started
+
+        :rtype: dict
+        """
+        return dict(self._cache_stats)
 
     def get_device_operations(self):
         return {
             'supports_diff_replace': True,
-            'supports_commit': False,
+            'supports_commit': True,
             'supports_rollback': False,
             'supports_defaults': True,
-            'supports_onbox_diff': False,
+            'supports_onbox_diff': True,
             'supports_commit_comment': False,
             'supports_multiline_delimiter': True,
             'supports_diff_match': True,
@@ -118,16 +1171,27 @@ class Cliconf(CliconfBase):
         }
 
     def get_capabilities(self):
-        result = super(Cliconf, self).get_capabilities()
-        result['device_operations'] = self.get_device_operations()
-        result.update(self.get_option_values())
-        return json.dumps(result)
+        self._check_session()
+        if self._capabilities is None:
+            result = super(Cliconf, self).get_capabilities()
+            result['device_operations'] = self.get_device_operations()
+            result.update(self.get_option_values())
+            self._capabilities = json.dumps(result)
+        return self._capabilities
 
-    def run_commands(self, commands=None, check_rc=True):
+    def run_commands(self, commands=None, check_rc=True, pipeline=False, answers=None):
         if commands is None:
             raise ValueError("'commands' value is required")
 
-        responses = list()
+        self._questions = self._prompt_answers(answers)
+        try:
+            return self._run_commands(commands, check_rc, pipeline)
+        finally:
+            self._questions = self._prompt_answers()
+
+    def _run_commands(self, commands, check_rc, pipeline):
+
+        cmds = list()
         for cmd in to_list(commands):
             if not isinstance(cmd, Mapping):
                 cmd = {'command': cmd}
@@ -137,13 +1201,118 @@ class Cliconf(CliconfBase):
                 raise ValueError(
                     "'output' value %s is not supported for run_commands" % output)
 
-            try:
-                out = self.send_command(**cmd)
-            except AnsibleConnectionFailure as e:
-                if check_rc:
-                    raise
-                out = getattr(e, 'err', to_text(e))
+            # a show command of the user without nomore would otherwise stall
+            # on the pager of a session that could not be set up
+            cmd['command'] = self._unpaged(cmd['command'], append=True)
+
+            cmds.append(cmd)
 
-            responses.append(out)
+        responses = list()
+        group = list()
+        for cmd in cmds:
+            if pipeline and self._is_pipelinable(cmd):
+                group.append(cmd['command'])
+                continue
+
+            responses.extend(self._run_pipelined(group, check_rc))
+            group = list()
+            responses.append(self._run_command(cmd, check_rc))
+        responses.extend(self._run_pipelined(group, check_rc))
 
         return responses
+
+    def _run_command(self, cmd, check_rc):
+        if not cmd['command'].startswith('show'):
+            self.clear_config_cache()
+
+        try:
+            return self.send_command(**cmd)
+        except AnsibleConnectionFailure as e:
+            if check_rc:
+                raise
+            return getattr(e, 'err', to_text(e))
+
+    def _is_pipelinable(self, cmd):
+        # only plain show commands, which do not change the session state
+        return (cmd['command'].startswith('show') and '\n' not in cmd['command'] and
+                not (cmd.get('prompt') or cmd.get('answer') or cmd.get('sendonly')))
+
+    def _run_pipelined(self, commands, check_rc):
+        """ Run show commands back to back, falling back to one by one when
+        the outputs can not be told apart
+
+        :param commands: list of show commands
+        :param check_rc: whether a failed command raises
+        :rtype: list
+        :returns: the output of each command
+        """
+        if len(commands) < 2:
+            return [self._run_command({'command': cmd}, check_rc) for cmd in commands]
+
+        try:
+            outputs = self._send_pipelined(commands, check_rc)
+        except AnsibleConnectionFailure as exc:
+            # e.g. a timeout: the rest of the outputs may still come, so the
+            # commands are not sent again on the same session
+            if check_rc:
+                raise
+            return [getattr(exc, 'err', to_text(exc))] * len(commands)
+
+        if outputs is None:
+            # the whole response was read, the session is at the prompt
+            return [self._run_command({'command': cmd}, check_rc) for cmd in commands]
+        return outputs
+
+    def _send_pipelined(self, commands, check_rc=True):
+        """ Write all the commands at once, see _write_batch, and split the
+        response at the prompt and echo preceding each command
+
+        :param commands: list of show commands
+        :param check_rc: whether an output matching the error patterns of
+                         the connection raises, as when sent alone
+        :rtype: list
+        :returns: the output of each command, or None when it is ambiguous
+        """
+        response, patterns = self._write_batch('show', commands)
+        if response is None:
+            # the output can not be split
+            return None
+
+        outputs = self._split_pipelined(response, commands)[0]
+        for output in outputs or []:
+            if check_rc and any(is_error(line, patterns) for line in output.splitlines()):
+                raise AnsibleConnectionFailure(output)
+        return outputs
+
+    def _split_pipelined(self, response, commands):
+        """ Split a pipelined response in the output of each command
+
+        :rtype: tuple
+        :returns: the outputs found, or None when the response does not
+                  match the commands, and whether all of them were found
+        """
+        lines = response.splitlines()
+        prompt = lines[-1].strip() if lines else ''
+        if not prompt:
+            return None, False
+
+        outputs = []
+        expect_echo = True
+        for line in lines:
+            text = line.strip()
+            if text.startswith(prompt):
+                text = text[len(prompt):].strip()
+                expect_echo = True
+                if not text:
+                    continue
+
+            if expect_echo:
+                if len(outputs) == len(commands) or text != commands[len(outputs)].strip():
+                    return None, False
+                outputs.append([])
+                expect_echo = False
+            else:
+                outputs[-1].append(line)
+
+        outputs = ['\n'.join(output).strip() for output in outputs]
+        return outputs, len(outputs) == len(commands) and expect_echo
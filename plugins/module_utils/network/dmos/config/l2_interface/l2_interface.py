@@ -20,9 +20,15 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.c
 from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.utils import (
     to_list,
 )
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import (
+    get_module_option,
+)
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import (
     Facts,
 )
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.l2_interface.l2_interface import (
+    RENDERER,
+)
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.dict_differ import (
     DictDiffer,
 )
@@ -42,6 +48,8 @@ class L2_interface(ConfigBase):
         'l2_interface',
     ]
 
+    config_keys = {'interface_name': [1], 'traffic': [3]}
+
     def __init__(self, module):
         super(L2_interface, self).__init__(module)
 
@@ -72,22 +80,51 @@ class L2_interface(ConfigBase):
         commands.extend(self.set_config(existing_l2_interface_facts))
         if commands:
             if not self._module.check_mode:
-                response = self._connection.edit_config(commands)
+                response = self._connection.edit_config(commands, answers={'confirm': 'yes'})
                 result['response'] = response['response']
                 if response.get('error'):
                     self._module.fail_json(msg=response['error'])
+            elif self._module._diff:
+                response = self._connection.edit_config(commands, commit=False, answers={'confirm': 'yes'})
+                if response.get('error'):
+                    self._module.fail_json(msg=response['error'])
+                result['diff'] = {'prepared': response.get('diff', '')}
             result['changed'] = True
         result['commands'] = commands
 
-        changed_l2_interface_facts = self.get_l2_interface_facts()
-
         result['before'] = existing_l2_interface_facts
         if result['changed']:
-            result['after'] = changed_l2_interface_facts
+            result['after'] = self.get_after_l2_interface_facts(existing_l2_interface_facts)
 
         result['warnings'] = warnings
+        if get_module_option(self._module, 'stats'):
+            result['stats'] = self._connection.get_stats()
         return result
 
+    def get_after_l2_interface_facts(self, existing_l2_interface_facts):
+        """ Get the configuration resulting from the module invocation
+
+        The device is only read again when the result can not be derived
+        from the existing configuration, or when the verify_after option of
+        the connection is set to force a re-read for verification
+
+        With state merged, the desired configuration is merged into the
+        existing one and normalized as the facts are, so the result holds
+        the same options and defaults a re-read would
+
+        :rtype: A list
+        :returns: The resulting configuration
+        """
+        if get_module_option(self._module, 'verify_after'):
+            return self.get_l2_interface_facts()
+        if self._module.params['state'] == 'merged':
+            differ = DictDiffer(existing_l2_interface_facts,
+                                self._module.params['config'], self.config_keys)
+            return RENDERER.normalize(differ.deepmerge())
+        if self._module.check_mode:
+            return existing_l2_interface_facts
+        return self.get_l2_interface_facts()
+
     def set_config(self, existing_l2_interface_facts):
         """ Collect the configuration from the args passed to the module,
             collect the current configuration (as a dict from facts)
@@ -124,21 +161,32 @@ class L2_interface(ConfigBase):
     def _state_replaced(self, want, have):
         """ The command generator when state is replaced
 
+        Only the provided objects are changed, anything they have configured
+        that is not provided is removed
+
         :rtype: A list
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
         """
         commands = []
+        if want:
+            have = have if have else []
+            commands.extend(self._replace_config(want, have))
         return commands
 
     def _state_overridden(self, want, have):
         """ The command generator when state is overridden
 
+        Like replaced, but the objects that are not provided are removed too
+
         :rtype: A list
         :returns: the commands necessary to migrate the current configuration
                   to the desired configuration
         """
         commands = []
+        want = want if want else []
+        have = have if have else []
+        commands.extend(self._replace_config(want, have, True))
         return commands
 
     def _state_merged(self, want, have):
@@ -167,6 +215,27 @@ class L2_interface(ConfigBase):
         commands.extend(self._delete_config(want, have))
         return commands
 
+    def _replace_config(self, want, have, delete_missing=False):
+        """ Commands to replace configuration based on the want and have config
+
+        A single comparison finds what is configured and not wanted, which is
+        removed, the wanted configuration that differs is then set
+
+        :rtype: A list
+        :returns: the commands necessary to replace the current configuration
+                  of the provided objects
+        """
+        commands = []
+
+        differ = DictDiffer(have, want, self.config_keys)
+        dict_subtract = differ.deepsubtract(delete_missing)
+        if dict_subtract:
+            commands.extend(self._delete_config(dict_subtract, have))
+        if want:
+            commands.extend(self._set_config(want, have))
+
+        return commands
+
     def _set_config(self, want, have):
         """ Commands to set configuration based on the want and have config
 
@@ -176,7 +245,7 @@ class L2_interface(ConfigBase):
         """
         commands = []
 
-        differ = DictDiffer(have, want, {'interface_name': [1], 'traffic': [3]})
+        differ = DictDiffer(have, want, self.config_keys)
 
         dict_diff = differ.deepdiff()
         for diff in dict_diff:
@@ -227,7 +296,7 @@ class L2_interface(ConfigBase):
         if not want and have:
             return ['no switchport']
 
-        differ = DictDiffer(have, want, {'interface_name': [1], 'traffic': [3]})
+        differ = DictDiffer(have, want, self.config_keys)
         dict_intsec = differ.deepintersect()
 
         for diff in dict_intsec:
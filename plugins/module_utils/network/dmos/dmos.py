@@ -12,6 +12,9 @@ import json
 from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import env_fallback
 from ansible.module_utils.connection import Connection, ConnectionError
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.network import (
+    get_resource_connection,
+)
 
 _DEVICE_CONFIGS = {}
 
@@ -34,6 +37,19 @@ def get_provider_argspec():
     return dmos_provider_spec
 
 
+def get_module_option(module, name):
+    """ Return an option of the cliconf plugin read by the modules, e.g.
+    stats, set with a variable or an environment variable
+    """
+    if not hasattr(module, '_dmos_module_options'):
+        connection = get_resource_connection(module)
+        try:
+            module._dmos_module_options = connection.get_module_options()
+        except ConnectionError as exc:
+            module.fail_json(msg=to_text(exc))
+    return module._dmos_module_options.get(name)
+
+
 def get_connection(module):
     if hasattr(module, '_dmos_connection'):
         return module._dmos_connection
@@ -59,10 +75,13 @@ def get_capabilities(module):
     return module._dmos_capabilities
 
 
-def edit_config(module, candidates):
+def edit_config(module, candidates, batch_size=None, commit=True, commit_size=None, abort_on_error=False,
+                answers=None):
     connection = get_connection(module)
     try:
-        return connection.edit_config(candidates=candidates)
+        return connection.edit_config(candidates=candidates, commit=commit, batch_size=batch_size,
+                                      commit_size=commit_size, abort_on_error=abort_on_error,
+                                      answers=answers)
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc))
 
@@ -75,9 +94,18 @@ def get_config(module):
         module.fail_json(msg=to_text(exc))
 
 
-def run_commands(module, commands, check_rc=True):
+def run_commands(module, commands, check_rc=True, pipeline=False, answers=None):
+    connection = get_connection(module)
+    try:
+        return connection.run_commands(commands=commands, check_rc=check_rc, pipeline=pipeline,
+                                       answers=answers)
+    except ConnectionError as exc:
+        module.fail_json(msg=to_text(exc))
+
+
+def get_stats(module):
     connection = get_connection(module)
     try:
-        return connection.run_commands(commands=commands, check_rc=check_rc)
+        return connection.get_stats()
     except ConnectionError as exc:
         module.fail_json(msg=to_text(exc))
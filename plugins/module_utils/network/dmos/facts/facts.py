@@ -39,7 +39,6 @@ FACT_RESOURCE_SUBSETS = dict(
 )
 
 
-
 class Facts(FactsBase):
     """ The fact class for dmos
     """
@@ -60,9 +59,40 @@ class Facts(FactsBase):
         :return: the facts gathered
         """
         if self.VALID_RESOURCE_SUBSETS:
+            self._connection.refresh_config_cache()
+            if data is None:
+                data = self.get_running_config(resource_facts_type)
             self.get_network_resources_facts(FACT_RESOURCE_SUBSETS, resource_facts_type, data)
 
         if self.VALID_LEGACY_GATHER_SUBSETS:
             self.get_network_legacy_facts(FACT_LEGACY_SUBSETS, legacy_facts_type)
 
         return self.ansible_facts, self._warnings
+
+    def get_running_config(self, resource_facts_type=None):
+        """ Fetch the whole running-config once when more than one resource
+        is gathered, so every resource is rendered from the same snapshot
+        instead of issuing its own 'show running-config <section>'
+
+        The output is not decoded here: each resource streams its own
+        section out of it with iter_config_data, so the whole tree is never
+        built.
+
+        :param resource_facts_type: List of resource fact types
+        :rtype: str
+        :returns: the 'display json' output, or None to let each resource
+                  fetch its own section, e.g. when the output is not JSON
+        """
+        if not resource_facts_type:
+            resource_facts_type = self._gather_network_resources
+
+        runable_subsets = self.gen_runable(
+            resource_facts_type, self.VALID_RESOURCE_SUBSETS, resource_facts=True)
+        if len(runable_subsets) < 2:
+            return None
+
+        output = self._connection.get(
+            'show running-config | details | nomore | display json')
+        if not output or not output.lstrip().startswith('{'):
+            return None
+        return output
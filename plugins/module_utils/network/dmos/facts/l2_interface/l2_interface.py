@@ -13,33 +13,41 @@ based on the configuration.
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-import json
-from copy import deepcopy
-
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import (
-    utils,
-)
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.l2_interface.l2_interface import L2_interfaceArgs
-from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import dict_has_key
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_module_option
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.render import (
+    Flag,
+    Leaf,
+    Renderer,
+    lookup,
+)
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import iter_config_data
+
+
+def _storm_control(conf):
+    storm_control = []
+    for traffic in ('broadcast', 'multicast', 'unicast'):
+        percent = lookup(conf, (traffic, 'percent'))
+        if percent is not None:
+            storm_control.append({'traffic': traffic, 'percent': percent})
+    return storm_control
+
+
+RENDERER = Renderer(L2_interfaceArgs.argument_spec, dict(
+    native_vlan_id=Leaf('native-vlan', 'vlan-id'),
+    qinq=Flag('switchport-qinq:qinq'),
+    storm_control=Leaf('dmos-storm-control:storm-control', convert=_storm_control),
+    tpid=Leaf('switchport-tpid:tpid'),
+))
 
 
 class L2_interfaceFacts(object):
     """ The dmos l2_interface fact class
     """
 
-    def __init__(self, module, subspec='config', options='options'):
+    def __init__(self, module):
         self._module = module
         self.argument_spec = L2_interfaceArgs.argument_spec
-        spec = deepcopy(self.argument_spec)
-        if subspec:
-            if options:
-                facts_argument_spec = spec[subspec][options]
-            else:
-                facts_argument_spec = spec[subspec]
-        else:
-            facts_argument_spec = spec
-
-        self.generated_spec = utils.generate_dict(facts_argument_spec)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """ Populate the facts for l2_interface
@@ -55,72 +63,28 @@ class L2_interfaceFacts(object):
 
         objs = []
         try:
-            data_dict = json.loads(data)['data']
-            data_list = data_dict['dmos-base:config']['switchport-native-vlan:switchport']['interface']
-        except (ValueError, KeyError):
-            pass
-        else:
-            data_list = data_list if isinstance(data_list, list) else [data_list]
-            for each in data_list:
-                obj = self.render_config(self.generated_spec, each)
+            for each in iter_config_data(data, ['dmos-base:config', 'switchport-native-vlan:switchport', 'interface']):
+                obj = self.render_config(each)
                 if obj:
                     objs.append(obj)
+        except (ValueError, KeyError):
+            objs = []
 
         facts = {}
         if objs:
-            params = utils.validate_config(
-                self.argument_spec, {'config': objs})
-            facts['l2_interface'] = params['config']
+            validate = get_module_option(self._module, 'validate_facts')
+            facts['l2_interface'] = RENDERER.to_facts(objs, validate)
 
         ansible_facts['ansible_network_resources'].update(facts)
         return ansible_facts
 
-    def render_config(self, spec, conf):
+    def render_config(self, conf):
         """
-        Render config as dictionary structure and delete keys
-          from spec for null values
+        Render config as dictionary structure, keeping only the options
+          that are set
 
-        :param spec: The facts tree, generated from the argspec
         :param conf: The configuration
         :rtype: dictionary
         :returns: The generated config
         """
-        config = deepcopy(spec)
-        config['interface_name'] = conf.get('interface-name')
-
-        native_vlan = conf.get('native-vlan')
-        if native_vlan is not None:
-            config['native_vlan_id'] = native_vlan.get('vlan-id')
-
-        config['qinq'] = dict_has_key(conf, 'switchport-qinq:qinq')
-
-        storm_control = conf.get('dmos-storm-control:storm-control')
-        if storm_control is not None:
-            storm_control_list = []
-
-            broadcast = storm_control.get('broadcast')
-            if broadcast is not None:
-                percent = broadcast.get('percent')
-                if percent is not None:
-                    storm_control_list.append(
-                        {'traffic': 'broadcast', 'percent': percent})
-
-            multicast = storm_control.get('multicast')
-            if multicast is not None:
-                percent = multicast.get('percent')
-                if percent is not None:
-                    storm_control_list.append(
-                        {'traffic': 'multicast', 'percent': percent})
-
-            unicast = storm_control.get('unicast')
-            if unicast is not None:
-                percent = unicast.get('percent')
-                if percent is not None:
-                    storm_control_list.append(
-                        {'traffic': 'unicast', 'percent': percent})
-
-            config['storm_control'] = storm_control_list
-
-        config['tpid'] = conf.get('switchport-tpid:tpid')
-
-        return utils.remove_empties(config)
+        return RENDERER.render(conf)
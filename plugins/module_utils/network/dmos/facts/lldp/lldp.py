@@ -13,32 +13,39 @@ based on the configuration.
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-import json
-from copy import deepcopy
-
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import (
-    utils,
-)
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.lldp.lldp import LldpArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_module_option
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.render import (
+    Flag,
+    Items,
+    Leaf,
+    Renderer,
+)
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import iter_config_data
+
+
+RENDERER = Renderer(LldpArgs.argument_spec, dict(
+    interface=Items('dmos-lldp-interface:interface', sources=dict(
+        name=Leaf('interface-name'),
+        notification=Flag('notification'),
+        tlv_port_description=Leaf('tlvs-tx', 'port-description'),
+        tlv_system_capabilities=Leaf('tlvs-tx', 'system-capabilities'),
+        tlv_system_description=Leaf('tlvs-tx', 'system-description'),
+        tlv_system_name=Leaf('tlvs-tx', 'system-name'),
+    )),
+    msg_fast_tx=Leaf('message-fast-tx'),
+    msg_tx_hold_multi=Leaf('message-tx-hold-multiplier'),
+    msg_tx_interval=Leaf('message-tx-interval'),
+))
 
 
 class LldpFacts(object):
     """ The dmos lldp fact class
     """
 
-    def __init__(self, module, subspec='config', options='options'):
+    def __init__(self, module):
         self._module = module
         self.argument_spec = LldpArgs.argument_spec
-        spec = deepcopy(self.argument_spec)
-        if subspec:
-            if options:
-                facts_argument_spec = spec[subspec][options]
-            else:
-                facts_argument_spec = spec[subspec]
-        else:
-            facts_argument_spec = spec
-
-        self.generated_spec = utils.generate_dict(facts_argument_spec)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """ Populate the facts for lldp
@@ -54,62 +61,28 @@ class LldpFacts(object):
 
         objs = []
         try:
-            data_dict = json.loads(data)['data']
-            data_list = data_dict['dmos-base:config']['dmos-lldp:lldp']
-        except (ValueError, KeyError):
-            pass
-        else:
-            data_list = data_list if isinstance(data_list, list) else [data_list]
-            for each in data_list:
-                obj = self.render_config(self.generated_spec, each)
+            for each in iter_config_data(data, ['dmos-base:config', 'dmos-lldp:lldp']):
+                obj = self.render_config(each)
                 if obj:
                     objs.append(obj)
+        except (ValueError, KeyError):
+            objs = []
 
         facts = {}
         if objs:
-            params = utils.validate_config(self.argument_spec, {'config': objs})
-            facts['lldp'] = params['config']
+            validate = get_module_option(self._module, 'validate_facts')
+            facts['lldp'] = RENDERER.to_facts(objs, validate)
 
         ansible_facts['ansible_network_resources'].update(facts)
         return ansible_facts
 
-    def render_config(self, spec, conf):
+    def render_config(self, conf):
         """
-        Render config as dictionary structure and delete keys
-          from spec for null values
+        Render config as dictionary structure, keeping only the options
+          that are set
 
-        :param spec: The facts tree, generated from the argspec
         :param conf: The configuration
         :rtype: dictionary
         :returns: The generated config
         """
-        config = deepcopy(spec)
-
-        interface_value = conf.get('dmos-lldp-interface:interface')
-        if interface_value is not None:
-            interface = []
-            for each in interface_value:
-                each_interface = dict()
-                each_interface['name'] = each.get('interface-name')
-                each_interface['admin_status'] = each.get('admin-status')
-                each_interface['notification'] = True if 'notification' in each else False
-
-                tlvs = each.get('tlvs-tx')
-                if tlvs is not None:
-                    each_interface['tlv_port_description'] = tlvs.get('port-description')
-                    each_interface['tlv_system_capabilities'] = tlvs.get('system-name')
-                    each_interface['tlv_system_description'] = tlvs.get('system-description')
-                    each_interface['tlv_system_name'] = tlvs.get('system-capabilities')
-
-                interface.append(each_interface)
-            config['interface'] = interface
-
-        config['msg_fast_tx'] = conf.get('message-fast-tx')
-        config['msg_tx_hold_multi'] = conf.get('message-tx-hold-multiplier')
-        config['msg_tx_interval'] = conf.get('message-tx-interval')
-        config['notification_interval'] = conf.get('notification-interval')
-        config['reinit_delay'] = conf.get('reinit-delay')
-        config['tx_credit_max'] = conf.get('tx-credit-max')
-        config['tx_fast_init'] = conf.get('tx-fast-init')
-
-        return utils.remove_empties(config)
+        return RENDERER.render(conf)
@@ -13,32 +13,28 @@ based on the configuration.
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
-import json
-from copy import deepcopy
-
-from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import (
-    utils,
-)
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.log.log import LogArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_module_option
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.render import (
+    Items,
+    Leaf,
+    Renderer,
+)
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import iter_config_data
+
+
+RENDERER = Renderer(LogArgs.argument_spec, dict(
+    syslog=Items('syslog', 'host', item=Leaf('address')),
+))
 
 
 class LogFacts(object):
     """ The dmos log fact class
     """
 
-    def __init__(self, module, subspec='config', options='options'):
+    def __init__(self, module):
         self._module = module
         self.argument_spec = LogArgs.argument_spec
-        spec = deepcopy(self.argument_spec)
-        if subspec:
-            if options:
-                facts_argument_spec = spec[subspec][options]
-            else:
-                facts_argument_spec = spec[subspec]
-        else:
-            facts_argument_spec = spec
-
-        self.generated_spec = utils.generate_dict(facts_argument_spec)
 
     def populate_facts(self, connection, ansible_facts, data=None):
         """ Populate the facts for log
@@ -54,44 +50,28 @@ class LogFacts(object):
 
         objs = []
         try:
-            data_dict = json.loads(data)['data']
-            data_list = data_dict['dmos-base:config']['dmos-log-manager:log']
-        except (ValueError, KeyError):
-            pass
-        else:
-            data_list = data_list if isinstance(data_list, list) else [data_list]
-            for each in data_list:
-                obj = self.render_config(self.generated_spec, each)
+            for each in iter_config_data(data, ['dmos-base:config', 'dmos-log-manager:log']):
+                obj = self.render_config(each)
                 if obj:
                     objs.append(obj)
+        except (ValueError, KeyError):
+            objs = []
 
         facts = {}
         if objs:
-            params = utils.validate_config(
-                self.argument_spec, {'config': objs})
-            facts['log'] = params['config']
+            validate = get_module_option(self._module, 'validate_facts')
+            facts['log'] = RENDERER.to_facts(objs, validate)
 
         ansible_facts['ansible_network_resources'].update(facts)
         return ansible_facts
 
-    def render_config(self, spec, conf):
+    def render_config(self, conf):
         """
-        Render config as dictionary structure and delete keys
-          from spec for null values
+        Render config as dictionary structure, keeping only the options
+          that are set
 
-        :param spec: The facts tree, generated from the argspec
         :param conf: The configuration
         :rtype: dictionary
         :returns: The generated config
         """
-        config = deepcopy(spec)
-        config['severity'] = conf.get('severity')
-
-        syslog_value = conf.get('syslog')
-        if syslog_value is not None:
-            syslog = []
-            for each in syslog_value['host']:
-                syslog.append(each['address'])
-            config['syslog'] = syslog
-
-        return utils.remove_empties(config)
+        return RENDERER.render(conf)
@@ -7,21 +7,27 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 from ansible.module_utils.six import iteritems
-from copy import deepcopy
 
 
 class DictDiffer():
+    """ Compares two configurations (dicts, or lists of dicts)
+
+    The inputs are never modified nor deep copied: the lists identified by
+    config_keys are rebuilt as dicts indexed by their keys while walking the
+    inputs, and only the containers above them are copied. Results may share
+    unchanged subtrees with the inputs.
+    """
     _AUXILIARY_KEY = 'AUXILIARY_KEY'
 
     def __init__(self, base, comparable, config_keys=None):
         if isinstance(base, list) and isinstance(comparable, list):
             self._is_list = True
-            self._base = deepcopy(self._add_aux_key(base))
-            self._comparable = deepcopy(self._add_aux_key(comparable))
+            self._base = self._add_aux_key(base)
+            self._comparable = self._add_aux_key(comparable)
         elif isinstance(base, dict) and isinstance(comparable, dict):
             self._is_list = False
-            self._base = deepcopy(base)
-            self._comparable = deepcopy(comparable)
+            self._base = base
+            self._comparable = comparable
         else:
             raise AssertionError(
                 "invalid or incompatible types of base and comparable")
@@ -30,6 +36,12 @@ class DictDiffer():
             config_keys = {}
         self._config_keys = config_keys
 
+        # keys used to index the lists found at each level
+        self._level_keys = {}
+        for key, levels in iteritems(config_keys):
+            for level in levels:
+                self._level_keys.setdefault(level, []).append(key)
+
     def _add_aux_key(self, raw_list):
         list_dict = dict()
         list_dict[self._AUXILIARY_KEY] = raw_list if raw_list is not None else []
@@ -39,25 +51,45 @@ class DictDiffer():
         aux_key = raw_dict.get(self._AUXILIARY_KEY)
         return aux_key if aux_key is not None else []
 
-    def _transform(self, config, level=0):
+    def _transform(self, config, level=0, remove_null=False):
         if isinstance(config, list):
             if len(config) and not isinstance(config[0], dict):
                 return config
-            else:
-                aux = {}
-                for i in range(len(config)):
-                    common_keys = set(
-                        self._config_keys) & set(config[i])
-                    for k in common_keys:
-                        if level in self._config_keys[k]:
-                            aux['id__{0}__{1}'.format(
-                                k, config[i][k])] = config[i]
-                config = aux
+            level_keys = self._level_keys.get(level, ())
+            aux = {}
+            for each in config:
+                transformed = None
+                for k in level_keys:
+                    if k not in each or (remove_null and each[k] is None):
+                        continue
+                    if transformed is None:
+                        transformed = self._transform(
+                            each, level + 1, remove_null)
+                    aux['id__{0}__{1}'.format(k, each[k])] = transformed
+            return aux
+
         if isinstance(config, dict):
-            aux = config
+            aux = None
             new_level = level + 1
-            for sub_key in config:
-                aux[sub_key] = self._transform(config[sub_key], new_level)
+            for sub_key, value in iteritems(config):
+                if isinstance(value, (dict, list)):
+                    new_value = self._transform(value, new_level, remove_null)
+                    if new_value is value and (value or not remove_null):
+                        continue
+                elif value is not None or not remove_null:
+                    continue
+                else:
+                    new_value = None
+
+                if aux is None:
+                    aux = dict(config)
+                if remove_null and new_value is None or (
+                        remove_null and isinstance(value, dict) and not new_value):
+                    del aux[sub_key]
+                else:
+                    aux[sub_key] = new_value
+            return config if aux is None else aux
+
         return config
 
     def _dict_diff(self, base, comparable):
@@ -76,8 +108,9 @@ class DictDiffer():
                     if sub_diff:
                         updates[key] = sub_diff
             elif isinstance(value, list):
-                updates[key] = list(
-                    set(comparable.get(key)) - set(base.get(key)))
+                item = comparable.get(key)
+                if item is not None:
+                    updates[key] = list(set(item) - set(value))
             else:
                 comparable_value = comparable.get(key)
                 if comparable_value is not None:
@@ -126,45 +159,101 @@ class DictDiffer():
 
         return updates
 
+    def _dict_merge(self, base, comparable):
+        if not isinstance(base, dict):
+            raise AssertionError("`base` must be of type <dict>")
+        if not isinstance(comparable, dict):
+            raise AssertionError("`comparable` must be of type <dict>")
+
+        merged = dict(base)
+
+        for key, value in iteritems(comparable):
+            base_value = base.get(key)
+            if isinstance(value, dict) and isinstance(base_value, dict):
+                merged[key] = self._dict_merge(base_value, value)
+            elif isinstance(value, list) and isinstance(base_value, list):
+                merged[key] = base_value + \
+                    [x for x in value if x not in base_value]
+            elif value is not None:
+                merged[key] = value
+
+        return merged
+
+    def _is_indexed(self, config):
+        splitted_key = next(iter(config), '').split('__', 2)
+        return len(splitted_key) == 3 and splitted_key[0] == 'id'
+
+    def _dict_subtract(self, base, comparable, delete_missing=False):
+        if not isinstance(base, dict):
+            raise AssertionError("`base` must be of type <dict>")
+        if not isinstance(comparable, dict):
+            raise AssertionError("`comparable` must be of type <dict>")
+
+        updates = dict()
+
+        for key, value in iteritems(base):
+            comparable_value = comparable.get(key)
+            if isinstance(value, dict) and self._is_indexed(value):
+                comparable_value = comparable_value if isinstance(
+                    comparable_value, dict) else {}
+                sub_updates = dict()
+                for item_key, item in iteritems(value):
+                    id_key = item_key.split('__', 2)[1]
+                    comparable_item = comparable_value.get(item_key)
+                    if comparable_item is None:
+                        if delete_missing:
+                            sub_updates[item_key] = {id_key: item[id_key]}
+                        continue
+                    sub_subtract = self._dict_subtract(
+                        item, comparable_item, True)
+                    if sub_subtract:
+                        sub_subtract[id_key] = item[id_key]
+                        sub_updates[item_key] = sub_subtract
+                if sub_updates:
+                    updates[key] = sub_updates
+            elif isinstance(value, dict):
+                if comparable_value is None:
+                    updates[key] = value
+                    continue
+                sub_subtract = self._dict_subtract(
+                    value, comparable_value, delete_missing)
+                if sub_subtract:
+                    updates[key] = sub_subtract
+            elif isinstance(value, list):
+                comparable_value = comparable_value if comparable_value else []
+                items = [x for x in value if x not in comparable_value]
+                if items:
+                    updates[key] = items
+            elif comparable_value is None and value is not None and value is not False:
+                updates[key] = value
+
+        return updates
+
     def _untransform(self, config):
-        if isinstance(config, dict):
-            for key, value in iteritems(config):
-                if isinstance(value, dict):
-                    splitted_key = next(iter(value)).split('__', 2)
-                    if len(splitted_key) == 3 and splitted_key[0] == 'id':
-                        aux = []
-                        for k, v in iteritems(value):
-                            splitted_key = k.split('__', 2)
-                            if len(splitted_key) == 3 and v.get(splitted_key[1]) is None:
-                                v.update({splitted_key[1]: splitted_key[2]})
-                            aux.append(v)
-                        value = aux
-                        config[key] = value
-                        for i in range(len(value)):
-                            self._untransform(value[i])
-                    self._untransform(value)
-
-    def _remove_null(self, cfg_dict):
-        final_cfg = {}
-        if not cfg_dict:
-            return final_cfg
-
-        for key, val in iteritems(cfg_dict):
-            dct = None
-            if isinstance(val, dict):
-                child_val = self._remove_null(val)
-                if child_val:
-                    dct = {key: child_val}
-            elif (isinstance(val, list) and val
-                  and all([isinstance(x, dict) for x in val])):
-                child_val = [self._remove_null(x) for x in val]
-                if child_val:
-                    dct = {key: child_val}
-            elif val not in [None]:
-                dct = {key: val}
-            if dct:
-                final_cfg.update(dct)
-        return final_cfg
+        if not isinstance(config, dict):
+            return config
+
+        aux = None
+        for key, value in iteritems(config):
+            if not isinstance(value, dict):
+                continue
+            splitted_key = next(iter(value), '').split('__', 2)
+            if len(splitted_key) == 3 and splitted_key[0] == 'id':
+                new_value = []
+                for k, v in iteritems(value):
+                    splitted_key = k.split('__', 2)
+                    if len(splitted_key) == 3 and v.get(splitted_key[1]) is None:
+                        v = dict(v)
+                        v[splitted_key[1]] = splitted_key[2]
+                    new_value.append(self._untransform(v))
+            else:
+                new_value = self._untransform(value)
+
+            if new_value is not value:
+                if aux is None:
+                    aux = dict(config)
+                aux[key] = new_value
+        return config if aux is None else aux
 
     def deepdiff(self):
         if not self._comparable:
@@ -172,10 +261,9 @@ class DictDiffer():
         if not self._base:
             return self._comparable
         self._base = self._transform(self._base)
-        self._comparable = self._remove_null(self._comparable)
-        self._comparable = self._transform(self._comparable)
+        self._comparable = self._transform(self._comparable, remove_null=True)
         diff = self._dict_diff(self._base, self._comparable)
-        self._untransform(diff)
+        diff = self._untransform(diff)
         if self._is_list:
             return self._del_aux_key(diff)
         return diff
@@ -184,10 +272,36 @@ class DictDiffer():
         if not self._comparable and not self._base:
             return [] if self._is_list else {}
         self._base = self._transform(self._base)
-        self._comparable = self._remove_null(self._comparable)
-        self._comparable = self._transform(self._comparable)
+        self._comparable = self._transform(self._comparable, remove_null=True)
         intsec = self._dict_intersect(self._base, self._comparable)
-        self._untransform(intsec)
+        intsec = self._untransform(intsec)
         if self._is_list:
             return self._del_aux_key(intsec)
         return intsec
+
+    def deepmerge(self):
+        self._base = self._transform(self._base)
+        self._comparable = self._transform(self._comparable, remove_null=True)
+        merged = self._dict_merge(self._base, self._comparable)
+        merged = self._untransform(merged)
+        if self._is_list:
+            return self._del_aux_key(merged)
+        return merged
+
+    def deepsubtract(self, delete_missing=False):
+        """ Returns what is in base and not in comparable, shaped as the
+        comparable of deepintersect so it can be used to build the commands
+        removing it. Entries of keyed lists missing from comparable are
+        returned as their key alone, except, when base and comparable are
+        lists, their own entries (the objects of a resource), which are only
+        returned if delete_missing. Boolean values that are false in base
+        are left out.
+        """
+        self._base = self._transform(self._base)
+        self._comparable = self._transform(self._comparable, remove_null=True)
+        subtract = self._dict_subtract(
+            self._base, self._comparable, delete_missing or not self._is_list)
+        subtract = self._untransform(subtract)
+        if self._is_list:
+            return self._del_aux_key(subtract)
+        return subtract
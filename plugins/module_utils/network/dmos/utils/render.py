@@ -0,0 +1,292 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Schema-driven rendering of the 'display json' tree of a resource into facts.
+
+A Renderer is compiled once from the options of the resource argspec and
+the sources of the options in the tree of the device, and then renders
+each object straight into a dictionary holding only the options that are
+set, the same result of filling a deepcopy of utils.generate_dict and
+cleaning it with utils.remove_empties.
+
+Options without a source are leaves named as the option with dashes, e.g.
+'ip_mtu' is read from 'ip-mtu'.
+
+The facts are data of the device, so they are not validated against the
+argspec: the rendered objects are coerced to the option types and
+completed with the defaults, as validate_config returns them, without its
+AnsibleModule. Set the validate_facts option of the connection to validate
+them anyway.
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible.module_utils.common.validation import (
+    check_type_bool,
+    check_type_float,
+    check_type_int,
+    check_type_str,
+)
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import (
+    utils,
+)
+
+# the values dropped by utils.remove_empties
+_EMPTY = (None, [], {}, (), '')
+
+_CHECK_TYPES = dict(
+    bool=check_type_bool,
+    float=check_type_float,
+    int=check_type_int,
+    str=check_type_str,
+)
+
+
+def lookup(conf, path):
+    """ The value at path of the tree, or None when it is not present """
+    for key in path:
+        if conf is None:
+            return None
+        conf = conf.get(key)
+    return conf
+
+
+class Leaf(object):
+    """ A value of the tree
+
+    :param path: the keys leading to the value
+    :param convert: applied to the value when it is present
+    """
+
+    def __init__(self, *path, **kwargs):
+        self.path = path
+        self.convert = kwargs.get('convert')
+
+    def compile(self, spec):
+        path = self.path
+        convert = self.convert
+        if len(path) == 1 and convert is None:
+            key = path[0]
+
+            def get(conf):
+                value = conf.get(key)
+                return None if value in _EMPTY else value
+        else:
+            def get(conf):
+                value = lookup(conf, path)
+                if value is not None and convert is not None:
+                    value = convert(value)
+                return None if value in _EMPTY else value
+        return get
+
+
+class Flag(object):
+    """ Whether a key is present in the tree
+
+    :param path: the keys leading to the key
+    """
+
+    def __init__(self, *path):
+        self.path = path
+
+    def compile(self, spec):
+        parent_path = self.path[:-1]
+        key = self.path[-1]
+
+        def get(conf):
+            parent = lookup(conf, parent_path)
+            return parent is not None and key in parent
+        return get
+
+
+class Container(object):
+    """ A dict option, rendered from a container of the tree
+
+    :param path: the keys leading to the container
+    :param sources: the sources of the suboptions
+    """
+
+    def __init__(self, *path, **kwargs):
+        self.path = path
+        self.sources = kwargs.get('sources', {})
+
+    def compile(self, spec):
+        path = self.path
+        render = _compile_options(spec['options'], self.sources)
+
+        def get(conf):
+            value = lookup(conf, path)
+            if value is None:
+                return None
+            return render(value) or None
+        return get
+
+
+class Items(object):
+    """ A list option, rendered from a list of the tree
+
+    :param path: the keys leading to the list
+    :param sources: the sources of the suboptions, for lists of dicts
+    :param item: the source of each value in an element, for lists of
+                 values
+    """
+
+    def __init__(self, *path, **kwargs):
+        self.path = path
+        self.sources = kwargs.get('sources', {})
+        self.item = kwargs.get('item')
+
+    def compile(self, spec):
+        path = self.path
+        if spec.get('elements') == 'dict':
+            render = _compile_options(spec['options'], self.sources)
+        else:
+            render = self.item.compile(None)
+
+        def get(conf):
+            value = lookup(conf, path)
+            if not value:
+                return None
+            if isinstance(value, dict):
+                value = [value]
+            return [render(each) for each in value]
+        return get
+
+
+def _compile_options(options, sources):
+    unknown = set(sources) - set(options)
+    if unknown:
+        raise ValueError('Sources of unknown options: {0}'.format(', '.join(sorted(unknown))))
+
+    getters = []
+    for name, spec in options.items():
+        source = sources.get(name)
+        if source is None:
+            if spec.get('type') in ('dict', 'list'):
+                raise ValueError('Option {0} has no source'.format(name))
+            source = Leaf(name.replace('_', '-'))
+        getters.append((name, source.compile(spec)))
+
+    def render(conf):
+        obj = {}
+        for name, get in getters:
+            value = get(conf)
+            if value is not None:
+                obj[name] = value
+        return obj
+    return render
+
+
+def _compile_normalize(options, sources):
+    # an object of the config parameter as render returns it once pushed:
+    # the empty values dropped and the flags set either way
+    fields = []
+    for name, spec in options.items():
+        source = sources.get(name)
+        if isinstance(source, Flag):
+            def convert(value):
+                return bool(value)
+        elif isinstance(source, Container):
+            normalize = _compile_normalize(spec['options'], source.sources)
+
+            def convert(value, normalize=normalize):
+                return None if value is None else normalize(value) or None
+        elif isinstance(source, Items) and spec.get('elements') == 'dict':
+            normalize = _compile_normalize(spec['options'], source.sources)
+
+            def convert(value, normalize=normalize):
+                return [normalize(each) for each in value] if value else None
+        else:
+            def convert(value):
+                return None if value in _EMPTY else value
+        fields.append((name, convert))
+
+    def normalize(obj):
+        result = {}
+        for name, convert in fields:
+            value = convert(obj.get(name))
+            if value is not None:
+                result[name] = value
+        return result
+    return normalize
+
+
+def _compile_complete(options):
+    fields = []
+    for name, spec in options.items():
+        option_type = spec.get('type', 'str')
+        if option_type == 'dict':
+            convert = _compile_complete(spec['options'])
+        elif option_type == 'list':
+            if spec.get('elements') == 'dict':
+                element = _compile_complete(spec['options'])
+            else:
+                element = _CHECK_TYPES[spec.get('elements', 'str')]
+
+            def convert(value, element=element):
+                return [element(each) for each in value]
+        else:
+            convert = _CHECK_TYPES[option_type]
+        fields.append((name, spec.get('default'), convert))
+
+    def complete(obj):
+        result = {}
+        for name, default, convert in fields:
+            value = obj.get(name)
+            result[name] = default if value is None else convert(value)
+        return result
+    return complete
+
+
+class Renderer(object):
+    """ Renders objects of the tree of the device into facts
+
+    :param argument_spec: the argspec of the resource
+    :param sources: the sources of the options of config, by option name
+    """
+
+    def __init__(self, argument_spec, sources):
+        self._argument_spec = argument_spec
+        self._render = _compile_options(argument_spec['config']['options'], sources)
+        self._normalize = _compile_normalize(argument_spec['config']['options'], sources)
+        self._complete = _compile_complete(argument_spec['config']['options'])
+
+    def render(self, conf):
+        """ Render an object of the tree
+
+        :param conf: the object, as in the 'display json' output
+        :rtype: dictionary
+        :returns: the options that are set
+        """
+        return self._render(conf)
+
+    def to_facts(self, objs, validate=False):
+        """ The facts of the rendered objects
+
+        :param objs: the objects returned by render
+        :param validate: validate them against the argspec
+        :rtype: list
+        :returns: the objects as validate_config returns them
+        """
+        if validate:
+            return utils.validate_config(self._argument_spec, {'config': objs})['config']
+        return [self._complete(obj) for obj in objs]
+
+    def normalize(self, objs):
+        """ The facts a configuration is read back as
+
+        The objects are reduced to what render returns for them once pushed,
+        the options that are not set dropped and the flags set either way,
+        and completed as to_facts does, so a configuration derived from the
+        parameters of a module compares equal to the one read from the
+        device afterwards
+
+        :param objs: the objects, as in the config parameter of a module
+        :rtype: list
+        :returns: the objects as to_facts returns them
+        """
+        return self.to_facts([self._normalize(obj) for obj in objs])
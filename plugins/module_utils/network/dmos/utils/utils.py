@@ -7,6 +7,7 @@
 from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
+import json
 import re
 from ansible.module_utils.six import iteritems
 
@@ -15,62 +16,184 @@ def dict_has_key(dict, key):
     return True if key in dict else False
 
 
-def get_command_list_from_curly_braces(output):
-    ret = output.split("\n")
-
-    cmds = []
-    while(len(ret)):
-        cmd = ""
-        discart_command = True
-        for i, word in enumerate(ret, 0):
-            cmd += word
-            if word == "":
-                ret.pop(i)
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE_RE = re.compile(r'\s*')
+_JSON_NESTING_RE = re.compile(r'"(?:\\.|[^"\\])*"|[\[\]{}]')
+
+
+def _skip_json_whitespace(data, pos):
+    return _JSON_WHITESPACE_RE.match(data, pos).end()
+
+
+def _skip_json_value(data, pos):
+    # position after the value at pos, objects and arrays are skipped by
+    # counting their brackets instead of being built
+    if data[pos] not in '{[':
+        return _JSON_DECODER.raw_decode(data, pos)[1]
+    depth = 0
+    for match in _JSON_NESTING_RE.finditer(data, pos):
+        token = match.group()
+        if token in ('{', '['):
+            depth += 1
+        elif token in ('}', ']'):
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError('Unterminated JSON value')
+
+
+def _find_json_value(data, path):
+    # position of the value at path, following the member names of nested
+    # objects without decoding the members that are not on the path
+    pos = 0
+    for name in path:
+        pos = _skip_json_whitespace(data, pos)
+        if data[pos] != '{':
+            raise KeyError(name)
+        pos = _skip_json_whitespace(data, pos + 1)
+        while True:
+            if data[pos] == '}':
+                raise KeyError(name)
+            key, pos = _JSON_DECODER.raw_decode(data, pos)
+            pos = _skip_json_whitespace(data, pos)
+            if data[pos] != ':':
+                raise ValueError('Expecting \':\' at char {0}'.format(pos))
+            pos = _skip_json_whitespace(data, pos + 1)
+            if key == name:
                 break
+            pos = _skip_json_whitespace(data, _skip_json_value(data, pos))
+            if data[pos] == ',':
+                pos = _skip_json_whitespace(data, pos + 1)
+    return _skip_json_whitespace(data, pos)
+
+
+def _iter_json_array(data, pos):
+    # decodes the elements of the array at pos one at a time
+    pos = _skip_json_whitespace(data, pos + 1)
+    while data[pos] != ']':
+        value, pos = _JSON_DECODER.raw_decode(data, pos)
+        yield value
+        pos = _skip_json_whitespace(data, pos)
+        if data[pos] == ',':
+            pos = _skip_json_whitespace(data, pos + 1)
+
+
+def iter_config_data(data, path):
+    # yields the elements of the list at path of the 'data' tree of a
+    # 'display json' output, or the object at path when it is not a list.
+    # data may be a tree already parsed (e.g. the running-config snapshot of
+    # Facts), otherwise the raw output is scanned and only the elements are
+    # decoded, one at a time, so the whole tree is never built.
+    # Raises KeyError when path is not in the tree and ValueError for a
+    # malformed output, possibly after some elements were yielded
+    if isinstance(data, dict):
+        value = data
+        for name in path:
+            value = value[name]
+        if isinstance(value, list):
+            for each in value:
+                yield each
+        else:
+            yield value
+        return
+
+    try:
+        pos = _find_json_value(data, ['data'] + list(path))
+        if data[pos] == '[':
+            for each in _iter_json_array(data, pos):
+                yield each
+        else:
+            yield _JSON_DECODER.raw_decode(data, pos)[0]
+    except IndexError:
+        raise ValueError('Unexpected end of JSON output')
+
+
+_CURLY_BRACES_TOKEN_RE = re.compile(r'"(?:\\.|[^"\\])*"?|[{};]|[^"{};]+')
+_CURLY_BRACES_WORD_RE = re.compile(r'(?:"(?:\\.|[^"\\])*"?|[^\s"]+)+')
+
+
+def _normalize_statement(pieces):
+    # collapses whitespace outside quoted strings
+    return " ".join(_CURLY_BRACES_WORD_RE.findall("".join(pieces)))
+
+
+def iter_command_list_from_curly_braces(output):
+    # single pass over 'display curly-braces' output, yielding one flat command
+    # (the path of the enclosing blocks plus the statement) for each ';'
+    path = []
+    pieces = []
+    for line in output.split("\n"):
+        if not line.strip():
+            # an empty line discards any unterminated statement text
+            pieces = []
+            continue
+
+        for piece in _CURLY_BRACES_TOKEN_RE.findall(line):
+            if piece == "{":
+                path.append(_normalize_statement(pieces))
+                pieces = []
+            elif piece == ";":
+                statement = _normalize_statement(pieces)
+                yield " ".join([p for p in path if p] + [statement])
+                pieces = []
+            elif piece == "}":
+                if path:
+                    path.pop()
+                pieces = []
+            else:
+                pieces.append(piece)
+        pieces.append(" ")
 
-            if ";" in word:
-                ret.pop(i)
-                discart_command = False
-                break
 
-            if "}" in word:
-                ret.pop(i)
-                for j in range(i - 1, -1, -1):
-                    if "{" in ret[j]:
-                        ret.pop(j)
-                        break
-                break
+def get_command_list_from_curly_braces(output):
+    return list(iter_command_list_from_curly_braces(output))
+
 
-        if not discart_command:
-            cmd = cmd.replace("{", "").replace(";", "").replace("}", "")
-            cmd = re.sub(' +', ' ', cmd)
-            cmds.append(cmd)
+_COMMAND_TOKEN_RE = re.compile(r'"((?:\\.|[^"\\])*)"|(\S+)')
 
-    return cmds
+
+def get_command_tokens(command):
+    # splits a command in words, quoted strings are a single word without quotes
+    return [quoted or word for quoted, word in _COMMAND_TOKEN_RE.findall(command)]
+
+
+def build_command_index(configs):
+    # prefix trie over the words of each configured command
+    index = {}
+    for config in configs:
+        node = index
+        for token in get_command_tokens(config):
+            node = node.setdefault(token, {})
+    return index
+
+
+def command_in_index(index, tokens):
+    # a command is present when its words are a prefix of a configured command
+    node = index
+    for token in tokens:
+        node = node.get(token)
+        if node is None:
+            return False
+    return True
 
 
 def get_command_list_diff(configs, candidates=None):
     out = []
     if candidates:
+        index = build_command_index(configs)
         for candidate in candidates:
-            command = re.sub(' +', ' ', candidate)
+            command = re.sub(' +', ' ', candidate.strip())
+            tokens = get_command_tokens(command)
 
             its_no = False
-            if command.split()[0] == "no":
+            if tokens and tokens[0] == "no":
                 its_no = True
-                command = command.replace("no ", "")
-
-            contains = True
-            for config in configs:
-                contains = True
-                for word in command.split():
-                    if word not in config:
-                        contains = False
-                        break
-                if contains:
-                    break
-
-            if contains:
+                tokens = tokens[1:]
+                command = command[3:]
+            if not tokens:
+                continue
+
+            if command_in_index(index, tokens):
                 if its_no:
                     out.append("no " + command)
             else:
@@ -160,21 +283,61 @@ def parse_spec_to_regex(key, value, prefix, suffix, dict_keys):
     return generated_regex
 
 
-def parse_current_config(switch_config, arg_spec, module, dict_keys):
-    # pass current switch configuration, arg_spec dictionary, module name and dict_keys
+_PARSE_TABLES = {}
+_REGEX_LITERAL_RE = re.compile(r'\.\*/([^.{}()\s$]+)')
+
+
+def get_parse_table(arg_spec, module, dict_keys):
+    # compiles the search/replace table of parse_spec_to_regex once per
+    # (arg_spec, module, dict_keys), indexed by the first '/node' literal of
+    # each search and keeping the '/node' literals every match must contain
+    key = (id(arg_spec), module, tuple(sorted(iteritems(dict_keys))))
+    cached = _PARSE_TABLES.get(key)
+    if cached is not None and cached[0] is arg_spec:
+        return cached[1]
+
+    table = {}
     generated_regex = parse_spec_to_regex(
         module, arg_spec['config'], [], [], dict_keys)
+    for search, replace in generated_regex.items():
+        literals = _REGEX_LITERAL_RE.findall(search)
+        table.setdefault(literals[0], []).append(
+            (re.compile(search), replace, tuple('/' + literal for literal in literals)))
+
+    _PARSE_TABLES[key] = (arg_spec, table)
+    return table
 
+
+def match_keypath_rows(rows, table):
+    # applies the table of get_parse_table to every row. As the searches
+    # start with '.*', a node may be anywhere in the keypath, e.g. nested as
+    # in '/dot1q/vlan{10}/name x', so each row is tried against the searches
+    # of every first literal it contains, and only those containing all
+    # their literals
     res = set()
-    rows = switch_config.split("\n")
+    firsts = [('/' + first, entries) for first, entries in table.items()]
     for row in rows:
-        for k, v in generated_regex.items():
-            aux = re.sub(k, v, row)  # change switch keypaths
-            if aux != row:
-                # add only if search and replace worked
-                res.add(aux)
+        for first, entries in firsts:
+            if first not in row:
+                continue
+            for regex, replace, literals in entries:
+                if not all(literal in row for literal in literals):
+                    continue
+                aux = regex.sub(replace, row)  # change switch keypaths
+                if aux != row:
+                    # add only if search and replace worked
+                    res.add(aux)
+    return res
+
+
+def parse_current_config(switch_config, arg_spec, module, dict_keys):
+    # pass current switch configuration, arg_spec dictionary, module name and dict_keys
+    table = get_parse_table(arg_spec, module, dict_keys)
+    res = match_keypath_rows(switch_config.split("\n"), table)
 
     config = {}
+    # array members by id, to avoid scanning the arrays for every row
+    members = {}
     for replace in res:
         current = config
         raw_key_value = replace.split("###")
@@ -185,22 +348,18 @@ def parse_current_config(switch_config, arg_spec, module, dict_keys):
                 key_value = each.split("@@@")
                 if key_value[KEY] in dict_keys:
                     # should find and create new array member
-                    found = False
                     name = key_value[KEY] if key_value[KEY] != module else 'config'
                     if name not in current:
                         # create if not present already
                         current[name] = []
-                    for arr in current[name]:
-                        # iterate through dicts in array and search to find current context
-                        if arr[dict_keys[key_value[KEY]]] == key_value[VALUE]:
-                            current = arr
-                            found = True
-                            break
-                    if not found:
+                    array_members = members.setdefault(id(current[name]), {})
+                    member = array_members.get(key_value[VALUE])
+                    if member is None:
                         # there are no dicts with this id, so create a new dict with only the id value
-                        current[name].append(
-                            {dict_keys[key_value[KEY]]: key_value[VALUE]})
-                        current = current[name][-1]
+                        member = {dict_keys[key_value[KEY]]: key_value[VALUE]}
+                        current[name].append(member)
+                        array_members[key_value[VALUE]] = member
+                    current = member
 
                 elif len(key_value) == 1:
                     # should just enter a new dict
@@ -45,6 +45,23 @@ options:
       - List of lines to match
     type: list
     required: false
+  pipeline:
+    description:
+      - Send consecutive show commands back to back instead of waiting for
+        the prompt after each one, paying a single round trip for them.
+        Commands are sent one by one when their outputs can not be told apart.
+    type: bool
+    default: false
+    required: false
+  answers:
+    description:
+      - The answers to the questions of the DmOS CLI, replacing the default
+        C(no) that declines them. The questions are C(uncommitted_changes),
+        asked when leaving a configuration session holding changes,
+        C(commit_warnings), asked by a commit raising validation warnings, and
+        C(confirm), asked by commands removing or resetting objects.
+    type: dict
+    required: false
 """
 
 EXAMPLES = """
@@ -53,6 +70,14 @@ EXAMPLES = """
     commands:
       - show running-config interface l3
       - show oam twamp sender
+
+# Execute several show commands in a single round trip
+- dmos_command:
+    commands:
+      - show platform
+      - show running-config dot1q
+      - show running-config interface l3
+    pipeline: true
 """
 
 RETURN = """
@@ -83,6 +108,7 @@ from ansible_collections.ansible.netcommon.plugins.module_utils.network.common.u
     to_lines,
 )
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import dmos_argument_spec, run_commands
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_module_option, get_stats
 
 
 def parse_commands(module, warnings):
@@ -107,6 +133,8 @@ def main():
         commands=dict(type='list', required=True),
         match=dict(type='str', choices=['exact']),
         lines=dict(type='list'),
+        pipeline=dict(type='bool', default=False),
+        answers=dict(type='dict'),
     )
 
     argument_spec.update(dmos_argument_spec)
@@ -120,7 +148,9 @@ def main():
     warnings = list()
     commands = parse_commands(module, warnings)
 
-    responses = run_commands(module, commands)
+    responses = run_commands(module, commands,
+                             pipeline=module.params['pipeline'],
+                             answers=module.params['answers'])
 
     if module.params['match']:
         for line in module.params['lines']:
@@ -133,6 +163,8 @@ def main():
         'stdout': responses,
         'stdout_lines': list(to_lines(responses)),
     })
+    if get_module_option(module, 'stats'):
+        result['stats'] = get_stats(module)
 
     module.exit_json(**result)
 
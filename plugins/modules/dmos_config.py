@@ -32,6 +32,57 @@ options:
     description:
       - List of DmOS configuration commands to execute.
     required: false
+  batch_size:
+    description:
+      - When set, the commands are pushed to the device in blocks of
+        up to this many lines, waiting for the prompt once per block
+        instead of once per line. All blocks are applied in a single commit.
+      - The commands which may ask a question of the CLI, the ones starting
+        with C(no), C(exit), C(end) or C(commit), are never part of a block
+        and are sent on their own, so the line following one is not taken
+        as its answer.
+    type: int
+    required: false
+  commit_size:
+    description:
+      - When set, the commands are applied in several commits of about
+        this many lines each, instead of a single commit that may take too
+        long on the device for very large changes. The commands of the same
+        object are kept in the same commit. On a failed commit the previous
+        ones stay applied, and running the task again pushes the rest.
+    type: int
+    required: false
+  abort_on_error:
+    description:
+      - Stop at the first command rejected by the device, discarding the
+        configuration session and failing with the number of that command,
+        instead of sending the remaining commands and committing the
+        accepted ones.
+    type: bool
+    default: false
+    required: false
+  answers:
+    description:
+      - The answers to the questions of the DmOS CLI, replacing the default
+        C(no) that declines them. The questions are C(uncommitted_changes),
+        asked when leaving a configuration session holding changes,
+        C(commit_warnings), asked by a commit raising validation warnings, and
+        C(confirm), asked by commands removing or resetting objects.
+      - A line whose question is declined is not applied, so it fails the
+        task and the session is aborted, whatever I(abort_on_error).
+      - With I(batch_size), the answers are given to the commands sent on
+        their own, see I(batch_size).
+    type: dict
+    required: false
+  onbox_diff:
+    description:
+      - In check mode, load the lines into a configuration session, ask
+        the device what they change and discard the session, instead of
+        reading the whole running-config and comparing it locally.
+        C(changes) is then the change reported by the device.
+    type: bool
+    default: false
+    required: false
 """
 
 EXAMPLES = """
@@ -40,6 +91,35 @@ EXAMPLES = """
     lines:
       - interface l3 test ipv4 address 10.0.0.1/24
       - interface l3 test ipv6 enable
+
+# Push a large list of commands in blocks of 500 lines
+- dmos_config:
+    lines: "{{ vlan_commands }}"
+    batch_size: 500
+
+# Apply tens of thousands of commands in commits of up to 5000 lines
+- dmos_config:
+    lines: "{{ vlan_commands }}"
+    batch_size: 500
+    commit_size: 5000
+
+# Fail on the first rejected command without committing anything
+- dmos_config:
+    lines: "{{ vlan_commands }}"
+    batch_size: 500
+    abort_on_error: true
+
+# Confirm the commands asking whether to remove objects
+- dmos_config:
+    lines:
+      - no dot1q vlan 2019
+    answers:
+      confirm: 'yes'
+
+# Let the device compute what would change, running with --check
+- dmos_config:
+    lines: "{{ vlan_commands }}"
+    onbox_diff: true
 """
 
 RETURN = """
@@ -63,6 +143,21 @@ response:
   type: list
   returned: always
   sample: ['Aborted: reason']
+failed_line:
+  description: The number of the command of changes, or of lines with onbox_diff, rejected by the device.
+  type: int
+  returned: when abort_on_error is set and a command is rejected, or a question of the CLI is declined
+  sample: 5
+chunks:
+  description: The lines, status and seconds of each commit, with commit_size.
+  type: list
+  returned: when commit_size is set and there are changes
+  sample: [{"lines": 5000, "status": "committed", "elapsed": 12.3}, {"lines": 1200, "status": "failed", "elapsed": 4.1}]
+failed_chunk:
+  description: The index in chunks of the commit that failed, the previous ones were committed.
+  type: int
+  returned: when commit_size is set and a commit fails
+  sample: 1
 """
 
 import json
@@ -70,6 +165,7 @@ import json
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import dmos_argument_spec
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_config, edit_config
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_module_option, get_stats
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import get_command_list_from_curly_braces, get_command_list_diff
 
 
@@ -77,7 +173,12 @@ def main():
     """ main entry point for module execution
     """
     argument_spec = dict(
-        lines=dict(aliases=['commands'], type='list')
+        lines=dict(aliases=['commands'], type='list'),
+        batch_size=dict(type='int'),
+        commit_size=dict(type='int'),
+        abort_on_error=dict(type='bool', default=False),
+        answers=dict(type='dict'),
+        onbox_diff=dict(type='bool', default=False)
     )
 
     argument_spec.update(dmos_argument_spec)
@@ -89,7 +190,23 @@ def main():
 
     warnings = list()
 
-    if module.params['lines']:
+    if module.params['lines'] and module.check_mode and module.params['onbox_diff']:
+        response = edit_config(module=module, candidates=module.params['lines'],
+                               batch_size=module.params['batch_size'], commit=False,
+                               abort_on_error=module.params['abort_on_error'],
+                               answers=module.params['answers'])
+        if response.get('error'):
+            if 'failed_line' in response:
+                result['failed_line'] = response['failed_line']
+            module.fail_json(msg=response['error'], **result)
+        diff = response.get('diff')
+        if diff:
+            result['changes'] = diff.splitlines()
+            result['changed'] = True
+            if module._diff:
+                result['diff'] = {'prepared': diff}
+
+    elif module.params['lines']:
         config = get_config(module=module)
         command_list = get_command_list_from_curly_braces(output=config)
         candidates = get_command_list_diff(
@@ -99,14 +216,28 @@ def main():
             result['changes'] = candidates
 
             if not module.check_mode:
-                response = edit_config(module=module, candidates=candidates)
+                response = edit_config(module=module, candidates=candidates,
+                                       batch_size=module.params['batch_size'],
+                                       commit_size=module.params['commit_size'],
+                                       abort_on_error=module.params['abort_on_error'],
+                                       answers=module.params['answers'])
                 result['response'] = response['response']
+                if 'chunks' in response:
+                    result['chunks'] = response['chunks']
                 if response.get('error'):
-                    module.fail_json(msg=response['error'])
+                    if 'failed_line' in response:
+                        result['failed_line'] = response['failed_line']
+                    if 'failed_chunk' in response:
+                        result['failed_chunk'] = response['failed_chunk']
+                        # the previous chunks were committed
+                        result['changed'] = response['failed_chunk'] > 0
+                    module.fail_json(msg=response['error'], **result)
 
             result['changed'] = True
 
     result['warnings'] = warnings
+    if get_module_option(module, 'stats'):
+        result['stats'] = get_stats(module)
     module.exit_json(**result)
 
 
@@ -100,6 +100,7 @@ ansible_facts:
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.facts.facts import FactsArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.dmos import get_module_option, get_stats
 from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import Facts
 
 
@@ -119,7 +120,11 @@ def main():
     ansible_facts, additional_warnings = result
     warnings.extend(additional_warnings)
 
-    module.exit_json(ansible_facts=ansible_facts, warnings=warnings)
+    stats = {}
+    if get_module_option(module, 'stats'):
+        stats['stats'] = get_stats(module)
+
+    module.exit_json(ansible_facts=ansible_facts, warnings=warnings, **stats)
 
 
 if __name__ == '__main__':
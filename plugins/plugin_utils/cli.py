@@ -0,0 +1,73 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+The patterns of the DmOS CLI shared by the terminal and cliconf plugins
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+
+from ansible.module_utils._text import to_bytes
+
+# the prompt at the end of the output of a command, e.g. 'DM4610# ' or
+# 'DM4610(config-vlan-10)# '
+PROMPT_RES = [
+    re.compile(br"[\r\n]?[\w\+\-\.:\/\[\]]+(?:\([^\)]+\)){0,3}(?:[>#]) ?$")
+]
+
+# a prompt at the start of a line, alone or followed by the echo of the
+# command sent at it
+PROMPT_START_RES = [
+    re.compile(br"^[\w\+\-\.:\/\[\]]+(?:\([^\)]+\)){0,3}(?:[>#])(?: |$)")
+]
+
+# the messages of the DmOS CLI for a rejected command, at the start of a
+# line so show outputs quoting them, e.g. in descriptions, do not match
+ERROR_RES = [
+    re.compile(br"^\s*syntax error:", re.M),
+    re.compile(br"^\s*Error:", re.M),
+    re.compile(br"^\s*Aborted:", re.M),
+    re.compile(br"^\s*% Invalid input", re.M),
+]
+
+
+def is_error(line, patterns=None):
+    """ Whether the output line is an error message of the CLI
+
+    :param patterns: the error patterns, ERROR_RES by default
+    """
+    line = to_bytes(line)
+    return any(regex.search(line) for regex in patterns or ERROR_RES)
+
+
+def is_prompt(line):
+    """ Whether the output line is a prompt of the CLI alone """
+    line = to_bytes(line).strip()
+    return any(regex.match(line) for regex in PROMPT_RES)
+
+
+def starts_with_prompt(line):
+    """ Whether the output line starts with a prompt of the CLI """
+    line = to_bytes(line).strip()
+    return any(regex.match(line) for regex in PROMPT_START_RES)
+
+
+def compile_patterns(option):
+    """ Compile the patterns of a terminal_stdout_re or terminal_stderr_re
+    option of network_cli, as it does
+
+    :param option: a list of dicts with a pattern and optional flags,
+                   e.g. 're.M'
+    :rtype: list
+    """
+    patterns = []
+    for item in option:
+        flags = item.get('flags')
+        patterns.append(re.compile(to_bytes(item['pattern']),
+                                   getattr(re, flags.split('.')[1]) if flags else 0))
+    return patterns
@@ -0,0 +1,180 @@
+#
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+"""
+Fleet-scale collection of the resource facts, run on the controller.
+
+FleetCollector gathers the facts of many devices with the Facts and
+Cliconf classes of the collection, without a module run per host. A
+bounded pool of forked worker processes collects the devices, each one a
+device at a time in its main thread, as network_cli sets SIGALRM handlers
+while it reads, which only the main thread can. Each device becomes one
+line of a JSON Lines store, written by the parent process.
+
+The connections are made by a factory, called with the host name. The
+default one, network_cli_factory, opens a network_cli connection with the
+cliconf plugin of the collection. Another factory returns an open
+connection offering what Cliconf uses of network_cli, i.e. send(),
+get_option('host') and optionally close(), with the cliconf plugin loaded
+with its options in its cliconf attribute, as network_cli has once
+connected. The factory is inherited by the worker processes, so it needs
+not be picklable. The plugin loader must be set up, as the ansible
+commands do, e.g. with init_plugin_loader() in a script.
+
+    collector = FleetCollector(network_cli_factory(remote_user='admin'),
+                               workers=32, resources=['vlan'])
+    summary = collector.collect(['sw1', {'host': 'sw2', 'version': '5.2.0'}],
+                                '/var/lib/dmos/facts.jsonl')
+"""
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import multiprocessing
+import os
+import time
+
+from ansible.module_utils._text import to_text
+from ansible.playbook.play_context import PlayContext
+from ansible.plugins.loader import connection_loader
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.facts import Facts
+
+try:
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    HAS_FUTURES = True
+except ImportError:
+    HAS_FUTURES = False
+
+# the collector of a worker process, inherited when it is forked
+_WORKER_COLLECTOR = None
+
+
+class FleetError(Exception):
+    pass
+
+
+def network_cli_factory(**options):
+    """ Return a factory of network_cli connections to DmOS devices for
+    FleetCollector
+
+    :param options: the options of network_cli and of the cliconf plugin,
+                    e.g. remote_user, password or persistent_command_timeout,
+                    the others read from their environment variables
+    :returns: the factory, called with the host name
+    """
+    def connect(host):
+        play_context = PlayContext()
+        play_context.network_os = 'datacom.dmos.dmos'
+        play_context.remote_addr = host
+        connection = connection_loader.get('ansible.netcommon.network_cli', play_context, os.devnull)
+        if connection is None:
+            raise FleetError('the ansible.netcommon.network_cli connection could not be loaded')
+        # the options are passed on to the cliconf plugin
+        connection.set_options(direct=dict(options, host=host))
+        connection._connect()
+        return connection
+    return connect
+
+
+def _init_worker(collector):
+    global _WORKER_COLLECTOR
+    _WORKER_COLLECTOR = collector
+
+
+def _collect_host(host):
+    return _WORKER_COLLECTOR.collect_host(host)
+
+
+class _FleetModule(object):
+    """ The parts of AnsibleModule used by Facts """
+
+    def __init__(self, params, connection):
+        self.params = params
+        self.check_mode = False
+        self._diff = False
+        self._connection = connection
+
+    def fail_json(self, **kwargs):
+        raise FleetError(kwargs.get('msg'))
+
+
+class FleetCollector(object):
+    """ Gathers the resource facts of a fleet of devices
+
+    :param connect: the factory of connections, called with the host name,
+                    by default network_cli_factory()
+    :param workers: the number of worker processes, i.e. of devices
+                    collected at the same time
+    :param resources: the gather_network_resources of dmos_facts
+    """
+
+    def __init__(self, connect=None, workers=16, resources=None):
+        if not HAS_FUTURES:
+            raise FleetError('FleetCollector requires concurrent.futures')
+        self._connect = connect or network_cli_factory()
+        self._workers = workers
+        self._resources = resources or ['all']
+
+    def collect_host(self, host):
+        """ Gather the facts of one device
+
+        :param host: the host name, or a dict with 'host' and optionally
+                     'version', which saves reading it from the device
+        :rtype: dict
+        :returns: the record of the device in the store
+        """
+        if not isinstance(host, dict):
+            host = {'host': host}
+        record = {'host': host['host']}
+        start = time.time()
+        connection = None
+        try:
+            connection = self._connect(host['host'])
+            cliconf = connection.cliconf
+            version = host.get('version')
+            if version is None:
+                version = cliconf.get_device_info().get('network_os_version')
+            record['network_os_version'] = version
+
+            module = _FleetModule({'gather_subset': ['!all'],
+                                   'gather_network_resources': self._resources}, cliconf)
+            facts, warnings = Facts(module).get_facts(['!all'], self._resources)
+            record['ansible_network_resources'] = facts['ansible_network_resources']
+            if warnings:
+                record['warnings'] = warnings
+        except Exception as exc:
+            record['error'] = to_text(exc)
+        finally:
+            if connection is not None and hasattr(connection, 'close'):
+                connection.close()
+        record['elapsed'] = round(time.time() - start, 3)
+        return record
+
+    def collect(self, hosts, store_path):
+        """ Gather the facts of every device into a JSON Lines store, one
+        line per device in the order they are done
+
+        :param hosts: the host names, or dicts with 'host' and 'version'
+        :param store_path: the file the records are appended to
+        :rtype: dict
+        :returns: the number of devices collected and failed, and the time
+                  taken
+        """
+        summary = {'collected': 0, 'failed': 0}
+        start = time.time()
+        # forked, so the workers inherit the collector and its factory
+        context = multiprocessing.get_context('fork')
+        with open(store_path, 'a') as store:
+            with ProcessPoolExecutor(max_workers=self._workers, mp_context=context,
+                                     initializer=_init_worker, initargs=(self,)) as pool:
+                futures = [pool.submit(_collect_host, host) for host in hosts]
+                for future in as_completed(futures):
+                    record = future.result()
+                    # only the parent writes, so the lines never interleave
+                    store.write(json.dumps(record, sort_keys=True) + '\n')
+                    summary['failed' if 'error' in record else 'collected'] += 1
+        summary['elapsed'] = round(time.time() - start, 3)
+        return summary
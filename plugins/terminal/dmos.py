@@ -1,16 +1,41 @@
 from __future__ import (absolute_import, division, print_function)
 __metaclass__ = type
 
-import re
-
+from ansible.errors import AnsibleConnectionFailure
 from ansible.plugins.terminal import TerminalBase
 from ansible.utils.display import Display
+from ansible_collections.datacom.dmos.plugins.plugin_utils.cli import ERROR_RES, PROMPT_RES
 
 display = Display()
 
 
 class TerminalModule(TerminalBase):
 
-    terminal_stdout_re = [
-        re.compile(br"[\r\n]?[\w\+\-\.:\/\[\]]+(?:\([^\)]+\)){0,3}(?:[>#]) ?$")
+    terminal_stdout_re = PROMPT_RES
+
+    terminal_stderr_re = ERROR_RES
+
+    # the session settings of on_open_shell, so outputs are not paged nor
+    # wrapped and no command waits on an auto-completion prompt
+    terminal_setup_commands = [
+        b'screen-length 0',
+        b'screen-width 512',
+        b'autowizard false',
+        b'complete-on-space false',
     ]
+
+    #: whether the session does not page the outputs, so the show commands
+    #: need no nomore pipe
+    paging_disabled = False
+
+    def on_open_shell(self):
+        try:
+            # one at a time, so the prompt of each one is read before the
+            # next one and none is left for the first command of the task
+            for cmd in self.terminal_setup_commands:
+                self._exec_cli_command(cmd)
+        except AnsibleConnectionFailure as exc:
+            # the show commands keep their nomore pipe
+            display.vvvv('unable to set terminal parameters: %s' % exc)
+            return
+        self.paging_disabled = True
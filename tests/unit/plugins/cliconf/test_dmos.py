@@ -0,0 +1,450 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import pytest
+
+from ansible import constants as C
+from ansible.errors import AnsibleConnectionFailure
+from ansible.parsing.yaml.loader import AnsibleLoader
+from ansible_collections.datacom.dmos.plugins.cliconf.dmos import DOCUMENTATION, Cliconf, _may_prompt, _split_batch
+
+PROMPT = 'DM4610(config)# '
+
+
+class Terminal(object):
+    """ The terminal plugin, once the session is set up """
+
+    paging_disabled = True
+
+
+class ScriptedConnection(object):
+    """ Connection returning the output of a batch in the given parts, as
+    network_cli does when it matches the prompt of a line before the output
+    of the next one arrived
+    """
+
+    def __init__(self, parts):
+        self.parts = list(parts)
+        self.sent = []
+        self.prompts = []
+        self.timeouts = []
+        self.options = {'persistent_command_timeout': 30, 'terminal_stderr_re': None}
+        self._terminal = Terminal()
+
+    def get_option(self, option):
+        return self.options[option]
+
+    def set_option(self, option, value):
+        self.options[option] = value
+
+    def send(self, command, prompt=None, answer=None, newline=True, sendonly=False,
+             prompt_retry_check=False, check_all=False, strip_prompt=True):
+        self.sent.append(command)
+        self.prompts.append(prompt)
+        self.timeouts.append(self.options['persistent_command_timeout'])
+        return self.receive(strip_prompt=strip_prompt)
+
+    def receive(self, command=None, prompts=None, answer=None, newline=True,
+                prompt_retry_check=False, check_all=False, strip_prompt=True):
+        if not self.parts:
+            raise AnsibleConnectionFailure('command timeout triggered, timeout value is 30 secs.')
+        return self.parts.pop(0)
+
+
+def load_cliconf(connection, **options):
+    # registers the options of the plugin as the plugin loader does
+    name = 'datacom.dmos.dmos'
+    if not C.config.get_configuration_definitions('cliconf', name):
+        doc = AnsibleLoader(DOCUMENTATION).get_single_data()
+        C.config.initialize_plugin_configuration_definitions('cliconf', name, doc['options'])
+    cliconf = Cliconf(connection)
+    cliconf._load_name = name
+    cliconf.set_options(direct=options)
+    return cliconf
+
+
+def transcript(lines):
+    # the echo of each line after the prompt, and its output
+    text = ''
+    for line, output in lines:
+        text += PROMPT + line + '\n'
+        if output:
+            text += output + '\n'
+    return text + PROMPT
+
+
+def test_split_batch_outputs_per_command():
+    commands = ['dot1q vlan 2', 'dot1q vlam 3', 'dot1q vlan 4']
+    output = transcript([('dot1q vlan 2', ''),
+                         ('dot1q vlam 3', 'syntax error: unknown command'),
+                         ('dot1q vlan 4', '')])
+    outputs, complete = _split_batch(commands, output)
+    assert outputs == [[], ['syntax error: unknown command'], []]
+    assert complete
+
+
+def test_split_batch_incomplete_before_last_prompt():
+    commands = ['dot1q vlan 2', 'dot1q vlan 3']
+    output = transcript([('dot1q vlan 2', '')])
+    outputs, complete = _split_batch(commands, output)
+    assert outputs == [[]]
+    assert not complete
+
+    # the echo of the last line arrived, its prompt did not
+    outputs, complete = _split_batch(commands, output + 'dot1q vlan 3\n')
+    assert outputs == [[], []]
+    assert not complete
+
+
+def test_split_batch_ignores_output_before_the_first_echo():
+    commands = ['dot1q vlan 2']
+    outputs, complete = _split_batch(commands, 'leftover\n' + transcript([('dot1q vlan 2', 'ok')]))
+    assert outputs == [['ok']]
+    assert complete
+
+
+def test_send_batch_reads_until_the_last_prompt():
+    commands = ['dot1q vlan 2', 'dot1q vlam 3', 'dot1q vlan 4']
+    output = transcript([('dot1q vlan 2', ''),
+                         ('dot1q vlam 3', 'syntax error: unknown command'),
+                         ('dot1q vlan 4', '')])
+    split = output.index('dot1q vlam 3')
+    connection = ScriptedConnection([output[:split], output[split:]])
+    cliconf = load_cliconf(connection)
+
+    outputs, errors = cliconf._send_batch(commands)
+
+    assert connection.sent == [b'\n'.join(c.encode() for c in commands)]
+    assert not connection.parts
+    assert errors == [(1, 'syntax error: unknown command')]
+    # the error patterns of the connection are back once the batch is read
+    assert connection.options['terminal_stderr_re'] is None
+
+
+def test_send_batch_falls_back_on_a_mangled_echo():
+    commands = ['dot1q vlan 2', 'dot1q vlan 3']
+    # the echo of the second line wrapped by the terminal
+    output = transcript([('dot1q vlan 2', ''), ('dot1q vl', '')])
+    connection = ScriptedConnection([output, '', ''])
+    cliconf = load_cliconf(connection)
+
+    outputs, errors = cliconf._send_batch(commands)
+
+    # no read waits for a prompt that already came
+    assert connection.sent == [b'dot1q vlan 2\ndot1q vlan 3', b'dot1q vlan 2', b'dot1q vlan 3']
+    assert outputs == [[], []]
+    assert not errors
+
+
+class PromptStrippingConnection(ScriptedConnection):
+    """ Connection whose send() always strips the prompt """
+
+    def send(self, command, prompt=None, answer=None, newline=True, sendonly=False,
+             prompt_retry_check=False, check_all=False):
+        return super(PromptStrippingConnection, self).send(command, prompt, answer)
+
+
+def test_send_batch_without_strip_prompt_sends_each_line():
+    connection = PromptStrippingConnection(['', ''])
+    cliconf = load_cliconf(connection)
+
+    outputs, errors = cliconf._send_batch(['dot1q vlan 2', 'dot1q vlan 3'])
+
+    assert connection.sent == [b'dot1q vlan 2', b'dot1q vlan 3']
+    assert not errors
+
+
+def test_send_batched_reports_the_rejected_line():
+    commands = ['dot1q vlan 2', 'dot1q vlam 3', 'dot1q vlan 4']
+    output = transcript([('dot1q vlan 2', ''),
+                         ('dot1q vlam 3', 'syntax error: unknown command'),
+                         ('dot1q vlan 4', '')])
+    connection = ScriptedConnection([output])
+    cliconf = load_cliconf(connection)
+
+    results = []
+    failure = cliconf._send_batched([{'command': command} for command in commands], results, 10,
+                                    abort_on_error=True)
+
+    assert 'line 2: dot1q vlam 3' in failure['error']
+
+
+def test_send_batch_timeout_is_a_connection_failure():
+    commands = ['dot1q vlan 2', 'dot1q vlan 3']
+    connection = ScriptedConnection([transcript([('dot1q vlan 2', '')])])
+    cliconf = load_cliconf(connection)
+    try:
+        cliconf._send_batch(commands)
+    except AnsibleConnectionFailure as exc:
+        assert 'timeout' in str(exc)
+    else:
+        raise AssertionError('expected a timeout')
+    assert connection.options['terminal_stderr_re'] is None
+
+
+def test_error_message_keeps_the_error_lines():
+    cliconf = load_cliconf(ScriptedConnection([]))
+    exc = AnsibleConnectionFailure(PROMPT + 'dot1q vlam 3\n  syntax error: unknown command\n' + PROMPT)
+    assert cliconf._error_message(exc) == 'syntax error: unknown command'
+    # no error line, e.g. a timeout
+    exc = AnsibleConnectionFailure('command timeout triggered, timeout value is 30 secs.')
+    assert cliconf._error_message(exc) == 'command timeout triggered, timeout value is 30 secs.'
+
+
+def test_line_failure():
+    cliconf = load_cliconf(ScriptedConnection([]))
+    assert cliconf._line_failure('syntax error: unknown command', 1, 'dot1q vlam 3') == {
+        'error': 'syntax error: unknown command (line 2: dot1q vlam 3)',
+        'failed_line': 2,
+        'failed_command': 'dot1q vlam 3',
+    }
+    assert cliconf._line_failure('timeout (lines 1-10)', None) == {'error': 'timeout (lines 1-10)'}
+
+
+@pytest.mark.parametrize('command', ['no dot1q vlan 2', 'exit', 'end', 'commit', ' no switchport'])
+def test_may_prompt(command):
+    assert _may_prompt(command)
+
+
+@pytest.mark.parametrize('command', ['', 'dot1q vlan 2', 'notification', 'commit-id'])
+def test_may_not_prompt(command):
+    assert not _may_prompt(command)
+
+
+def test_prompt_answers():
+    cliconf = load_cliconf(ScriptedConnection([]))
+    prompts, answers = cliconf._prompt_answers({'confirm': 'yes'})
+    assert len(prompts) == len(answers)
+    assert answers.count('yes') == 1
+    assert set(cliconf._prompt_answers()[1]) == set(['no'])
+    with pytest.raises(ValueError):
+        cliconf._prompt_answers({'reboot': 'yes'})
+
+
+def test_send_batched_sends_prompting_lines_alone():
+    commands = ['dot1q vlan 2', 'no dot1q vlan 3', 'dot1q vlan 4']
+    connection = ScriptedConnection([transcript([('dot1q vlan 2', '')]),
+                                     '',
+                                     transcript([('dot1q vlan 4', '')])])
+    cliconf = load_cliconf(connection)
+
+    results = []
+    failure = cliconf._send_batched([{'command': command} for command in commands], results, 10)
+
+    assert failure is None
+    assert connection.sent == [b'dot1q vlan 2', b'no dot1q vlan 3', b'dot1q vlan 4']
+    # the questions are answered for the line sent alone only
+    assert connection.prompts[0] is None and connection.prompts[2] is None
+    assert connection.prompts[1]
+
+
+def test_edit_config_fails_on_a_declined_question():
+    connection = ScriptedConnection(['', 'Are you sure? [no,yes]\nAborted: by user', ''])
+    cliconf = load_cliconf(connection)
+
+    resp = cliconf.edit_config(['no dot1q vlan 2'])
+
+    assert connection.sent == [b'config', b'no dot1q vlan 2', b'abort']
+    assert resp['error'] == 'Aborted: by user (line 1: no dot1q vlan 2)'
+    assert resp['failed_line'] == 1
+
+
+def test_edit_config_dry_run_reports_the_failed_line():
+    connection = ScriptedConnection(['', '', 'Are you sure? [no,yes]\nAborted: by user', ''])
+    cliconf = load_cliconf(connection)
+
+    resp = cliconf.edit_config(candidate=['dot1q vlan 3', 'no dot1q vlan 2'], commit=False)
+
+    assert connection.sent == [b'config', b'dot1q vlan 3', b'no dot1q vlan 2', b'abort']
+    assert resp['failed_line'] == 2
+    assert 'diff' not in resp
+
+
+def test_send_batched_fails_on_a_declined_question():
+    commands = ['dot1q vlan 2', 'no dot1q vlan 3', 'dot1q vlan 4']
+    connection = ScriptedConnection([transcript([('dot1q vlan 2', '')]),
+                                     'Are you sure? [no,yes]\nAborted: by user'])
+    cliconf = load_cliconf(connection)
+
+    results = []
+    failure = cliconf._send_batched([{'command': command} for command in commands], results, 10)
+
+    assert connection.sent == [b'dot1q vlan 2', b'no dot1q vlan 3']
+    assert failure['failed_line'] == 2
+    assert failure['failed_command'] == 'no dot1q vlan 3'
+
+
+def test_run_pipelined_reads_everything_before_falling_back():
+    commands = ['show a', 'show b']
+    # the second output holds a line the split takes for a prompt
+    connection = ScriptedConnection(['DM4610# show a\nout a\nDM4610# ',
+                                     'show b\nDM4610# b\nDM4610# ',
+                                     'out a', 'out b'])
+    cliconf = load_cliconf(connection)
+
+    assert cliconf.run_commands(commands, pipeline=True) == ['out a', 'out b']
+    assert connection.sent == [b'show a\nshow b', b'show a', b'show b']
+
+
+def test_run_pipelined_raises_for_an_error_output():
+    commands = ['show a', 'show b']
+    connection = ScriptedConnection(['DM4610# show a\nsyntax error: unknown command\nDM4610# show b\nout b\nDM4610# '])
+    cliconf = load_cliconf(connection)
+
+    with pytest.raises(AnsibleConnectionFailure):
+        cliconf.run_commands(commands, pipeline=True)
+    assert not connection.parts
+
+    connection = ScriptedConnection(['DM4610# show a\nsyntax error: unknown command\nDM4610# show b\nout b\nDM4610# '])
+    cliconf = load_cliconf(connection)
+    assert cliconf.run_commands(commands, check_rc=False, pipeline=True) == [
+        'syntax error: unknown command', 'out b']
+
+
+def test_config_cache_is_off_by_default():
+    connection = ScriptedConnection(['DM4610# show running-config\nrun\nDM4610# ',
+                                     'DM4610# show running-config\nrun\nDM4610# '])
+    cliconf = load_cliconf(connection)
+    assert not cliconf.refresh_config_cache()
+    cliconf.get_config()
+    cliconf.get_config()
+    assert len(connection.sent) == 2
+
+    connection = ScriptedConnection(['DM4610# show running-config\nrun\nDM4610# '])
+    cliconf = load_cliconf(connection, config_cache=True)
+    assert cliconf.refresh_config_cache()
+    cliconf.get_config()
+    cliconf.get_config()
+    assert len(connection.sent) == 1
+
+
+def test_module_options():
+    cliconf = load_cliconf(ScriptedConnection([]), stats=True, history_size=2)
+    assert cliconf.get_module_options() == {'verify_after': False, 'validate_facts': False, 'stats': True}
+    assert cliconf.history.maxlen == 2
+
+
+def test_command_timeout_is_the_connection_one_by_default():
+    connection = ScriptedConnection(['DM4610# show a\nout a\nDM4610# '])
+    cliconf = load_cliconf(connection, timeout_show=10)
+    assert cliconf._command_timeout('show', 1) == 30
+    cliconf.run_commands(['show a'])
+    assert connection.timeouts == [30]
+
+    connection = ScriptedConnection(['DM4610# show a\nout a\nDM4610# '])
+    cliconf = load_cliconf(connection, timeout_classes=True, timeout_show=10)
+    cliconf.run_commands(['show a'])
+    assert connection.timeouts == [10]
+    assert connection.options['persistent_command_timeout'] == 30
+
+
+def test_command_timeout_classes_only_shorten_the_connection_one():
+    connection = ScriptedConnection([])
+    cliconf = load_cliconf(connection, timeout_classes=True, timeout_show=10, timeout_commit=60)
+    assert cliconf._command_timeout('show', 1) == 10
+    # longer than the persistent_command_timeout of the connection
+    assert cliconf._command_timeout('commit', 1) == 30
+    assert cliconf._command_timeout('commit', 100000) == 30
+    connection.options['persistent_command_timeout'] = 600
+    assert cliconf._command_timeout('commit', 100000) == 600
+    assert cliconf._command_timeout('commit', 1) == 60
+
+
+def test_timeouts_are_counted_from_the_timer():
+    connection = ScriptedConnection([])
+    cliconf = load_cliconf(connection)
+    # failing at once, whatever the message says
+    with pytest.raises(AnsibleConnectionFailure):
+        cliconf.send_command('show a')
+    assert cliconf.get_command_timings()['show']['timeouts'] == 0
+
+    connection.options['persistent_command_timeout'] = 0
+    with pytest.raises(AnsibleConnectionFailure):
+        cliconf.send_command('show a')
+    assert cliconf.get_command_timings()['show']['timeouts'] == 1
+
+
+def test_edit_config_as_called_by_cli_config():
+    connection = ScriptedConnection(['', '', 'dot1q\n vlan 2\n !\n!', 'Commit complete.', ''])
+    cliconf = load_cliconf(connection)
+    operations = cliconf.get_device_operations()
+    assert operations['supports_onbox_diff'] and operations['supports_commit']
+
+    resp = cliconf.edit_config(candidate=['dot1q vlan 2'], commit=True, replace=None, comment=None)
+
+    assert connection.sent == [b'config', b'dot1q vlan 2', b'show configuration', b'commit', b'end']
+    assert resp['diff'] == 'dot1q\n vlan 2\n !\n!'
+    assert 'error' not in resp
+
+
+def test_edit_config_dry_run_without_changes():
+    connection = ScriptedConnection(['', '', '% No configuration changes found.', ''])
+    cliconf = load_cliconf(connection)
+
+    resp = cliconf.edit_config(candidate=['dot1q vlan 2'], commit=False)
+
+    assert connection.sent == [b'config', b'dot1q vlan 2', b'show configuration', b'abort']
+    # no 'diff', so cli_config reports no change
+    assert 'diff' not in resp
+
+
+def test_edit_config_commit_without_diff():
+    connection = ScriptedConnection(['', '', 'Commit complete.', ''])
+    cliconf = load_cliconf(connection)
+
+    resp = cliconf.edit_config(['dot1q vlan 2'])
+
+    assert connection.sent == [b'config', b'dot1q vlan 2', b'commit', b'end']
+    assert 'diff' not in resp
+
+
+CHUNKED_LINES = ['dot1q vlan 2', 'dot1q vlan 2 interface gigabit-ethernet-1/1/1 tagged',
+                 'dot1q vlan 3', 'dot1q vlan 3 name three', 'dot1q vlan 3 interface gigabit-ethernet-1/1/2',
+                 'dot1q vlan 4', 'log syslog 10.0.0.1']
+
+
+def test_split_commits_keeps_the_lines_of_an_object_together():
+    cliconf = load_cliconf(ScriptedConnection([]))
+    assert cliconf.split_commits(CHUNKED_LINES, 2) == [
+        CHUNKED_LINES[:2],
+        # more lines than commit_size, in a chunk of its own
+        CHUNKED_LINES[2:5],
+        CHUNKED_LINES[5:],
+    ]
+    assert cliconf.split_commits(CHUNKED_LINES, 100) == [CHUNKED_LINES]
+    assert cliconf.split_commits([], 2) == []
+
+    lines = [{'command': 'dot1q vlan 2'}, {'command': 'no dot1q vlan 2 name two'}]
+    assert cliconf.split_commits(lines, 1) == [lines]
+
+
+def test_edit_config_commit_chunks_stop_at_the_failed_one():
+    connection = ScriptedConnection(['', '', '', 'Commit complete.', '',
+                                     '', '', '', '', 'Aborted: too many vlans', ''])
+    cliconf = load_cliconf(connection)
+
+    resp = cliconf.edit_config(CHUNKED_LINES, commit_size=2)
+
+    assert [chunk['status'] for chunk in resp['chunks']] == ['committed', 'failed', 'pending']
+    assert [chunk['lines'] for chunk in resp['chunks']] == [2, 3, 2]
+    assert resp['failed_chunk'] == 1
+    assert resp['error'] == 'Aborted: too many vlans'
+    assert connection.sent[-2:] == [b'commit', b'abort']
+    assert not connection.parts
+
+
+def test_edit_config_resumes_at_the_failed_chunk():
+    connection = ScriptedConnection(['', '', '', '', 'Commit complete.', '',
+                                     '', '', '', 'Commit complete.', ''])
+    cliconf = load_cliconf(connection)
+
+    resp = cliconf.edit_config(CHUNKED_LINES, commit_size=2, resume_chunk=1)
+
+    assert [chunk['status'] for chunk in resp['chunks']] == ['skipped', 'committed', 'committed']
+    assert 'error' not in resp
+    assert connection.sent[:2] == [b'config', b'dot1q vlan 3']
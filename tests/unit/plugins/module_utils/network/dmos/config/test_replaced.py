@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import importlib
+
+import pytest
+
+CONFIG_MODULE = 'ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.config.{0}.{0}'
+
+# per resource, the wanted and the existing configuration, and the commands
+# removing what replaced and overridden remove
+CASES = [
+    ('sntp',
+     [{'server': [{'address': '10.0.0.1'}], 'client': True}],
+     [{'server': [{'address': '10.0.0.1'}, {'address': '10.0.0.2', 'key_id': 1}], 'client': True}],
+     ['no sntp server 10.0.0.2'],
+     ['no sntp server 10.0.0.2']),
+    ('lldp',
+     [{'interface': [{'name': 'gigabit-ethernet-1/1/1', 'admin_status': 'tx-only'}]}],
+     [{'interface': [{'name': 'gigabit-ethernet-1/1/1', 'admin_status': 'tx-only'},
+                     {'name': 'gigabit-ethernet-1/1/2', 'admin_status': 'rx-only'}]}],
+     ['no lldp interface gigabit-ethernet-1/1/2'],
+     ['no lldp interface gigabit-ethernet-1/1/2']),
+    ('linkagg',
+     [{'lag': [{'lag_id': 1, 'interface': [{'name': 'gigabit-ethernet-1/1/1'}]}]}],
+     [{'lag': [{'lag_id': 1, 'interface': [{'name': 'gigabit-ethernet-1/1/1'}, {'name': 'gigabit-ethernet-1/1/2'}]},
+               {'lag_id': 2}]}],
+     ['no link-aggregation interface lag 1 interface gigabit-ethernet-1/1/2', 'no link-aggregation interface lag 2'],
+     ['no link-aggregation interface lag 1 interface gigabit-ethernet-1/1/2', 'no link-aggregation interface lag 2']),
+    ('twamp',
+     [{'reflector': {'ipv4': {'client_address': [{'address': '10.0.0.1', 'state': 'enable'}]}},
+       'sender': {'connection': [{'id': 1}]}}],
+     [{'reflector': {'ipv4': {'client_address': [{'address': '10.0.0.1', 'state': 'enable'},
+                                                 {'address': '10.0.0.2', 'state': 'enable'}]}},
+       'sender': {'connection': [{'id': 1}, {'id': 2}]}}],
+     ['no oam twamp reflector ipv4 client-address 10.0.0.2', 'no oam twamp sender connection 2'],
+     ['no oam twamp reflector ipv4 client-address 10.0.0.2', 'no oam twamp sender connection 2']),
+    ('log',
+     [{'syslog': ['10.0.0.1']}],
+     [{'syslog': ['10.0.0.1', '10.0.0.2'], 'severity': 'alert'}],
+     ['no log severity', 'no log syslog 10.0.0.2'],
+     ['no log severity', 'no log syslog 10.0.0.2']),
+    # the objects of a list resource missing from the task are only
+    # removed by overridden
+    ('vlan',
+     [{'vlan_id': 2, 'interface': [{'name': 'gigabit-ethernet-1/1/1', 'tagged': True}]}],
+     [{'vlan_id': 2, 'interface': [{'name': 'gigabit-ethernet-1/1/1', 'tagged': True},
+                                   {'name': 'gigabit-ethernet-1/1/2', 'tagged': True}]},
+      {'vlan_id': 3}],
+     ['no dot1q vlan 2 interface gigabit-ethernet-1/1/2'],
+     ['no dot1q vlan 2 interface gigabit-ethernet-1/1/2', 'no dot1q vlan 3']),
+]
+
+
+class FakeModule(object):
+
+    def __init__(self, state):
+        self.params = {'state': state}
+        self._connection = None
+
+
+def resource(name, state):
+    module = importlib.import_module(CONFIG_MODULE.format(name))
+    return getattr(module, name.capitalize())(FakeModule(state))
+
+
+@pytest.mark.parametrize('name, want, have, replaced, overridden', CASES)
+def test_replaced_removes_the_missing_entries(name, want, have, replaced, overridden):
+    assert resource(name, 'replaced')._state_replaced(want, have) == replaced
+    assert resource(name, 'overridden')._state_overridden(want, have) == overridden
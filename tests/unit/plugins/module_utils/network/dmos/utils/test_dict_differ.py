@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import copy
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.dict_differ import DictDiffer
+
+VLAN_KEYS = {'vlan_id': [1], 'name': [3]}
+HAVE_VLANS = [
+    {'vlan_id': 2, 'name': 'two', 'interface': [{'name': 'gigabit-ethernet-1/1/1', 'tagged': True},
+                                                {'name': 'gigabit-ethernet-1/1/2', 'tagged': False}]},
+    {'vlan_id': 3, 'name': 'three'},
+]
+
+
+def test_deepsubtract_list_keeps_missing_objects_unless_delete_missing():
+    want = [{'vlan_id': 2, 'interface': [{'name': 'gigabit-ethernet-1/1/1', 'tagged': True}]}]
+    have = copy.deepcopy(HAVE_VLANS)
+
+    subtract = DictDiffer(have, want, VLAN_KEYS).deepsubtract()
+    assert subtract == [{'vlan_id': 2, 'name': 'two', 'interface': [{'name': 'gigabit-ethernet-1/1/2'}]}]
+
+    subtract = DictDiffer(have, want, VLAN_KEYS).deepsubtract(True)
+    assert sorted(subtract, key=lambda vlan: vlan['vlan_id']) == [
+        {'vlan_id': 2, 'name': 'two', 'interface': [{'name': 'gigabit-ethernet-1/1/2'}]},
+        {'vlan_id': 3},
+    ]
+    # the inputs are left as they were
+    assert have == HAVE_VLANS
+
+
+def test_deepsubtract_dict_removes_missing_entries():
+    keys = {'address': [1]}
+    have = {'server': [{'address': '10.0.0.1'}, {'address': '10.0.0.2', 'key_id': 1}], 'client': True}
+    want = {'server': [{'address': '10.0.0.1'}], 'client': True}
+
+    assert DictDiffer(have, want, keys).deepsubtract() == {'server': [{'address': '10.0.0.2'}]}
+    assert DictDiffer(have, want, keys).deepsubtract(True) == {'server': [{'address': '10.0.0.2'}]}
+
+
+def test_deepsubtract_leaves_false_booleans_out():
+    have = {'client': False, 'min_poll': 4}
+    assert DictDiffer(have, {}, {}).deepsubtract() == {'min_poll': 4}
+
+
+WANT_VLANS = [
+    {'vlan_id': 2, 'name': None, 'interface': [{'name': 'gigabit-ethernet-1/1/2', 'tagged': True},
+                                               {'name': 'gigabit-ethernet-1/1/3', 'tagged': None}]},
+    {'vlan_id': 4, 'name': 'four', 'interface': None},
+]
+
+
+def test_deepmerge_list():
+    have = copy.deepcopy(HAVE_VLANS)
+    want = copy.deepcopy(WANT_VLANS)
+
+    merged = DictDiffer(have, want, VLAN_KEYS).deepmerge()
+    assert merged == [
+        {'vlan_id': 2, 'name': 'two', 'interface': [{'name': 'gigabit-ethernet-1/1/1', 'tagged': True},
+                                                    {'name': 'gigabit-ethernet-1/1/2', 'tagged': True},
+                                                    {'name': 'gigabit-ethernet-1/1/3'}]},
+        {'vlan_id': 3, 'name': 'three'},
+        {'vlan_id': 4, 'name': 'four'},
+    ]
+    assert have == HAVE_VLANS and want == WANT_VLANS
+
+
+def test_deepdiff_list():
+    diff = DictDiffer(copy.deepcopy(HAVE_VLANS), copy.deepcopy(WANT_VLANS), VLAN_KEYS).deepdiff()
+    # the key of an entry holding changes only is restored from its index
+    assert diff == [
+        {'vlan_id': '2', 'interface': [{'name': 'gigabit-ethernet-1/1/2', 'tagged': True},
+                                       {'name': 'gigabit-ethernet-1/1/3'}]},
+        {'vlan_id': 4, 'name': 'four'},
+    ]
+    assert DictDiffer(HAVE_VLANS, [{'vlan_id': 3, 'name': 'three'}], VLAN_KEYS).deepdiff() == []
+    assert DictDiffer(HAVE_VLANS, [], VLAN_KEYS).deepdiff() == []
+
+
+def test_deepmerge_and_deepdiff_lists_of_values():
+    have = {'syslog': ['10.0.0.1', '10.0.0.2'], 'severity': 'error'}
+    want = {'syslog': ['10.0.0.2', '10.0.0.3'], 'severity': None}
+
+    assert DictDiffer(have, want).deepmerge() == {'syslog': ['10.0.0.1', '10.0.0.2', '10.0.0.3'], 'severity': 'error'}
+    assert DictDiffer(have, want).deepdiff() == {'syslog': ['10.0.0.3']}
@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+from ansible_collections.ansible.netcommon.plugins.module_utils.network.common import utils
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.lldp.lldp import LldpArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.sntp.sntp import SntpArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.lldp.lldp import RENDERER as LLDP
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.facts.sntp.sntp import RENDERER as SNTP
+
+
+def params(argument_spec, config):
+    # the config parameter as the module gets it
+    return utils.validate_config(argument_spec, {'config': config, 'state': 'merged'})['config']
+
+
+def test_normalize_as_read_back():
+    config = params(LldpArgs.argument_spec, [{
+        'msg_fast_tx': 3,
+        'interface': [{'name': 'gigabit-ethernet-1/1/1', 'admin_status': 'rx-only'}],
+    }])
+    # the same configuration, in the 'display json' tree of the device
+    conf = {
+        'message-fast-tx': 3,
+        'dmos-lldp-interface:interface': [{'interface-name': 'gigabit-ethernet-1/1/1', 'admin-status': 'rx-only'}],
+    }
+    facts = LLDP.to_facts([LLDP.render(conf)])
+    assert LLDP.normalize(config) == facts
+    # the flag not set is read back as false
+    assert facts[0]['interface'][0]['notification'] is False
+
+
+def test_normalize_drops_the_empty_values():
+    config = params(SntpArgs.argument_spec, [{
+        'client': True,
+        'source': {'ipv4': '10.0.0.1'},
+        'server': [{'address': '10.0.0.2'}],
+        'auth_key': [],
+    }])
+    conf = {
+        'client': [None],
+        'source': {'ipv4': {'address': {'ip': '10.0.0.1'}}},
+        'server': [{'address': '10.0.0.2'}],
+    }
+    assert SNTP.normalize(config) == SNTP.to_facts([SNTP.render(conf)])
+    assert SNTP.normalize([{}]) == SNTP.to_facts([SNTP.render({})])
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import re
+
+import pytest
+
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.argspec.vlan.vlan import VlanArgs
+from ansible_collections.datacom.dmos.plugins.module_utils.network.dmos.utils.utils import (
+    build_command_index,
+    command_in_index,
+    get_command_list_diff,
+    get_command_list_from_curly_braces,
+    get_command_tokens,
+    get_parse_table,
+    iter_command_list_from_curly_braces,
+    iter_config_data,
+    match_keypath_rows,
+    parse_current_config,
+    parse_spec_to_regex,
+)
+
+DICT_KEYS = {'vlan': 'vlan_id', 'interface': 'name'}
+KEYPATHS = [
+    '/vlan{10}',
+    '/vlan{10}/name ten',
+    '/vlan{10}/interface{gigabit-ethernet-1/1/1}/tagged true',
+    '/dot1q/vlan{20}/name twenty',
+    '/interface/l3{vlan-10}/ipv4/address 10.0.0.1/24',
+    '/lldp/interface{gigabit-ethernet-1/1/2}/admin-status tx-and-rx',
+]
+
+RUNNING_CONFIG = {
+    'data': {
+        'vlan-manager:dot1q': {
+            'vlan': [{'vlan-id': 2, 'name': 'a "quoted" {name}'}, {'vlan-id': 3}],
+        },
+        'dmos-base:config': {
+            'dmos-log-manager:log': {'syslog': [{'host': '10.0.0.1'}]},
+            'dmos-lldp:lldp': {'enabled': True},
+        },
+    },
+}
+
+CURLY_BRACES = """dot1q {
+    vlan 2 {
+        name "a { b ; c }";
+        interface gigabit-ethernet-1/1/1 {
+            tagged;
+        }
+    }
+    vlan 3;
+}
+log severity    error;
+"""
+
+
+@pytest.mark.parametrize('path', [
+    ['vlan-manager:dot1q', 'vlan'],
+    ['dmos-base:config', 'dmos-log-manager:log'],
+    ['dmos-base:config', 'dmos-lldp:lldp'],
+])
+def test_iter_config_data_streams_a_section_of_the_output(path):
+    output = json.dumps(RUNNING_CONFIG, indent=2)
+    assert list(iter_config_data(output, path)) == list(iter_config_data(RUNNING_CONFIG['data'], path))
+
+
+def test_iter_config_data_missing_section():
+    output = json.dumps(RUNNING_CONFIG)
+    with pytest.raises(KeyError):
+        list(iter_config_data(output, ['dmos-base:config', 'dmos-sntp-interface:sntp']))
+    with pytest.raises(KeyError):
+        list(iter_config_data(RUNNING_CONFIG['data'], ['lacp:link-aggregation']))
+
+
+def test_iter_config_data_truncated_output():
+    output = json.dumps(RUNNING_CONFIG)
+    with pytest.raises(ValueError):
+        list(iter_config_data(output[:output.index('"vlan-id": 3')], ['vlan-manager:dot1q', 'vlan']))
+
+
+def test_match_keypath_rows_as_every_search():
+    rows = KEYPATHS
+    expected = set()
+    for search, replace in parse_spec_to_regex('vlan', VlanArgs.argument_spec['config'], [], [], DICT_KEYS).items():
+        for row in rows:
+            aux = re.sub(search, replace, row)
+            if aux != row:
+                expected.add(aux)
+    table = get_parse_table(VlanArgs.argument_spec, 'vlan', DICT_KEYS)
+    assert match_keypath_rows(rows, table) == expected
+
+
+def test_get_parse_table_is_cached():
+    table = get_parse_table(VlanArgs.argument_spec, 'vlan', DICT_KEYS)
+    assert get_parse_table(VlanArgs.argument_spec, 'vlan', DICT_KEYS) is table
+
+
+def test_parse_current_config_nested_keypath():
+    config = parse_current_config('\n'.join(KEYPATHS), VlanArgs.argument_spec, 'vlan', DICT_KEYS)
+    vlans = dict((vlan['vlan_id'], vlan) for vlan in config['config'])
+    assert vlans['10']['name'] == 'ten'
+    assert vlans['10']['interface'] == [{'name': 'gigabit-ethernet-1/1/1', 'tagged': 'true'}]
+    # a vlan node below another node is found as well
+    assert vlans['20'] == {'vlan_id': '20', 'name': 'twenty'}
+
+
+def test_get_command_list_from_curly_braces():
+    assert get_command_list_from_curly_braces(CURLY_BRACES) == [
+        'dot1q vlan 2 name "a { b ; c }"',
+        'dot1q vlan 2 interface gigabit-ethernet-1/1/1 tagged',
+        'dot1q vlan 3',
+        'log severity error',
+    ]
+    assert list(iter_command_list_from_curly_braces(CURLY_BRACES)) == get_command_list_from_curly_braces(CURLY_BRACES)
+
+
+def test_get_command_list_from_curly_braces_unterminated_statement():
+    # an empty line discards the statement it interrupts
+    assert get_command_list_from_curly_braces('sntp {\n  server 10.0.0.1\n\n  client;\n}') == ['sntp client']
+    assert get_command_list_from_curly_braces('') == []
+
+
+def test_get_command_tokens():
+    assert get_command_tokens('dot1q vlan 2 name "a { b ; c }"') == ['dot1q', 'vlan', '2', 'name', 'a { b ; c }']
+    assert get_command_tokens('  log   severity error ') == ['log', 'severity', 'error']
+    assert get_command_tokens('description ""') == ['description', '']
+
+
+CONFIGS = ['dot1q vlan 2 name "a b"', 'dot1q vlan 3']
+
+
+def test_build_command_index():
+    index = build_command_index(CONFIGS)
+    assert index == {'dot1q': {'vlan': {'2': {'name': {'a b': {}}}, '3': {}}}}
+    assert command_in_index(index, ['dot1q', 'vlan', '2'])
+    assert command_in_index(index, ['dot1q', 'vlan', '2', 'name', 'a b'])
+    # the words of a command are matched whole, in order
+    assert not command_in_index(index, ['dot1q', 'vlan', '2', 'name', 'a'])
+    assert not command_in_index(index, ['vlan', '3'])
+
+
+def test_get_command_list_diff():
+    candidates = [
+        'dot1q vlan 2',
+        'dot1q  vlan 4',
+        'no dot1q vlan 3',
+        'no dot1q vlan 5',
+        'dot1q vlan 2 name "a b"',
+        'dot1q vlan 2 name a',
+        'no',
+    ]
+    assert get_command_list_diff(CONFIGS, candidates) == ['dot1q vlan 4', 'no dot1q vlan 3', 'dot1q vlan 2 name a']
+    assert get_command_list_diff(CONFIGS) == []
+    assert get_command_list_diff([], ['dot1q vlan 2', 'no dot1q vlan 3']) == ['dot1q vlan 2']
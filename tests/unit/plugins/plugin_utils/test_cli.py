@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import re
+
+import pytest
+
+from ansible_collections.datacom.dmos.plugins.plugin_utils.cli import compile_patterns, is_error, is_prompt
+
+
+@pytest.mark.parametrize('line', ['DM4610#', 'DM4610(config)# ', '\rDM4610(config-dot1q)# ', 'DM4610>'])
+def test_is_prompt(line):
+    assert is_prompt(line)
+
+
+@pytest.mark.parametrize('line', ['', 'Commit complete.', 'DM4610(config)# dot1q vlan 2',
+                                  'syntax error: unknown command'])
+def test_is_not_prompt(line):
+    assert not is_prompt(line)
+
+
+@pytest.mark.parametrize('line', ['syntax error: unknown command', '  Error: invalid vlan', 'Aborted: too many vlans',
+                                  '% Invalid input detected', 'ok\nsyntax error: incomplete path'])
+def test_is_error(line):
+    assert is_error(line)
+
+
+@pytest.mark.parametrize('line', ['', 'Commit complete.', ' description "Error: none"',
+                                  'name syntax error: quoted'])
+def test_is_not_error(line):
+    # a message quoted in an output is not at the start of its line
+    assert not is_error(line)
+
+
+def test_compile_patterns():
+    patterns = compile_patterns([{'pattern': '^failed', 'flags': 're.M'}, {'pattern': 'denied'}])
+    assert [regex.flags & re.M for regex in patterns] == [re.M, 0]
+    assert is_error('ok\nfailed: x', patterns)
+    assert is_error('access denied', patterns)
+    assert not is_error('syntax error: unknown command', patterns)
@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+# Copyright 2020 Datacom (Teracom Telematica S/A) <datacom.com.br>
+# GNU General Public License v3.0+
+# (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+import json
+import signal
+
+from ansible_collections.datacom.dmos.plugins.plugin_utils.fleet import FleetCollector
+
+
+class Cliconf(object):
+    """ The cliconf of a device without configuration, setting a SIGALRM
+    handler on every call as network_cli does while it reads
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            signal.signal(signal.SIGALRM, signal.getsignal(signal.SIGALRM) or signal.SIG_DFL)
+            self.calls.append(name)
+            if name == 'get_device_info':
+                return {'network_os_version': '5.2.0'}
+            return ''
+        return call
+
+
+class Connection(object):
+
+    def __init__(self):
+        self.cliconf = Cliconf()
+
+
+def test_collect_runs_the_connections_in_a_main_thread(tmp_path):
+    store_path = str(tmp_path / 'facts.jsonl')
+    collector = FleetCollector(lambda host: Connection(), workers=2, resources=['vlan'])
+
+    summary = collector.collect(['sw1', {'host': 'sw2', 'version': '5.1.0'}], store_path)
+
+    assert summary['collected'] == 2 and summary['failed'] == 0
+    with open(store_path) as store:
+        records = dict((record['host'], record) for record in map(json.loads, store))
+    assert records['sw1']['network_os_version'] == '5.2.0'
+    assert records['sw2']['network_os_version'] == '5.1.0'
+    assert records['sw1']['ansible_network_resources'] == {}
+
+
+def test_collect_host_skips_the_device_info_of_a_known_version():
+    connection = Connection()
+    collector = FleetCollector(lambda host: connection, resources=['vlan'])
+
+    record = collector.collect_host({'host': 'sw1', 'version': '5.1.0'})
+
+    assert 'error' not in record
+    assert 'get_device_info' not in connection.cliconf.calls